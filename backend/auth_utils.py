@@ -1,15 +1,121 @@
-# auth_utils.py
-from fastapi import Depends, HTTPException, status
+# auth_utils.py — password hashing, JWT issuing and the get_current_user dependency used by every route
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
+from passlib.context import CryptContext
+
+from src.metrics import Counter, GaugeFunc
 
-SECRET_KEY = "skillboard-secret-key"
+SECRET_KEY = "skillboard-secret-key"  # 🔐 brah
 ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_MINUTES = 60
+STREAM_TOKEN_EXPIRE_SECONDS = int(os.getenv("STREAM_TOKEN_EXPIRE_SECONDS", "60"))
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))  # 0 turns the verified-token cache off
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+optional_auth_scheme = HTTPBearer(auto_error=False)
+
+
+def verify_password(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+def get_password_hash(password):
+    return pwd_context.hash(password)
+
+def create_access_token(data: dict, expires_delta: timedelta = None):
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
+    to_encode.update({"exp": expire})
+    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+def create_stream_token(user_id: int):
+    """A token that only opens /events, for the query string (EventSource can't send headers). It's
+    short-lived because URLs end up in logs and browser history; an open stream outlives it."""
+    return create_access_token({"sub": str(user_id), "purpose": "stream"},
+                               timedelta(seconds=STREAM_TOKEN_EXPIRE_SECONDS))
+
+
+token_cache_lookups = Counter("skillboard_auth_token_cache_total", "Verified-token cache lookups", ("result",))
+
+
+class TokenCache:
+    """LRU of tokens whose signature already checked out: sha256(token) -> (user, exp).
+
+    Only successfully verified tokens are stored, and an entry is dropped once its `exp` passes,
+    so a cached token is never accepted for longer than jwt.decode would accept it.
+    """
+
+    def __init__(self, max_size=AUTH_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token):
+        if self.max_size <= 0:
+            return None
+        key = self.key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                token_cache_lookups.inc("miss")
+                return None
+            if entry[1] <= time.time():
+                del self._entries[key]
+                token_cache_lookups.inc("expired")
+                return None
+            self._entries.move_to_end(key)
+        token_cache_lookups.inc("hit")
+        return entry[0]
 
-auth_scheme = HTTPBearer()
+    def put(self, token, user, exp):
+        if self.max_size <= 0 or exp is None:
+            return
+        key = self.key(token)
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (user, exp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            # drop expired tokens sitting at the cold end instead of waiting for them to age out
+            while self._entries:
+                oldest = next(iter(self._entries))
+                if self._entries[oldest][1] > now:
+                    break
+                del self._entries[oldest]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache()
+GaugeFunc("skillboard_auth_token_cache_entries", "Verified tokens currently cached", (), lambda: {(): len(token_cache)})
+
+
+def _user_for_token(request: Request, token: str, purpose: Optional[str] = None):
+    """The user a token was issued to. `purpose` None takes only the main bearer token, "stream" only
+    a create_stream_token one; only main tokens are cached."""
+    user = token_cache.get(token) if purpose is None else None
+    if user is not None:
+        request.state.user_id = user["user_id"]  # tenant whose cache a write invalidates (src/responseCache.py)
+        return dict(user)
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(auth_scheme)):
-    token = credentials.credentials
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -18,8 +124,57 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(auth_sc
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id = payload.get("sub")
-        if user_id is None:
+        if user_id is None or payload.get("purpose") != purpose:
             raise credentials_exception
-        return {"user_id": int(user_id)}
-    except JWTError:
+        user = {"user_id": int(user_id)}
+    except (JWTError, ValueError):
         raise credentials_exception
+    if purpose is None:
+        token_cache.put(token, user, payload.get("exp"))
+    request.state.user_id = user["user_id"]
+    return dict(user)
+
+
+# 👤 Set by /batch for its sub-requests: the batch's user, authenticated once for all of them
+batch_user = ContextVar("batch_user", default=None)
+
+
+async def get_current_user(request: Request,
+                           credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_auth_scheme)):
+    user = batch_user.get()
+    if user is not None:
+        request.state.user_id = user["user_id"]
+        return dict(user)
+    if credentials is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    return _user_for_token(request, credentials.credentials)  # extract actual token
+
+
+async def get_stream_user(request: Request, stream_token: Optional[str] = None,
+                          credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_auth_scheme)):
+    """Like get_current_user, but also takes ?stream_token= (POST /events/token) — EventSource can't send
+    headers. The main token is never accepted in the URL."""
+    if credentials:
+        return _user_for_token(request, credentials.credentials)
+    if not stream_token:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authenticated")
+    return _user_for_token(request, stream_token, purpose="stream")
+
+
+class RedactTokens(logging.Filter):
+    """Blanks token query parameters in access log lines (uvicorn passes the path with its query string
+    as a log argument) and in the app's own "skillboard" log, whose arguments are often exceptions."""
+
+    pattern = re.compile(r"((?:^|[?&])(?:stream_token|access_token|token)=)[^&\s]*")
+
+    def filter(self, record):
+        if isinstance(record.args, tuple):
+            record.args = tuple(self.pattern.sub(r"\1REDACTED", str(arg)) if isinstance(arg, (str, Exception))
+                                else arg for arg in record.args)
+        elif isinstance(record.msg, str):
+            record.msg = self.pattern.sub(r"\1REDACTED", record.msg)
+        return True
+
+
+logging.getLogger("uvicorn.access").addFilter(RedactTokens())
+logging.getLogger("skillboard").addFilter(RedactTokens())
@@ -0,0 +1,183 @@
+# 📦 batch_routes.py — several GET requests in one round trip, answered on one pooled connection
+import asyncio
+import json
+import logging
+import os
+from typing import List
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+
+from auth_utils import batch_user, get_current_user
+from src.dbConnect import SharedConnection, pool, shared_connection
+
+log = logging.getLogger("skillboard")
+
+router = APIRouter()
+
+BATCH_MAX_REQUESTS = int(os.getenv("BATCH_MAX_REQUESTS", "20"))
+BATCH_ITEM_TIMEOUT = float(os.getenv("BATCH_ITEM_TIMEOUT", "10"))  # seconds per item before it answers 504
+
+
+class BatchItem(BaseModel):
+    path: str  # path plus query string, e.g. "/analytics?threshold=0.9"
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+
+def _streams(route):
+    """Routes declared with a streaming response_class (/events, Excel downloads) never fit in a batch."""
+    response_class = getattr(route.response_class, "value", route.response_class)  # unwrap Default(...)
+    return isinstance(response_class, type) and issubclass(response_class, StreamingResponse)
+
+
+def _check_path(app, path):
+    url = urlsplit(path)
+    if url.scheme or url.netloc or not url.path.startswith("/"):
+        raise HTTPException(status_code=422, detail=f"Batch paths must be relative to this API: {path}")
+    if url.path.rstrip("/") == "/batch":
+        raise HTTPException(status_code=422, detail="Batches can't be nested")
+    scope = {"type": "http", "method": "GET", "path": url.path}
+    route = next((route for route in app.routes if route.matches(scope)[0] == Match.FULL), None)
+    if not isinstance(route, APIRoute):
+        raise HTTPException(status_code=422, detail=f"No GET route for batch path: {path}")
+    if _streams(route):
+        raise HTTPException(status_code=422, detail=f"Streaming routes can't be batched: {path}")
+    return url
+
+
+async def _either(*events):
+    """Wait until any of `events` is set."""
+    waits = [asyncio.ensure_future(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for wait in waits:
+            wait.cancel()
+
+
+async def _watch_disconnect(request, gone):
+    """Set `gone` once the batch's own client goes away (the body is already read, so only
+    http.disconnect is left to receive)."""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            gone.set()
+            return
+
+
+async def _dispatch(app, request, url, gone):
+    """Run one GET through the whole app (middleware, auth, response cache) and collect what it sends."""
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": request.scope.get("root_path", ""),
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": url.query.encode(),
+        "headers": [(b"accept", b"application/json")],  # no token: get_current_user takes batch_user
+    }
+    done = asyncio.Event()
+    started = {}
+    chunks = []
+
+    async def receive():
+        if not started.get("request_sent"):
+            started["request_sent"] = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await _either(done, gone)  # the sub-request hears a disconnect when the batch's client leaves
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            started["status"] = message["status"]
+            started["headers"] = {k.decode().lower(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                done.set()
+
+    try:
+        await app(scope, receive, send)
+    except Exception as e:
+        # ServerErrorMiddleware has already answered 500 by the time it re-raises
+        log.warning("❌ Batch item %s failed: %s", url.path, e)
+    finally:
+        done.set()
+
+    status = started.get("status", 500)
+    body = b"".join(chunks)
+    if started.get("headers", {}).get("content-type", "").startswith("application/json"):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            body = body.decode(errors="replace")
+    else:
+        body = body.decode(errors="replace")
+    return {"status": status, "body": body}
+
+
+async def _within(item):
+    """The item's result, or a 504 once BATCH_ITEM_TIMEOUT passes. A late item isn't cancelled: its handler
+    runs on an executor thread that cancelling wouldn't stop, and the cancelled request would give the
+    shared connection back while that thread still uses it. It finishes in the background instead."""
+    try:
+        return await asyncio.wait_for(asyncio.shield(item), BATCH_ITEM_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {"status": 504, "body": {"detail": f"Batch item took longer than {BATCH_ITEM_TIMEOUT:g}s"}}
+
+
+_closing = set()  # background closes waiting for late items, referenced until they're done
+
+
+async def _close_after(items, shared):
+    await asyncio.gather(*items, return_exceptions=True)
+    await run_in_threadpool(shared.close)
+
+
+# 📦 Batch of GET reads — authenticated once, all answered on one pooled connection
+@router.post("/batch")
+async def batch(payload: BatchRequest, request: Request, current_user: dict = Depends(get_current_user)):
+    if not payload.requests:
+        raise HTTPException(status_code=422, detail="No requests in batch")
+    if len(payload.requests) > BATCH_MAX_REQUESTS:
+        raise HTTPException(status_code=422, detail=f"At most {BATCH_MAX_REQUESTS} requests per batch")
+    urls = [_check_path(request.app, item.path) for item in payload.requests]
+    request.state.read_only = True  # nothing here writes, so don't invalidate the response cache
+
+    # sub-requests run concurrently; the ones that need the database take turns on the shared connection
+    # each item has BATCH_ITEM_TIMEOUT to answer, so the batch answers in bounded time
+    shared = SharedConnection(pool)
+    token = shared_connection.set(shared)
+    user_token = batch_user.set(dict(current_user))
+    gone = asyncio.Event()
+    watcher = asyncio.ensure_future(_watch_disconnect(request, gone))
+    items = [asyncio.ensure_future(_dispatch(request.app, request, url, gone)) for url in urls]
+    try:
+        results = await asyncio.gather(*(_within(item) for item in items))
+    finally:
+        watcher.cancel()
+        shared_connection.reset(token)
+        batch_user.reset(user_token)
+        late = [item for item in items if not item.done()]
+        if late:
+            # the connection goes back to the pool once the late items have finished with it
+            closing = asyncio.ensure_future(_close_after(late, shared))
+            _closing.add(closing)
+            closing.add_done_callback(_closing.discard)
+        else:
+            await run_in_threadpool(shared.close)
+
+    return {"responses": [{"path": item.path, **result} for item, result in zip(payload.requests, results)]}
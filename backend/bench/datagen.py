@@ -0,0 +1,323 @@
+"""Synthetic SkillBoard dataset generator matching schema.sql.
+
+Fills users (tenants), employees, employee_tech_stack, projects, tasks, reviews and
+project_to_tasks_map at configurable sizes, with realistic skew: tenant sizes follow a Zipf-like
+curve (a few heavy tenants, a long tail of small ones) and review counts per employee follow a
+Pareto tail. Rows are generated per tenant with NumPy and streamed to the database in batches with
+executemany (fast_executemany on SQL Server), never row by row.
+
+The same --seed and sizes always produce the same rows, so benchmark datasets can be rebuilt exactly.
+
+    cd backend
+    python -m bench.datagen --sqlite data/large.db --preset large --seed 1
+    python -m bench.datagen --sqlite data/custom.db --tenants 50 --employees 5000 --tasks 100000 --reviews 250000
+
+Every generated tenant can log in as tenantNNNN with the password "skillboard".
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRESETS = {
+    "small": dict(tenants=10, employees=1_000, projects=500, tasks=20_000, reviews=50_000),
+    "medium": dict(tenants=100, employees=10_000, projects=5_000, tasks=200_000, reviews=500_000),
+    "large": dict(tenants=1_000, employees=100_000, projects=50_000, tasks=2_000_000, reviews=5_000_000),
+}
+
+TECH_STACK = [
+    "Frontend Dev", "UI Design", "Design", "Feature", "Backend API", "Security Review",
+    "Database Setup", "Testing", "Planning", "Data Analysis", "Supervising",
+]
+ROLES = [
+    "Backend Developer", "Frontend Developer", "QA Engineer", "Designer", "Database Admin",
+    "Project Manager", "Feature Developer", "Supervisor", "Data Analyst", "UI Designer",
+]
+FIRST_NAMES = ["Ahsan", "Sara", "Zainab", "Tariq", "Sana", "Hamza", "Nida", "Faisal", "Bilal", "Aimen",
+               "Kiran", "Hassan", "Yasir", "Rabia", "Omer", "Shazia", "Naveed", "Mariam", "Zeeshan", "Amna"]
+LAST_NAMES = ["Ali", "Khan", "Hussain", "Aziz", "Malik", "Ahmed", "Noor", "Mehmood", "Rafiq", "Javed",
+              "Shah", "Farooq", "Iqbal", "Saeed", "Shafi", "Adeel", "Bhatti", "Zafar", "Haider", "Jamil"]
+CLIENTS = ["ABC Corp", "XYZ Ltd", "ShopEase", "TechStars", "Initech Solutions", "Uptick LLC",
+           "VisualSoft", "NextGenAI", "WaveTech", "MNO Pvt Ltd"]
+COMMENTS = ["Completed on time with good quality", "Excellent work", "Met requirements",
+            "Missed a few edge cases", "Great attention to detail", "Late submission", None]
+RATING_P = [0.05, 0.10, 0.25, 0.35, 0.25]
+
+BASE_DATE = np.datetime64("2023-01-01")
+DATE_SPAN_DAYS = 3 * 365
+
+
+def tenant_weights(n, skew):
+    ranks = np.arange(1, n + 1, dtype=np.float64)
+    w = 1.0 / ranks ** skew
+    return w / w.sum()
+
+
+def allocate(total, weights, rng, minimum=0):
+    """Split total across tenants by weight, giving each tenant at least `minimum`."""
+    n = len(weights)
+    base = np.full(n, minimum, dtype=np.int64)
+    remaining = max(total - minimum * n, 0)
+    return base + rng.multinomial(remaining, weights)
+
+
+def iso_dates(days):
+    return (BASE_DATE + days.astype("timedelta64[D]")).astype(str).tolist()
+
+
+class BatchWriter:
+    """Streams rows into one table with executemany, committing every `batch_size` rows."""
+
+    def __init__(self, conn, dialect, table, columns, batch_size, explicit_identity=False):
+        self.conn = conn
+        self.dialect = dialect
+        self.table = table
+        self.batch_size = batch_size
+        self.explicit_identity = explicit_identity
+        self.sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+        self.rows = 0
+
+    def write(self, rows):
+        cursor = self.conn.cursor()
+        if dialect_is_mssql(self.dialect):
+            cursor.fast_executemany = True
+        if self.explicit_identity:
+            self.dialect.identity_insert(cursor, self.table, True)
+        try:
+            rows = iter(rows)
+            while True:
+                batch = list(itertools.islice(rows, self.batch_size))
+                if not batch:
+                    break
+                cursor.executemany(self.sql, batch)
+                self.conn.commit()
+                self.rows += len(batch)
+        finally:
+            if self.explicit_identity:
+                self.dialect.identity_insert(cursor, self.table, False)
+            cursor.close()
+
+
+def dialect_is_mssql(dialect):
+    return dialect.name == "mssql"
+
+
+def next_id(cursor, table, column):
+    cursor.execute(f"SELECT COALESCE(MAX({column}), 0) FROM {table}")
+    return int(cursor.fetchone()[0]) + 1
+
+
+def ensure_reference_data(conn, dialect, project_types, rng):
+    cursor = conn.cursor()
+    cursor.execute("SELECT tech_stack_id, tech_stack_name FROM tech_stack")
+    existing = {row[1] for row in cursor.fetchall()}
+    missing = [(name,) for name in TECH_STACK if name not in existing]
+    if missing:
+        cursor.executemany("INSERT INTO tech_stack (tech_stack_name) VALUES (?)", missing)
+    cursor.execute("SELECT tech_stack_id FROM tech_stack ORDER BY tech_stack_id")
+    tech_ids = np.array([row[0] for row in cursor.fetchall()], dtype=np.int64)
+
+    cursor.execute("SELECT DISTINCT project_type FROM project_to_tasks_map")
+    have = {row[0] for row in cursor.fetchall()}
+    preset_rows = []
+    for i in range(project_types):
+        name = f"Generated Type {i + 1:03d}"
+        if name in have:
+            continue
+        for tech in rng.choice(tech_ids, size=int(rng.integers(3, 7)), replace=False):
+            preset_rows.append((name, int(tech), int(rng.integers(2, 12)), int(rng.integers(3, 21))))
+    if preset_rows:
+        cursor.executemany(
+            "INSERT INTO project_to_tasks_map (project_type, tech_stack_id, estimated_hours, deadline_offset) "
+            "VALUES (?, ?, ?, ?)", preset_rows)
+    conn.commit()
+    cursor.close()
+    return tech_ids
+
+
+def generate(conn, dialect, sizes, seed, batch_size=5000, skew=1.1, project_types=20, log=print):
+    master = np.random.default_rng(seed)
+    tech_ids = ensure_reference_data(conn, dialect, project_types, master)
+
+    cursor = conn.cursor()
+    user_id0 = next_id(cursor, "users", "user_id")
+    employee_id0 = next_id(cursor, "employees", "employee_id")
+    project_id0 = next_id(cursor, "projects", "project_id")
+    task_id0 = next_id(cursor, "tasks", "task_id")
+    review_id0 = next_id(cursor, "reviews", "review_id")
+    cursor.close()
+
+    n_tenants = sizes["tenants"]
+    weights = tenant_weights(n_tenants, skew)
+    master.shuffle(weights)  # heavy tenants aren't always the first user ids
+    employees_per = allocate(sizes["employees"], weights, master, minimum=1)
+    projects_per = allocate(sizes["projects"], weights, master, minimum=1)
+    tasks_per = allocate(sizes["tasks"], weights, master)
+    reviews_per = allocate(sizes["reviews"], weights, master)
+
+    from passlib.context import CryptContext
+    password_hash = CryptContext(schemes=["bcrypt"], deprecated="auto").hash("skillboard")
+
+    writers = {
+        "users": BatchWriter(conn, dialect, "users", ("user_id", "username", "hashed_password"), batch_size, True),
+        "employees": BatchWriter(conn, dialect, "employees",
+                                 ("employee_id", "employee_name", "role", "weekly_hours", "user_id"), batch_size),
+        "employee_tech_stack": BatchWriter(conn, dialect, "employee_tech_stack",
+                                           ("employee_id", "tech_stack_id"), batch_size),
+        "projects": BatchWriter(conn, dialect, "projects",
+                                ("project_id", "project_name", "client_name", "start_date", "deadline", "user_id"),
+                                batch_size, True),
+        "tasks": BatchWriter(conn, dialect, "tasks",
+                             ("task_id", "employee_id", "estimated_hours", "start_date", "deadline",
+                              "tech_stack_id", "project_id", "completed", "user_id"), batch_size, True),
+        "reviews": BatchWriter(conn, dialect, "reviews",
+                               ("review_id", "employee_id", "task_id", "rating", "comment", "reviewed_at"),
+                               batch_size, True),
+    }
+
+    writers["users"].write(
+        (user_id0 + t, f"tenant{user_id0 + t:04d}", password_hash) for t in range(n_tenants)
+    )
+
+    started = time.perf_counter()
+    employee_next, project_next, task_next, review_next = employee_id0, project_id0, task_id0, review_id0
+    for t in range(n_tenants):
+        rng = np.random.default_rng([seed, t])  # per-tenant stream: independent of batch size and order
+        user_id = user_id0 + t
+        n_emp, n_proj, n_task, n_rev = (int(employees_per[t]), int(projects_per[t]),
+                                         int(tasks_per[t]), int(reviews_per[t]))
+
+        # 👨‍💻 employees + skills
+        emp_ids = np.arange(employee_next, employee_next + n_emp)
+        employee_next += n_emp
+        first = rng.integers(0, len(FIRST_NAMES), n_emp)
+        last = rng.integers(0, len(LAST_NAMES), n_emp)
+        roles = rng.integers(0, len(ROLES), n_emp)
+        weekly = rng.choice([30, 35, 38, 40, 40, 40], n_emp)
+        writers["employees"].write(
+            (int(e), f"{FIRST_NAMES[f]} {LAST_NAMES[l]}", ROLES[r], int(w), user_id)
+            for e, f, l, r, w in zip(emp_ids, first, last, roles, weekly)
+        )
+        # 1-4 distinct skills each: a random permutation of tech ids per row, keep the first k
+        order = np.argsort(rng.random((n_emp, len(tech_ids))), axis=1)[:, :4]
+        keep = np.arange(4) < rng.integers(1, 5, n_emp)[:, None]
+        rows, cols = np.nonzero(keep)
+        writers["employee_tech_stack"].write(
+            zip(emp_ids[rows].tolist(), tech_ids[order[rows, cols]].tolist())
+        )
+
+        # 🏗 projects
+        proj_ids = np.arange(project_next, project_next + n_proj)
+        project_next += n_proj
+        proj_start = rng.integers(0, DATE_SPAN_DAYS, n_proj)
+        proj_end = proj_start + rng.integers(14, 180, n_proj)
+        clients = rng.integers(0, len(CLIENTS), n_proj)
+        writers["projects"].write(
+            (int(p), f"Project {int(p)}", CLIENTS[c], s, d, user_id)
+            for p, c, s, d in zip(proj_ids, clients, iso_dates(proj_start), iso_dates(proj_end))
+        )
+
+        # 🧩 tasks — ~75% assigned, ~45% completed
+        task_ids = np.arange(task_next, task_next + n_task)
+        task_next += n_task
+        task_proj = rng.integers(0, n_proj, n_task)
+        task_start = proj_start[task_proj] + rng.integers(0, 10, n_task)
+        task_end = task_start + rng.integers(2, 30, n_task)
+        assigned = rng.random(n_task) < 0.75
+        task_emp = np.where(assigned, emp_ids[rng.integers(0, n_emp, n_task)], 0)
+        completed = (rng.random(n_task) < 0.45).astype(np.int64)
+        hours = rng.integers(1, 13, n_task)
+        task_tech = rng.choice(tech_ids, n_task)
+        writers["tasks"].write(
+            (tid, emp or None, h, s, d, tech, pid, done, user_id)
+            for tid, emp, h, s, d, tech, pid, done in zip(
+                task_ids.tolist(), task_emp.tolist(), hours.tolist(), iso_dates(task_start), iso_dates(task_end),
+                task_tech.tolist(), proj_ids[task_proj].tolist(), completed.tolist())
+        )
+
+        # ⭐ reviews — long tail: a few employees collect most of them
+        assigned_idx = np.flatnonzero(assigned)
+        if n_rev and len(assigned_idx):
+            emp_weight = rng.pareto(1.2, n_emp) + 0.05
+            task_weight = emp_weight[task_emp[assigned_idx] - emp_ids[0]]
+            picks = assigned_idx[rng.choice(len(assigned_idx), size=n_rev, p=task_weight / task_weight.sum())]
+            review_ids = np.arange(review_next, review_next + n_rev)
+            review_next += n_rev
+            ratings = rng.choice(np.arange(1, 6), n_rev, p=RATING_P)
+            comments = rng.integers(0, len(COMMENTS), n_rev)
+            reviewed = iso_dates(task_end[picks] + rng.integers(0, 7, n_rev))
+            writers["reviews"].write(
+                (rid, emp, tid, rating, COMMENTS[c], f"{day} 12:00:00")
+                for rid, emp, tid, rating, c, day in zip(
+                    review_ids.tolist(), task_emp[picks].tolist(), task_ids[picks].tolist(),
+                    ratings.tolist(), comments.tolist(), reviewed)
+            )
+
+        if (t + 1) % max(1, n_tenants // 20) == 0 or t + 1 == n_tenants:
+            total = sum(w.rows for w in writers.values())
+            elapsed = time.perf_counter() - started
+            log(f"  tenants {t + 1}/{n_tenants}: {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+
+    # summary tables the API maintains on every write have to be derived once after a bulk load
+    from src import employeeLoad, trendRollups
+
+    cursor = conn.cursor()
+    if dialect.table_exists(cursor, "employee_load"):
+        log(f"  employee_load: {employeeLoad.rebuild(conn):,} counters rebuilt")
+    if dialect.table_exists(cursor, "trend_rollups"):
+        # generated tasks carry no completion or creation day: the deadline and start date stand in,
+        # like migrations 0005 and 0008 do
+        cursor.execute("UPDATE tasks SET completed_at = deadline WHERE completed = 1 AND completed_at IS NULL")
+        cursor.execute("UPDATE tasks SET created_at = start_date WHERE created_at IS NULL")
+        log(f"  trend_rollups: {trendRollups.rebuild(cursor):,} rows rebuilt")
+        conn.commit()
+
+    return {name: w.rows for name, w in writers.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="small")
+    for name in ("tenants", "employees", "projects", "tasks", "reviews"):
+        parser.add_argument(f"--{name}", type=int, help=f"override the preset's {name} count")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for tenant sizes")
+    parser.add_argument("--project-types", type=int, default=20, help="generated project_to_tasks_map types")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--sqlite", help="write into this SQLite file (created from schema.sql if missing)")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    if args.sqlite:
+        os.makedirs(os.path.dirname(os.path.abspath(args.sqlite)), exist_ok=True)
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = args.sqlite
+        os.environ.setdefault("SQLITE_SEED", "0")
+    from src.dbConnect import backend
+
+    sizes = dict(PRESETS[args.preset])
+    for name in sizes:
+        if getattr(args, name) is not None:
+            sizes[name] = getattr(args, name)
+
+    conn = backend.connect()
+    if backend.dialect.name == "sqlite":
+        conn.execute("PRAGMA synchronous=OFF")  # bulk load: durability of half-written data doesn't matter
+    print(f"Generating {sizes} with seed {args.seed}")
+    started = time.perf_counter()
+    counts = generate(conn, backend.dialect, sizes, args.seed, args.batch_size, args.skew, args.project_types)
+    conn.close()
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    print(f"Done: {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    for table, rows in counts.items():
+        print(f"  {table:<22}{rows:>12,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Measure how an /analytics burst affects /auth/login and CRUD latency, with and without the
+per-subsystem executors (src/executors.py).
+
+Runs the app in-process on the SQLite backend, once with EXECUTORS_ENABLED=0 (every handler on
+Starlette's shared threadpool) and once with the executors, then prints both side by side.
+
+    cd backend
+    python -m bench.executor_isolation --analytics 60 --logins 10 --tasks 40000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[k]
+
+
+def prepare_database(path, tasks, employees):
+    """Sample schema.sql data plus enough extra tasks for /analytics to do real work."""
+    from passlib.context import CryptContext
+    from src import employeeLoad, trendRollups
+    from src.dbBackends import SQLiteBackend
+
+    conn = SQLiteBackend(path).connect()
+    cursor = conn.cursor()
+    rng = random.Random(7)
+    cursor.executemany(
+        "INSERT INTO employees (employee_id, employee_name, role, weekly_hours, user_id) VALUES (?, ?, ?, ?, 1)",
+        [(1000 + i, f"Bench {i}", "Backend Developer", 40) for i in range(employees)],
+    )
+    cursor.executemany(
+        "INSERT INTO tasks (employee_id, estimated_hours, start_date, deadline, tech_stack_id, project_id, completed, user_id) "
+        "VALUES (?, ?, '2025-06-01', '2025-07-01', ?, ?, ?, 1)",
+        [(1000 + rng.randrange(employees), rng.randint(1, 8), rng.randint(1, 11), rng.randint(1, 10), rng.random() < 0.4)
+         for _ in range(tasks)],
+    )
+    hashed = CryptContext(schemes=["bcrypt"], deprecated="auto").hash("bench")
+    cursor.execute("INSERT INTO users (username, hashed_password) VALUES ('bench', ?)", (hashed,))
+    conn.commit()
+    employeeLoad.rebuild(conn)
+    cursor.execute("UPDATE tasks SET completed_at = deadline WHERE completed = 1 AND completed_at IS NULL")
+    cursor.execute("UPDATE tasks SET created_at = start_date WHERE created_at IS NULL")
+    trendRollups.rebuild(cursor)
+    conn.commit()
+    conn.close()
+
+
+async def run_scenario(analytics_burst, logins, crud_calls):
+    import httpx
+    import main
+
+    main.pool.warm()
+    token = main.create_access_token({"sub": "1"})
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = {"analytics": [], "login": [], "crud": []}
+    statuses = {}
+
+    async with httpx.AsyncClient(app=main.app, base_url="http://bench", timeout=120) as client:
+        async def call(kind, method, path, **kw):
+            start = time.perf_counter()
+            r = await client.request(method, path, **kw)
+            latencies[kind].append(time.perf_counter() - start)
+            statuses.setdefault(kind, {}).setdefault(str(r.status_code), 0)
+            statuses[kind][str(r.status_code)] += 1
+
+        async def login_trickle():
+            await asyncio.sleep(0.05)  # let the burst land first
+            for _ in range(logins):
+                await call("login", "POST", "/auth/login", data={"username": "bench", "password": "bench"})
+
+        async def crud_trickle():
+            await asyncio.sleep(0.05)
+            for _ in range(crud_calls):
+                await call("crud", "GET", "/projects", headers=headers)
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *[call("analytics", "GET", "/analytics", headers=headers) for _ in range(analytics_burst)],
+            login_trickle(),
+            crud_trickle(),
+        )
+        elapsed = time.perf_counter() - started
+
+    def summary(values):
+        return {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50) * 1000, 1) if values else None,
+            "p95_ms": round(percentile(values, 95) * 1000, 1) if values else None,
+            "max_ms": round(max(values) * 1000, 1) if values else None,
+        }
+
+    total = sum(len(v) for v in latencies.values())
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_s": round(total / elapsed, 1),
+        "latency": {kind: summary(values) for kind, values in latencies.items()},
+        "status": statuses,
+    }
+
+
+def child(args):
+    result = asyncio.run(run_scenario(args.analytics, args.logins, args.crud))
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--analytics", type=int, default=60, help="concurrent /analytics requests in the burst")
+    parser.add_argument("--logins", type=int, default=10, help="sequential /auth/login calls during the burst")
+    parser.add_argument("--crud", type=int, default=20, help="sequential GET /projects calls during the burst")
+    parser.add_argument("--tasks", type=int, default=40000, help="extra tasks loaded for user 1")
+    parser.add_argument("--employees", type=int, default=500, help="extra employees loaded for user 1")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args)
+
+    sys.path.insert(0, BACKEND_DIR)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        prepare_database(path, args.tasks, args.employees)
+        results = {}
+        for label, enabled in (("shared threadpool", "0"), ("per-subsystem executors", "1")):
+            env = dict(os.environ, DB_BACKEND="sqlite", SQLITE_PATH=path, EXECUTORS_ENABLED=enabled)
+            out = subprocess.run(
+                [sys.executable, "-m", "bench.executor_isolation", "--child",
+                 "--analytics", str(args.analytics), "--logins", str(args.logins), "--crud", str(args.crud)],
+                cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+            )
+            results[label] = json.loads(out.stdout.strip().splitlines()[-1])
+
+    for label, result in results.items():
+        print(f"\n== {label}: {result['elapsed_s']}s, {result['requests_per_s']} req/s")
+        for kind, s in result["latency"].items():
+            print(f"   {kind:<10} n={s['count']:<4} p50={s['p50_ms']}ms p95={s['p95_ms']}ms max={s['max_ms']}ms "
+                  f"status={result['status'].get(kind)}")
+
+
+if __name__ == "__main__":
+    main()
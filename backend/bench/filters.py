@@ -0,0 +1,224 @@
+"""Latency and query plans of the /employees and /tasks filters on a 100k-employee dataset.
+
+Runs the app in-process (response cache off, so every request hits the database) against the
+largest tenant of the dataset, times each filter combination, and EXPLAINs the statements it ran.
+A plan that scans employees, tasks, reviews or employee_tech_stack without an index is flagged:
+every supported filter combination is meant to start from an index seek.
+
+    cd backend
+    python -m bench.filters --sqlite data/filters.db             # generates the dataset on first use
+    python -m bench.filters --sqlite data/filters.db --repeat 50 --out filters.json
+    python -m bench.filters --sqlite data/filters.db --plans     # print every plan, not just flagged ones
+
+Exits with status 1 when a scenario's plan has a full scan.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 100k employees like the "large" preset, with fewer tasks and reviews so the dataset builds in minutes
+DATASET = dict(tenants=1_000, employees=100_000, projects=20_000, tasks=500_000, reviews=500_000)
+
+SCANNED_TABLES = ("employees", "tasks", "reviews", "employee_tech_stack")
+
+
+def scenarios(ids):
+    today = "2025-06-01"
+    return [
+        ("employees: all", "/employees", {}),
+        ("employees: page of 50", "/employees", {"limit": 50}),
+        ("employees: role", "/employees", {"role": ids["role"], "limit": 50}),
+        ("employees: skill", "/employees", {"tech_stack_id": ids["tech_stack_id"], "limit": 50}),
+        ("employees: load 80%+", "/employees", {"min_load_pct": 80, "limit": 50}),
+        ("employees: load 0-20%", "/employees", {"max_load_pct": 20, "limit": 50}),
+        ("employees: rating 4+", "/employees", {"min_rating": 4, "limit": 50}),
+        ("employees: role+skill+rating", "/employees",
+         {"role": ids["role"], "tech_stack_id": ids["tech_stack_id"], "min_rating": 3, "limit": 50}),
+        ("employees: skill, by load", "/employees",
+         {"tech_stack_id": ids["tech_stack_id"], "sort": "-current_load", "limit": 50}),
+        ("tasks: open", "/tasks", {"completed": "false", "limit": 50}),
+        ("tasks: open, due in window", "/tasks",
+         {"completed": "false", "deadline_from": today, "deadline_to": "2025-07-01", "limit": 50}),
+        ("tasks: unassigned by skill", "/tasks",
+         {"assigned": "false", "tech_stack_id": ids["tech_stack_id"], "limit": 50}),
+        ("tasks: one employee", "/tasks", {"employee_id": ids["employee_id"], "limit": 50}),
+        ("tasks: overdue, by deadline", "/tasks",
+         {"completed": "false", "deadline_to": today, "sort": "deadline", "limit": 50}),
+        ("project tasks: open", f"/projects/{ids['project_id']}/tasks", {"completed": "false"}),
+    ]
+
+
+def full_scans(dialect_name, plan):
+    """Tables the plan reads end to end instead of seeking into an index."""
+    if not isinstance(plan, str):
+        return []
+    scanned = set()
+    if dialect_name == "sqlite":
+        # "SCAN e" / "SCAN tasks" without "USING ... INDEX" is a table scan
+        for line in plan.splitlines():
+            m = re.match(r"\s*SCAN (\w+)(?: AS (\w+))?(.*)", line)
+            if m and "INDEX" not in m.group(3):
+                scanned.add(m.group(1))
+    else:
+        for m in re.finditer(r'PhysicalOp="(Table Scan|Clustered Index Scan|Index Scan)".*?Table="\[(\w+)\]"', plan, re.S):
+            scanned.add(m.group(2))
+    return sorted(scanned)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))]
+
+
+def pick_ids(cursor, user_id):
+    cursor.execute("SELECT role, COUNT(*) FROM employees WHERE user_id = ? GROUP BY role ORDER BY COUNT(*) DESC", (user_id,))
+    role = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT ets.tech_stack_id, COUNT(*) FROM employee_tech_stack ets
+        JOIN employees e ON ets.employee_id = e.employee_id
+        WHERE e.user_id = ? GROUP BY ets.tech_stack_id ORDER BY COUNT(*) DESC
+    """, (user_id,))
+    tech_stack_id = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT t.employee_id, COUNT(*) FROM tasks t JOIN projects p ON t.project_id = p.project_id
+        WHERE p.user_id = ? AND t.employee_id IS NOT NULL GROUP BY t.employee_id ORDER BY COUNT(*) DESC
+    """, (user_id,))
+    employee_id = cursor.fetchone()[0]
+    cursor.execute("""
+        SELECT p.project_id, COUNT(*) FROM tasks t JOIN projects p ON t.project_id = p.project_id
+        WHERE p.user_id = ? GROUP BY p.project_id ORDER BY COUNT(*) DESC
+    """, (user_id,))
+    project_id = cursor.fetchone()[0]
+    return {"role": role, "tech_stack_id": tech_stack_id, "employee_id": employee_id, "project_id": project_id}
+
+
+def run(args):
+    from fastapi.testclient import TestClient
+
+    import main
+    from src import queryStats
+
+    # keep each request's statements (sql, seconds, rows, params) for EXPLAIN
+    captured = []
+    record = queryStats.query_stats.record
+
+    def capture(key, counter, seconds):
+        captured.append(list(counter.log))
+        record(key, counter, seconds)
+
+    queryStats.query_stats.record = capture
+
+    conn = main.pool.acquire()
+    cursor = conn.cursor()
+    user_id = args.user_id
+    if user_id is None:
+        cursor.execute("SELECT user_id FROM employees GROUP BY user_id ORDER BY COUNT(*) DESC")
+        user_id = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM employees")
+    total_employees = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM employees WHERE user_id = ?", (user_id,))
+    tenant_employees = cursor.fetchone()[0]
+    ids = pick_ids(cursor, user_id)
+    print(f"📊 {total_employees:,} employees; tenant {user_id} has {tenant_employees:,}. Filters use {ids}")
+
+    client = TestClient(main.app)
+    headers = {"Authorization": f"Bearer {main.create_access_token({'sub': str(user_id)})}"}
+    results, flagged = [], 0
+    for name, path, params in scenarios(ids):
+        client.get(path, headers=headers, params=params)  # warm-up
+        captured.clear()
+        times = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            response = client.get(path, headers=headers, params=params)
+            times.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise SystemExit(f"{name}: {path} answered {response.status_code}: {response.text[:200]}")
+        body = response.json()
+        items = body["items"] if isinstance(body, dict) else body
+
+        # plan of the costliest statement of the last request
+        log = captured[-1] if captured else []
+        sql, seconds, rows, stmt_params = max(log, key=lambda entry: entry[1]) if log else (None, 0, 0, None)
+        plan = main.dialect.explain(cursor, sql, tuple(stmt_params or ())) if sql else None
+        scans = [table for table in full_scans(main.dialect.name, plan) if table in SCANNED_TABLES]
+        flagged += bool(scans)
+
+        result = {
+            "scenario": name,
+            "path": path,
+            "params": params,
+            "items": len(items),
+            "total_estimate": body.get("total_estimate") if isinstance(body, dict) else None,
+            "p50_ms": round(percentile(times, 50), 2),
+            "p95_ms": round(percentile(times, 95), 2),
+            "statements": len(log),
+            "slowest_statement_ms": round(seconds * 1000, 2),
+            "full_scans": scans,
+            "plan": plan,
+        }
+        results.append(result)
+        print(f"{'⚠️' if scans else '✅'} {name:<32} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms"
+              f"  {result['items']:>6} items  {len(log)} stmts"
+              + (f"  full scan: {', '.join(scans)}" if scans else ""))
+        if plan and (scans or args.plans):
+            print("   " + str(plan).replace("\n", "\n   "))
+
+    conn.close()
+    return {
+        "db_backend": main.dialect.name,
+        "employees": total_employees,
+        "tenant": user_id,
+        "tenant_employees": tenant_employees,
+        "repeat": args.repeat,
+        "scenarios": results,
+        "flagged": flagged,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sqlite", help="SQLite dataset (generated with 100k employees if the file doesn't exist)")
+    parser.add_argument("--user-id", type=int, help="tenant to query (default: the one with the most employees)")
+    parser.add_argument("--repeat", type=int, default=20, help="timed requests per scenario")
+    parser.add_argument("--plans", action="store_true", help="print every plan, not only flagged ones")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(BACKEND_DIR)
+    os.environ["RESPONSE_CACHE_ENABLED"] = "0"
+    os.environ.setdefault("SLOW_QUERY_MS", "0")
+    if args.sqlite:
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = os.path.abspath(args.sqlite)
+        if not os.path.exists(args.sqlite):
+            from bench import datagen
+
+            os.environ.setdefault("SQLITE_SEED", "0")
+            from src.dbConnect import backend
+
+            conn = backend.connect()
+            conn.execute("PRAGMA synchronous=OFF")
+            print(f"Generating {DATASET} into {args.sqlite}")
+            datagen.generate(conn, backend.dialect, DATASET, args.seed)
+            backend.dialect.refresh_statistics(conn.cursor())
+            conn.commit()
+            conn.close()
+
+    report = run(args)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2, default=str)
+        print(f"📝 Report written to {args.out}")
+    sys.exit(1 if report["flagged"] else 0)
+
+
+if __name__ == "__main__":
+    main()
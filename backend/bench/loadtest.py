@@ -0,0 +1,262 @@
+"""End-to-end load benchmark for the SkillBoard API.
+
+Starts the FastAPI app in-process and replays the traffic of the React pages with N concurrent
+virtual users, then reports p50/p95/p99 latency, requests per second and DB statements per request
+for every route template. Results are written as JSON so runs can be compared.
+
+    cd backend
+    python -m bench.loadtest --concurrency 20 --duration 30 --out results/baseline.json
+    python -m bench.loadtest --concurrency 20 --duration 30 --compare results/baseline.json
+
+By default a fresh SQLite database seeded from schema.sql is used; pass --sqlite PATH to benchmark
+an existing file (e.g. one built by the dataset generator), or set DB_BACKEND yourself to run against
+SQL Server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# page name -> relative weight; mirrors what the frontend pages fetch on mount
+PAGE_WEIGHTS = {
+    "home": 3,
+    "project_list": 2,
+    "project_details": 3,
+    "employee_list": 2,
+    "employee_profile": 2,
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[k]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # route template -> list of (seconds, status, statements)
+
+    def add(self, template, seconds, status, statements):
+        self.samples.setdefault(template, []).append((seconds, status, statements))
+
+    def report(self, elapsed):
+        routes = {}
+        all_latencies = []
+        for template, samples in sorted(self.samples.items()):
+            latencies = [s[0] for s in samples]
+            all_latencies.extend(latencies)
+            routes[template] = {
+                "requests": len(samples),
+                "errors": sum(1 for s in samples if s[1] >= 400),
+                "rps": round(len(samples) / elapsed, 2),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+                "db_queries_per_request": round(sum(s[2] for s in samples) / len(samples), 2),
+            }
+        total = len(all_latencies)
+        return {
+            "overall": {
+                "requests": total,
+                "errors": sum(r["errors"] for r in routes.values()),
+                "rps": round(total / elapsed, 2) if elapsed else 0,
+                "p50_ms": round(percentile(all_latencies, 50) * 1000, 2) if total else None,
+                "p95_ms": round(percentile(all_latencies, 95) * 1000, 2) if total else None,
+                "p99_ms": round(percentile(all_latencies, 99) * 1000, 2) if total else None,
+            },
+            "routes": routes,
+        }
+
+
+class VirtualUser:
+    def __init__(self, client, headers, recorder, ids, rng, write_ratio):
+        self.client = client
+        self.headers = headers
+        self.recorder = recorder
+        self.ids = ids
+        self.rng = rng
+        self.write_ratio = write_ratio
+
+    async def call(self, method, template, **params):
+        path = template.format(**params)
+        start = time.perf_counter()
+        response = await self.client.request(method, path, headers=self.headers)
+        elapsed = time.perf_counter() - start
+        statements = int(response.headers.get("X-DB-Queries", 0))  # set by src/queryStats.py
+        self.recorder.add(f"{method} {template}", elapsed, response.status_code, statements)
+        return response
+
+    async def home(self):
+        await asyncio.gather(
+            self.call("GET", "/analytics"),
+            self.call("GET", "/stats/dashboard"),
+            self.call("GET", "/stats/dept-workload"),
+            self.call("GET", "/stats/projects"),
+        )
+
+    async def project_list(self):
+        await asyncio.gather(self.call("GET", "/projects"), self.call("GET", "/stats/projects"))
+
+    async def project_details(self):
+        project_id = self.rng.choice(self.ids["projects"])
+        _, _, tasks = await asyncio.gather(
+            self.call("GET", "/projects/{project_id}", project_id=project_id),
+            self.call("GET", "/tech_stack"),
+            self.call("GET", "/projects/{project_id}/tasks", project_id=project_id),
+        )
+        task_ids = [t["task_id"] for t in tasks.json()] if tasks.status_code == 200 else []
+        # ProjectDetails.js fetches candidates for every task when the page loads
+        await asyncio.gather(*[
+            self.call("GET", "/tasks/{task_id}/candidates", task_id=task_id) for task_id in task_ids
+        ])
+        if task_ids and self.rng.random() < self.write_ratio:
+            task_id = self.rng.choice(task_ids)
+            await self.call("PATCH", "/tasks/{task_id}/toggle-completion", task_id=task_id)
+            await self.call("PATCH", "/tasks/{task_id}/toggle-completion", task_id=task_id)  # restore
+
+    async def employee_list(self):
+        await self.call("GET", "/employees")
+
+    async def employee_profile(self):
+        employee_id = self.rng.choice(self.ids["employees"])
+        await asyncio.gather(
+            self.call("GET", "/employees/{employee_id}", employee_id=employee_id),
+            self.call("GET", "/employees/{employee_id}/suggested_tasks", employee_id=employee_id),
+        )
+
+    async def run(self, stop_at, max_pages):
+        pages = list(PAGE_WEIGHTS)
+        weights = [PAGE_WEIGHTS[p] for p in pages]
+        visited = 0
+        while time.perf_counter() < stop_at and (max_pages is None or visited < max_pages):
+            await getattr(self, self.rng.choices(pages, weights)[0])()
+            visited += 1
+
+
+async def run_load(args):
+    import httpx
+    import main
+
+    main.pool.warm()
+    headers = {"Authorization": f"Bearer {main.create_access_token({'sub': str(args.user_id)})}"}
+    recorder = Recorder()
+
+    async with httpx.AsyncClient(app=main.app, base_url="http://loadtest", timeout=120) as client:
+        projects = (await client.get("/projects", headers=headers)).json()
+        employees = (await client.get("/employees", headers=headers)).json()
+        if not projects or not employees:
+            raise SystemExit(f"User {args.user_id} has no projects/employees to browse")
+        ids = {"projects": [p["project_id"] for p in projects], "employees": [e["employee_id"] for e in employees]}
+
+        users = [
+            VirtualUser(client, headers, recorder, ids, random.Random(args.seed + i), args.write_ratio)
+            for i in range(args.concurrency)
+        ]
+        for user in users[:1]:  # warm-up pass, not recorded
+            await user.home()
+        recorder.samples.clear()
+
+        started = time.perf_counter()
+        await asyncio.gather(*[u.run(started + args.duration, args.pages) for u in users])
+        elapsed = time.perf_counter() - started
+
+    result = recorder.report(elapsed)
+    result["meta"] = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "db_backend": os.getenv("DB_BACKEND", "mssql"),
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 2),
+        "seed": args.seed,
+        "write_ratio": args.write_ratio,
+        "pool": main.pool.stats(),
+    }
+    return result
+
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_report(result, baseline=None):
+    base_routes = (baseline or {}).get("routes", {})
+    print(f"\n{'route':<48}{'req':>7}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'q/req':>7}")
+    for template, r in result["routes"].items():
+        line = (f"{template:<48}{r['requests']:>7}{r['rps']:>9}{r['p50_ms']:>9}{r['p95_ms']:>9}"
+                f"{r['p99_ms']:>9}{r['db_queries_per_request']:>7}")
+        if template in base_routes:
+            old = base_routes[template]["p95_ms"]
+            change = (r["p95_ms"] - old) / old * 100 if old else 0.0
+            line += f"   p95 {change:+.0f}% vs baseline"
+        if r["errors"]:
+            line += f"   ⚠️ {r['errors']} errors"
+        print(line)
+    o = result["overall"]
+    print(f"\noverall: {o['requests']} requests, {o['rps']} req/s, p50 {o['p50_ms']}ms, "
+          f"p95 {o['p95_ms']}ms, p99 {o['p99_ms']}ms, {o['errors']} errors")
+    if baseline:
+        b = baseline["overall"]
+        print(f"baseline: {b['requests']} requests, {b['rps']} req/s, p50 {b['p50_ms']}ms, "
+              f"p95 {b['p95_ms']}ms, p99 {b['p99_ms']}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=10, help="virtual users browsing in parallel")
+    parser.add_argument("--duration", type=float, default=20, help="seconds to run")
+    parser.add_argument("--pages", type=int, default=None, help="stop each user after this many page visits")
+    parser.add_argument("--user-id", type=int, default=1, help="tenant whose data is browsed")
+    parser.add_argument("--write-ratio", type=float, default=0.0,
+                        help="fraction of ProjectDetails visits that toggle a task's completion (and back)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sqlite", help="run on this SQLite file instead of a fresh seeded one")
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare against")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(BACKEND_DIR)
+    tmp = None
+    if args.sqlite or "DB_BACKEND" not in os.environ:
+        if not args.sqlite:
+            tmp = tempfile.TemporaryDirectory()
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = args.sqlite or os.path.join(tmp.name, "loadtest.db")
+
+    try:
+        result = asyncio.run(run_load(args))
+    finally:
+        if tmp:
+            tmp.cleanup()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+        print(f"\nsaved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# 🔬 debug_routes.py — views of the in-memory runtime stats, for the operators of this process
+import hmac
+import ipaddress
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+from auth_utils import get_current_user
+from src.capacityTimeline import capacity_timeline
+from src.metrics import render
+from src.queryStats import query_stats
+from src.responseCache import response_cache
+from src.skillIndex import skill_index
+from src.simulation import simulation
+from src.slowQueries import slow_query_log
+from src.taskSuggestions import task_suggestions
+
+router = APIRouter()
+
+# these stats span every tenant, so they are off by default and then only open to the listed users
+DEBUG_ROUTES_ENABLED = os.getenv("DEBUG_ROUTES_ENABLED", "0") != "0"
+DEBUG_ADMIN_USER_IDS = {int(user_id) for user_id in os.getenv("DEBUG_ADMIN_USER_IDS", "").split(",") if user_id.strip()}
+
+# /metrics answers scrapers that send `Authorization: Bearer $METRICS_TOKEN` or connect from METRICS_ALLOW_IPS
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOW_IPS = [ipaddress.ip_network(net.strip(), strict=False)
+                     for net in os.getenv("METRICS_ALLOW_IPS", "").split(",") if net.strip()]
+
+
+def get_debug_admin(current_user: dict = Depends(get_current_user)):
+    if not DEBUG_ROUTES_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if current_user["user_id"] not in DEBUG_ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail="Debug routes are for admins only")
+    return current_user
+
+
+def check_scraper(request: Request):
+    if METRICS_TOKEN:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+            return
+    if request.client and METRICS_ALLOW_IPS:
+        try:
+            address = ipaddress.ip_address(request.client.host)
+        except ValueError:
+            address = None
+        if address is not None and any(address in net for net in METRICS_ALLOW_IPS):
+            return
+    raise HTTPException(status_code=403, detail="Not allowed to scrape metrics")
+
+
+# ✅ SQL statements per route (count, time, rows), slowest routes first
+@router.get("/debug/queries")
+def debug_queries(limit: int = 10, current_user: dict = Depends(get_debug_admin)):
+    return query_stats.snapshot(limit=limit)
+
+
+# ✅ Start a fresh window; answers with the one it closes
+@router.post("/debug/queries/reset")
+def reset_debug_queries(request: Request, limit: int = 10, current_user: dict = Depends(get_debug_admin)):
+    request.state.read_only = True  # no tenant data changes, so leave the response cache alone
+    snapshot = query_stats.snapshot(limit=limit)
+    query_stats.reset()
+    return snapshot
+
+
+# 🐢 Most recent slow statements (same entries as the SLOW_QUERY_LOG file), newest first
+@router.get("/debug/slow-queries")
+def debug_slow_queries(limit: int = 20, current_user: dict = Depends(get_debug_admin)):
+    return list(reversed(slow_query_log.recent))[:limit]
+
+
+# 🗄️ Response cache size and hit ratio per route
+@router.get("/debug/response-cache")
+def debug_response_cache(current_user: dict = Depends(get_debug_admin)):
+    return response_cache.stats()
+
+
+@router.post("/debug/response-cache/clear")
+def clear_response_cache(request: Request, current_user: dict = Depends(get_debug_admin)):
+    request.state.read_only = True
+    stats = response_cache.stats()
+    response_cache.clear()
+    return stats
+
+
+# 🧭 Skill index: tenants and employees held in memory (POST .../clear reloads them on next use)
+@router.get("/debug/skill-index")
+def debug_skill_index(current_user: dict = Depends(get_debug_admin)):
+    return skill_index.stats()
+
+
+@router.post("/debug/skill-index/clear")
+def clear_skill_index(request: Request, current_user: dict = Depends(get_debug_admin)):
+    request.state.read_only = True
+    stats = skill_index.stats()
+    skill_index.clear()
+    return stats
+
+
+# 📅 Capacity timeline: tenants and bytes of hours-per-week arrays in memory (POST .../clear reloads them)
+@router.get("/debug/capacity-timeline")
+def debug_capacity_timeline(current_user: dict = Depends(get_debug_admin)):
+    return capacity_timeline.stats()
+
+
+@router.post("/debug/capacity-timeline/clear")
+def clear_capacity_timeline(request: Request, current_user: dict = Depends(get_debug_admin)):
+    request.state.read_only = True
+    stats = capacity_timeline.stats()
+    capacity_timeline.clear()
+    return stats
+
+
+# 💡 Task suggestions: unassigned tasks queued per tenant and tech stack (POST .../clear reloads them)
+@router.get("/debug/task-suggestions")
+def debug_task_suggestions(current_user: dict = Depends(get_debug_admin)):
+    return task_suggestions.stats()
+
+
+@router.post("/debug/task-suggestions/clear")
+def clear_task_suggestions(request: Request, current_user: dict = Depends(get_debug_admin)):
+    request.state.read_only = True
+    stats = task_suggestions.stats()
+    task_suggestions.clear()
+    return stats
+
+
+# 🧪 What-if snapshots: open tasks held per tenant for /simulate (POST .../clear reloads them)
+@router.get("/debug/simulation")
+def debug_simulation(current_user: dict = Depends(get_debug_admin)):
+    return simulation.stats()
+
+
+@router.post("/debug/simulation/clear")
+def clear_simulation(request: Request, current_user: dict = Depends(get_debug_admin)):
+    request.state.read_only = True
+    stats = simulation.stats()
+    simulation.clear()
+    return stats
+
+
+# 📈 Prometheus scrape target (text exposition format), for the scraper only: see check_scraper
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(check_scraper)])
+async def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
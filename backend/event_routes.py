@@ -0,0 +1,48 @@
+# 📡 event_routes.py — Server-Sent Events stream of the tenant's changes (src/changeFeed.py)
+import asyncio
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from auth_utils import STREAM_TOKEN_EXPIRE_SECONDS, create_stream_token, get_current_user, get_stream_user
+from src.changeFeed import change_hub, format_event
+
+router = APIRouter()
+
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "5000"))
+
+
+# 🎟️ A short-lived token for ?stream_token= on /events, so the main token never goes in a URL
+@router.post("/events/token")
+def events_token(request: Request, current_user: dict = Depends(get_current_user)):
+    request.state.read_only = True  # nothing is written, so keep the tenant's cached responses
+    return {"stream_token": create_stream_token(current_user["user_id"]), "expires_in": STREAM_TOKEN_EXPIRE_SECONDS}
+
+
+# 📡 Live changes: `changes` events carry merged deltas, `resync` means refetch everything
+@router.get("/events", response_class=StreamingResponse)
+async def events(request: Request, current_user: dict = Depends(get_stream_user)):
+    if change_hub.full():
+        raise HTTPException(status_code=503, detail="Too many open event streams, try again")
+    user_id = current_user["user_id"]
+    reconnected = request.headers.get("last-event-id") is not None
+
+    async def stream():
+        # subscribe inside the generator: its finally is what unsubscribes when the client goes away
+        subscriber = change_hub.subscribe(user_id)
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            if reconnected:
+                yield format_event("resync")  # no history is kept, so whatever was missed means refetch
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscriber.queue.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"  # comment line: keeps proxies from closing an idle stream
+        finally:
+            change_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -5,13 +5,21 @@ from io import BytesIO
 import pandas as pd
 import openpyxl
 from auth_utils import get_current_user
-from src.dbConnect import connect_to_db  # ✅ Use your existing MSSQL connection
+from src import changeFeed
+from src.dbConnect import get_db  # ✅ Pooled MSSQL connection
+from src.executors import offload
+from src.metrics import Counter
 
 router = APIRouter()
 
+# 📈 Spreadsheet traffic, exposed on /metrics
+excel_bytes = Counter("skillboard_excel_bytes_total", "Spreadsheet bytes uploaded/downloaded", ("direction", "sheet"))
+excel_rows = Counter("skillboard_excel_rows_total", "Spreadsheet rows imported/exported", ("direction", "sheet"))
+
 # ✅ Upload Employees
 @router.post("/upload/employees")
-def upload_employees(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
+@offload("imports")
+def upload_employees(file: UploadFile = File(...), current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     if not file.filename.endswith((".csv", ".xlsx")):
         return JSONResponse(status_code=400, content={"error": "Only .csv or .xlsx allowed"})
 
@@ -35,9 +43,6 @@ def upload_employees(file: UploadFile = File(...), current_user: dict = Depends(
         if not required_columns.issubset(df.columns):
             return JSONResponse(status_code=422, content={"error": f"Missing required headers: {required_columns}"})
 
-        conn = connect_to_db()
-        if conn is None:
-            return JSONResponse(status_code=500, content={"error": "Database connection failed"})
         cursor = conn.cursor()
 
         for _, row in df.iterrows():
@@ -46,19 +51,19 @@ def upload_employees(file: UploadFile = File(...), current_user: dict = Depends(
                 VALUES (?, ?, ?, ?)
             """, current_user["user_id"], row["employee_name"], row["role"], row["weekly_hours"])
 
+        changeFeed.touch(current_user["user_id"], "employees")
         conn.commit()
-        conn.close()
+        excel_bytes.inc("import", "employees", amount=len(contents))
+        excel_rows.inc("import", "employees", amount=len(df))
 
         return {"message": "Employees uploaded successfully."}
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
-@router.get("/download/employees")
-def download_employees(current_user: dict = Depends(get_current_user)):
+@router.get("/download/employees", response_class=StreamingResponse)
+@offload("imports")
+def download_employees(current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     try:
-        conn = connect_to_db()
-        if conn is None:
-            return JSONResponse(status_code=500, content={"error": "Database connection failed"})
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -88,6 +93,8 @@ def download_employees(current_user: dict = Depends(get_current_user)):
         with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
             df.to_excel(writer, index=False)
         buffer.seek(0)
+        excel_bytes.inc("export", "employees", amount=buffer.getbuffer().nbytes)
+        excel_rows.inc("export", "employees", amount=len(df))
 
         return StreamingResponse(buffer,
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
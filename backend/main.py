@@ -1,14 +1,31 @@
-from fastapi import FastAPI, HTTPException, Path, Body, Depends, status
-from pydantic import BaseModel, conint
-from datetime import datetime, timedelta
+import os
+import time
+from fastapi import FastAPI, HTTPException, Path, Body, Depends, Query, Request, status
+from pydantic import BaseModel, confloat, conint, constr
+from datetime import date, datetime, timedelta
 from typing import List, Optional
-import pyodbc
-from src.dbConnect import connect_to_db
+from src.dbConnect import get_db, pool, dialect
+from src.dbBackends import chunked
+from src import autoAssign, changeFeed, employeeLoad, taskChanges, trendRollups
+from src.executors import offload, shutdown_executors
+from src.queryStats import sql_instrumentation
+from src.slowQueries import slow_query_log
+from src.metrics import MetricsMiddleware
+from src.responseCache import cached_response, InvalidateOnWrite
+from src.changeFeed import PublishChanges
+from src.listQuery import ListParams, ListSpec, SortKey, list_params
+from src.skillIndex import skill_index
+from src.capacityTimeline import capacity_timeline, default_range
+from src.taskSuggestions import task_suggestions
+from src.simulation import SIMULATE_MAX_CHANGES, simulate, simulation
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm, HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from fastapi.responses import JSONResponse, Response
+from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from auth_utils import get_current_user, create_access_token, verify_password, get_password_hash
 from file_routes import router as file_router
+from debug_routes import router as debug_router
+from batch_routes import router as batch_router
+from event_routes import router as event_router
 
 app = FastAPI()
 app.add_middleware(
@@ -17,58 +34,44 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-DB-Queries", "ETag", "X-Cache"],
 )
+app.middleware("http")(sql_instrumentation)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(InvalidateOnWrite)
+app.add_middleware(PublishChanges)
 
 app.include_router(file_router)
+app.include_router(debug_router)
+app.include_router(batch_router)
+app.include_router(event_router)
 
-SECRET_KEY = "skillboard-secret-key"  # 🔐 brah
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
-
-auth_scheme = HTTPBearer()
+@app.on_event("startup")
+def warm_db_pool():
+    try:
+        pool.warm()
+    except Exception as e:
+        print("⚠️ Could not pre-open DB connections:", e)
 
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+@app.on_event("shutdown")
+def close_db_pool():
+    shutdown_executors()
+    slow_query_log.flush(timeout=2)  # plans are captured over the pool, so before it closes
+    pool.close_all()
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def create_access_token(data: dict, expires_delta: timedelta = None):
-    to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=15))
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
-def get_user_by_username(username: str):
-    conn = connect_to_db()
+def get_user_by_username(conn, username: str):
     cursor = conn.cursor()
     cursor.execute("SELECT user_id, username, hashed_password FROM users WHERE username = ?", (username,))
     row = cursor.fetchone()
-    conn.close()
     if row:
         return {"user_id": row[0], "username": row[1], "hashed_password": row[2]}
     return None
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(auth_scheme)):
-    token = credentials.credentials  # extract actual token
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        return {"user_id": int(user_id)}
-    except JWTError:
-        raise credentials_exception
-
 def calculate_employee_load(db, employee_id):
     result = db.execute(text("""
         SELECT SUM(hours_allocated) FROM employee_tasks
@@ -101,6 +104,29 @@ class TaskAssignmentRequest(BaseModel):
     hours: Optional[List[float]] = None
     start_date: Optional[str] = None
 
+class AssignBatchRequest(BaseModel):
+    assignments: List[TaskAssignmentRequest]
+    all_or_nothing: bool = False                    # one invalid item rejects the whole batch
+
+class SimulatedChange(BaseModel):
+    op: constr(regex="^(assign|unassign|hours|deadline)$")
+    task_id: int
+    employee_ids: Optional[List[int]] = None        # assign: one employee, or a split like /tasks/assign
+    hours: Optional[List[float]] = None             # assign: hours per employee of a split
+    estimated_hours: Optional[confloat(ge=0)] = None  # hours: the task's new estimate
+    deadline: Optional[str] = None                  # deadline: the new deadline...
+    shift_days: Optional[int] = None                # ...or the current one moved by this many days
+
+class SimulateRequest(BaseModel):
+    changes: List[SimulatedChange]
+    capacity_pct: conint(ge=1, le=200) = 100        # share of weekly_hours that counts as capacity
+
+class AutoAssignRequest(BaseModel):
+    dry_run: bool = False                           # solve and report, write nothing
+    start_date: Optional[str] = None                # set on the assigned tasks; keeps theirs if omitted
+    capacity_pct: conint(ge=1, le=200) = 100        # share of weekly_hours an employee may be loaded to
+    rating_weight: confloat(ge=0, le=1) = 0.25      # 0 = balance load only
+
 class TaskCreate(BaseModel):
     tech_stack_id: int
     estimated_hours: int
@@ -133,17 +159,37 @@ class ReviewOut(BaseModel):
 def read_root():
     return {"message": "SkillBoard backend is running!"}
 
+PROJECT_LIST = ListSpec(
+    "projects", "project_id",
+    {
+        "project_id": SortKey("project_id", False),
+        "project_name": SortKey("project_name", True),
+        "client_name": SortKey("client_name", True),
+        "start_date": SortKey("start_date", True),
+        "deadline": SortKey("deadline", True),
+    },
+    "project_id",
+    ("project_id", "project_name", "client_name", "start_date", "deadline"),
+)
+
+
+# 📄 Paging/sorting/fields: src/listQuery.py (?limit=&cursor=&sort=&fields=)
 @app.get("/projects")
-def get_projects(current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@cached_response
+@offload("crud")
+def get_projects(params: ListParams = Depends(list_params), current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
+    page = PROJECT_LIST.page(params)
+    user_id = current_user["user_id"]
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT project_id, project_name, client_name, start_date, deadline 
-        FROM projects WHERE user_id = ?
-    """, (current_user["user_id"],))
-    rows = cursor.fetchall()
-    conn.close()
-    return [
+    keyset, keyset_params = page.where()
+    limit, limit_params = page.limit_clause()
+    cursor.execute(f"""
+        SELECT project_id, project_name, client_name, start_date, deadline{page.columns}
+        FROM projects WHERE user_id = ? AND {keyset}
+        {page.order_by()} {limit}
+    """, [user_id] + keyset_params + limit_params)
+    rows, next_cursor = page.rows(cursor.fetchall())
+    items = [
         {
             "project_id": row[0],
             "project_name": row[1],
@@ -154,12 +200,18 @@ def get_projects(current_user: dict = Depends(get_current_user)):
         for row in rows
     ]
 
+    def count():
+        cursor.execute("SELECT COUNT(*) FROM projects WHERE user_id = ?", (user_id,))
+        return cursor.fetchone()[0]
+
+    return page.respond(items, next_cursor, user_id, (), count)
+
 
 
 @app.get("/projects/{project_id}")
-def get_project(project_id: int, current_user: dict = Depends(get_current_user)):
+@offload("crud")
+def get_project(project_id: int, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     try:
-        conn = connect_to_db()
         cursor = conn.cursor()
 
         # 🔐 Validate ownership
@@ -174,8 +226,6 @@ def get_project(project_id: int, current_user: dict = Depends(get_current_user))
 
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal Server Error")
-    finally:
-        conn.close()
 
 
 # @app.get("/projects/{project_id}/tasks")
@@ -212,33 +262,81 @@ def get_project(project_id: int, current_user: dict = Depends(get_current_user))
 #         } for row in rows
 #     ]
 
-@app.get("/projects/{project_id}/tasks")
-def get_tasks_by_project(project_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
-    cursor = conn.cursor()
+TASK_SORT_KEYS = {
+    "task_id": SortKey("t.task_id", False),
+    "deadline": SortKey("t.deadline", True),
+    "start_date": SortKey("t.start_date", True),
+    "estimated_hours": SortKey("t.estimated_hours", True),
+    "employee_name": SortKey("COALESCE(e.employee_name, '')", False),
+    "tech_stack_name": SortKey("ts.tech_stack_name", False),
+    "completed": SortKey("t.completed", True),
+}
+TASK_FIELDS = ("task_id", "employee_id", "employee_name", "estimated_hours", "start_date", "deadline",
+               "tech_stack_name", "completed")
+TASK_LIST = ListSpec("project_tasks", "t.task_id", TASK_SORT_KEYS, "task_id", TASK_FIELDS)
+TENANT_TASK_LIST = ListSpec(
+    "tasks", "t.task_id", dict(TASK_SORT_KEYS, project_id=SortKey("t.project_id", False)), "task_id",
+    ("project_id", "project_name") + TASK_FIELDS,
+)
 
-    cursor.execute("""
+
+def task_filters(completed, assigned, tech_stack_id, employee_id, deadline_from, deadline_to):
+    """WHERE terms (AND-ed, alias t) and params for the task list filters."""
+    terms, params = [], []
+    if completed is not None:
+        terms.append("t.completed = ?")  # ix_tasks_project_state: (project_id, completed, deadline)
+        params.append(1 if completed else 0)
+    if assigned is not None:
+        # deliberately not sargable: unassigned tasks are plentiful across all tenants, so seeking them
+        # by employee_id reads everyone's; the tenant's projects are the better way in
+        terms.append("COALESCE(t.employee_id, 0) <> 0" if assigned else "COALESCE(t.employee_id, 0) = 0")
+    if tech_stack_id is not None:
+        terms.append("t.tech_stack_id = ?")
+        params.append(tech_stack_id)
+    if employee_id is not None:
+        terms.append("t.employee_id = ?")  # ix_tasks_employee_completed
+        params.append(employee_id)
+    if deadline_from is not None:
+        terms.append("t.deadline >= ?")
+        params.append(deadline_from)
+    if deadline_to is not None:
+        terms.append("t.deadline <= ?")
+        params.append(deadline_to)
+    return terms, params
+
+
+def list_tasks(cursor, page, user_id, scope_sql, scope_params, filters, filter_params, with_project):
+    """Rows of one task page (keyset, filters, sort from page) plus the COUNT for total_estimate."""
+    keyset, keyset_params = page.where()
+    limit, limit_params = page.limit_clause()
+    # the employee name is the only thing the employees join is for
+    with_names = page.wants("employee_name") or page.key_name == "employee_name"
+    where = " AND ".join(["p.user_id = ?"] + scope_sql + filters)
+
+    cursor.execute(f"""
         SELECT 
             t.task_id,
             t.employee_id,
-            ISNULL(e.employee_name, '') AS employee_name,
+            {"COALESCE(e.employee_name, '')" if with_names else "''"} AS employee_name,
             t.estimated_hours,
             t.start_date,
             t.deadline,
             ts.tech_stack_name,
-            t.completed
+            t.completed,
+            t.project_id,
+            {"p.project_name" if with_project else "NULL"} AS project_name{page.columns}
         FROM tasks t
         JOIN projects p ON t.project_id = p.project_id
         JOIN tech_stack ts ON t.tech_stack_id = ts.tech_stack_id
-        LEFT JOIN employees e ON t.employee_id = e.employee_id
-        WHERE p.user_id = ? AND p.project_id = ?
-    """, (current_user["user_id"], project_id))
-
-    rows = cursor.fetchall()
-    conn.close()
-
-    return [
-        {
+        {"LEFT JOIN employees e ON t.employee_id = e.employee_id" if with_names else ""}
+        WHERE {where} AND {keyset}
+        {page.order_by()} {limit}
+    """, [user_id] + scope_params + filter_params + keyset_params + limit_params)
+
+    rows, next_cursor = page.rows(cursor.fetchall())
+    items = []
+    for row in rows:
+        item = {
             "task_id": row.task_id,
             "employee_id": row.employee_id,
             "employee_name": row.employee_name,
@@ -248,23 +346,88 @@ def get_tasks_by_project(project_id: int, current_user: dict = Depends(get_curre
             "tech_stack_name": row.tech_stack_name,
             "completed": bool(row.completed)
         }
-        for row in rows
-    ]
+        if with_project:
+            item = dict(project_id=row.project_id, project_name=row.project_name, **item)
+        items.append(item)
+
+    def count():
+        cursor.execute(f"""
+            SELECT COUNT(*)
+            FROM tasks t
+            JOIN projects p ON t.project_id = p.project_id
+            JOIN tech_stack ts ON t.tech_stack_id = ts.tech_stack_id
+            WHERE {where}
+        """, [user_id] + scope_params + filter_params)
+        return cursor.fetchone()[0]
+
+    return items, next_cursor, count
+
+
+# Filters: ?completed=&assigned=&tech_stack_id=&employee_id=&deadline_from=&deadline_to=
+@app.get("/projects/{project_id}/tasks")
+@cached_response
+@offload("crud")
+def get_tasks_by_project(
+    project_id: int,
+    completed: Optional[bool] = None,
+    assigned: Optional[bool] = None,
+    tech_stack_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    deadline_from: Optional[date] = None,
+    deadline_to: Optional[date] = None,
+    params: ListParams = Depends(list_params),
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
+    page = TASK_LIST.page(params)
+    filters, filter_params = task_filters(completed, assigned, tech_stack_id, employee_id, deadline_from, deadline_to)
+    items, next_cursor, count = list_tasks(conn.cursor(), page, current_user["user_id"], ["p.project_id = ?"],
+                                           [project_id], filters, filter_params, with_project=False)
+    scope = (project_id, completed, assigned, tech_stack_id, employee_id, deadline_from, deadline_to)
+    return page.respond(items, next_cursor, current_user["user_id"], scope, count)
+
+
+# 🔎 Every task of the tenant, across projects (same filters, plus project_id)
+@app.get("/tasks")
+@cached_response
+@offload("crud")
+def search_tasks(
+    project_id: Optional[int] = None,
+    completed: Optional[bool] = None,
+    assigned: Optional[bool] = None,
+    tech_stack_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    deadline_from: Optional[date] = None,
+    deadline_to: Optional[date] = None,
+    params: ListParams = Depends(list_params),
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
+    # always paged: a whole tenant's tasks is too much for one response
+    page = TENANT_TASK_LIST.page(params._replace(limit=params.limit or 100))
+    filters, filter_params = task_filters(completed, assigned, tech_stack_id, employee_id, deadline_from, deadline_to)
+    scope_sql, scope_params = (["p.project_id = ?"], [project_id]) if project_id is not None else ([], [])
+    items, next_cursor, count = list_tasks(conn.cursor(), page, current_user["user_id"], scope_sql, scope_params,
+                                           filters, filter_params, with_project=True)
+    scope = (project_id, completed, assigned, tech_stack_id, employee_id, deadline_from, deadline_to)
+    return page.respond(items, next_cursor, current_user["user_id"], scope, count)
 
 
 @app.post("/projects")
-def add_project(data: ProjectCreate, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def add_project(data: ProjectCreate, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         start_date = datetime.strptime(data.start_date, "%Y-%m-%d")
         deadline = datetime.strptime(data.deadline, "%Y-%m-%d")
-        cursor.execute("""
-            INSERT INTO projects (project_name, client_name, start_date, deadline, user_id)
-            OUTPUT INSERTED.project_id
-            VALUES (?, ?, ?, ?, ?)
-        """, (data.project_name, data.client_name, data.start_date, data.deadline, current_user["user_id"]))
-        project_id = cursor.fetchone()[0]
+        today = date.today().isoformat()
+        project_id = dialect.insert_returning_id(
+            cursor, "projects",
+            ("project_name", "client_name", "start_date", "deadline", "user_id"),
+            (data.project_name, data.client_name, data.start_date, data.deadline, current_user["user_id"]),
+            "project_id",
+        )
+        trendRollups.apply_project_change(cursor, current_user["user_id"], None, data.start_date)
 
         tech_ids_added = set()
 
@@ -278,79 +441,240 @@ def add_project(data: ProjectCreate, current_user: dict = Depends(get_current_us
 
             for tech_id, hours, offset in presets:
                 task_deadline = start_date + timedelta(days=offset)
-                cursor.execute("""
-                    INSERT INTO tasks (project_id, tech_stack_id, estimated_hours, deadline, employee_id, completed)
-                    VALUES (?, ?, ?, ?, NULL, 0)
-                """, (project_id, tech_id, hours, task_deadline.strftime('%Y-%m-%d')))
+                task_id = dialect.insert_returning_id(
+                    cursor, "tasks",
+                    ("project_id", "tech_stack_id", "estimated_hours", "deadline", "employee_id", "completed", "created_at"),
+                    (project_id, tech_id, hours, task_deadline.strftime('%Y-%m-%d'), None, 0, today),
+                    "task_id",
+                )
+                taskChanges.inserted(cursor, task_id)
                 tech_ids_added.add(tech_id)
 
         cursor.execute("SELECT tech_stack_id FROM tech_stack WHERE tech_stack_name = 'Supervising'")
         supervising_id = cursor.fetchone()[0]
 
         if data.project_type != "Other" and supervising_id not in tech_ids_added:
-            cursor.execute("""
-                INSERT INTO tasks (project_id, tech_stack_id, estimated_hours, deadline, employee_id, completed)
-                VALUES (?, ?, 2, ?, NULL, 0)
-            """, (project_id, supervising_id, deadline.strftime('%Y-%m-%d')))
+            task_id = dialect.insert_returning_id(
+                cursor, "tasks",
+                ("project_id", "tech_stack_id", "estimated_hours", "deadline", "employee_id", "completed", "created_at"),
+                (project_id, supervising_id, 2, deadline.strftime('%Y-%m-%d'), None, 0, today),
+                "task_id",
+            )
+            taskChanges.inserted(cursor, task_id)
 
+        changeFeed.touch(current_user["user_id"], "projects")
         conn.commit()
         return {"message": "Project and tasks created", "project_id": project_id}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail="Project creation failed")
-    finally:
-        conn.close()
         
+
+EMPLOYEE_EXTRAS = ("skills", "deadlines", "last_review")
+# keys each extra adds to an employee (asking for one in ?fields= includes the extra)
+EMPLOYEE_EXTRA_FIELDS = {
+    "skills": ("skills",),
+    "deadlines": ("next_deadline", "overdue_tasks"),
+    "last_review": ("last_reviewed_at",),
+}
+EMPLOYEE_LIST = ListSpec(
+    "employees", "e.employee_id",
+    {
+        "employee_id": SortKey("e.employee_id", False),
+        "employee_name": SortKey("e.employee_name", True),
+        "role": SortKey("e.role", True),
+        "weekly_hours": SortKey("e.weekly_hours", True),
+        "current_load": SortKey("COALESCE(l.open_hours, 0)", False),
+        "task_count": SortKey("COALESCE(l.open_tasks, 0)", False),
+        "average_rating": SortKey("r.avg_rating", True),
+    },
+    "employee_id",
+    ("employee_id", "employee_name", "role", "weekly_hours", "current_load", "task_count", "average_rating"),
+)
+
+
+def employee_filters(role, tech_stack_id, min_load_pct, max_load_pct, min_rating):
+    """WHERE terms (AND-ed, aliases e, l and r) and params for the /employees filters."""
+    terms, params = [], []
+    roles = [name.strip() for name in (role or "").split(",") if name.strip()]
+    if roles:
+        terms.append(f"e.role IN ({', '.join('?' for _ in roles)})")  # ix_employees_user_role
+        params += roles
+    if tech_stack_id is not None:
+        # ix_employee_tech_stack_tech / the (employee_id, tech_stack_id) primary key
+        terms.append("EXISTS (SELECT 1 FROM employee_tech_stack fs "
+                     "WHERE fs.employee_id = e.employee_id AND fs.tech_stack_id = ?)")
+        params.append(tech_stack_id)
+    # load % = open hours / weekly hours, compared without dividing (same as /analytics)
+    if min_load_pct is not None:
+        terms.append("e.weekly_hours > 0 AND COALESCE(l.open_hours, 0) * 100.0 >= ? * e.weekly_hours")
+        params.append(min_load_pct)
+    if max_load_pct is not None:
+        terms.append("e.weekly_hours > 0 AND COALESCE(l.open_hours, 0) * 100.0 <= ? * e.weekly_hours")
+        params.append(max_load_pct)
+    if min_rating is not None:
+        terms.append("r.avg_rating >= ?")
+        params.append(min_rating)
+    return terms, params
+
+
+# 👥 Employee summaries: task stats come from employee_load and review stats from a per-employee
+# aggregate, each joined 1:1 onto employees, so nothing fans out before grouping.
+# Optional extras: ?include=skills,deadlines,last_review. Paging/sorting/fields: src/listQuery.py
+# Filters: ?role=&tech_stack_id=&min_load_pct=&max_load_pct=&min_rating=
 @app.get("/employees")
-def get_all_employees(current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@cached_response
+@offload("crud")
+def get_all_employees(
+    include: Optional[str] = Query(None, description="comma-separated: skills, deadlines, last_review"),
+    role: Optional[str] = Query(None, description="comma-separated roles"),
+    tech_stack_id: Optional[int] = Query(None, description="only employees with this skill"),
+    min_load_pct: Optional[float] = Query(None, ge=0, description="open hours as % of weekly hours, at least"),
+    max_load_pct: Optional[float] = Query(None, ge=0, description="open hours as % of weekly hours, at most"),
+    min_rating: Optional[float] = Query(None, ge=0, le=5, description="average review rating, at least"),
+    params: ListParams = Depends(list_params),
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
+    extras = {name.strip() for name in (include or "").split(",") if name.strip()}
+    unknown = extras.difference(EMPLOYEE_EXTRAS)
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+    page = EMPLOYEE_LIST.page(params, [key for keys in EMPLOYEE_EXTRA_FIELDS.values() for key in keys])
+    if page.fields:
+        # ?fields= decides which extras are worth computing
+        extras = {extra for extra, keys in EMPLOYEE_EXTRA_FIELDS.items() if page.wants(*keys)}
+    with_reviews = (page.wants("average_rating") or "last_review" in extras
+                    or page.key_name == "average_rating" or min_rating is not None)
+    filters, filter_params = employee_filters(role, tech_stack_id, min_load_pct, max_load_pct, min_rating)
+
+    user_id = current_user["user_id"]
     cursor = conn.cursor()
 
-    cursor.execute("""
+    # a page whose order and filters don't depend on ratings looks them up for its own employees
+    # afterwards, instead of aggregating every review of the tenant
+    page_ratings = with_reviews and page.paged and min_rating is None and page.key_name != "average_rating"
+
+    reviews_join, sql_params = "", []
+    if with_reviews and not page_ratings:
+        reviews_join = f"""
+        LEFT JOIN (
+            SELECT rv.employee_id,
+                   AVG(CAST(rv.rating AS FLOAT)) AS avg_rating,
+                   {"MAX(rv.reviewed_at)" if "last_review" in extras else "NULL"} AS last_reviewed_at
+            FROM reviews rv
+            JOIN employees re ON rv.employee_id = re.employee_id
+            WHERE re.user_id = ?
+            GROUP BY rv.employee_id
+        ) r ON e.employee_id = r.employee_id"""
+        sql_params.append(user_id)
+    deadlines_join = ""
+    if "deadlines" in extras:
+        # earliest deadline and overdue count over incomplete tasks
+        deadlines_join = """
+        LEFT JOIN (
+            SELECT t.employee_id,
+                   MIN(t.deadline) AS next_deadline,
+                   SUM(CASE WHEN t.deadline < ? THEN 1 ELSE 0 END) AS overdue_tasks
+            FROM tasks t
+            JOIN employees de ON t.employee_id = de.employee_id
+            WHERE de.user_id = ? AND t.completed = 0
+            GROUP BY t.employee_id
+        ) d ON e.employee_id = d.employee_id"""
+        sql_params += [date.today().isoformat(), user_id]
+    keyset, keyset_params = page.where()
+    limit, limit_params = page.limit_clause()
+    sql_params += [user_id] + filter_params + keyset_params + limit_params
+    where = " AND ".join(["e.user_id = ?"] + filters + [keyset])
+
+    cursor.execute(f"""
         SELECT 
             e.employee_id, 
             e.employee_name, 
             e.role, 
             e.weekly_hours,
 
-            -- SUM of hours for incomplete tasks
-            ISNULL(SUM(CASE WHEN t.completed = 0 THEN t.estimated_hours ELSE 0 END), 0) AS current_load,
+            -- hours and count of incomplete tasks (maintained counters)
+            COALESCE(l.open_hours, 0) AS current_load,
+            COALESCE(l.open_tasks, 0) AS task_count,
 
-            -- COUNT of incomplete tasks
-            ISNULL(SUM(CASE WHEN t.completed = 0 THEN 1 ELSE 0 END), 0) AS task_count,
-
-            -- AVG rating
-            AVG(CAST(r.rating AS FLOAT)) AS avg_rating
+            {"r.avg_rating, r.last_reviewed_at" if reviews_join else "NULL AS avg_rating, NULL AS last_reviewed_at"}
+            {", d.next_deadline, d.overdue_tasks" if deadlines_join else ", NULL, NULL"}{page.columns}
 
         FROM employees e
-        LEFT JOIN tasks t ON e.employee_id = t.employee_id
-        LEFT JOIN reviews r ON e.employee_id = r.employee_id
-        WHERE e.user_id = ?
-        GROUP BY 
-            e.employee_id, 
-            e.employee_name, 
-            e.role, 
-            e.weekly_hours
-    """, (current_user["user_id"],))
-
-    rows = cursor.fetchall()
-    conn.close()
+        LEFT JOIN employee_load l ON e.employee_id = l.employee_id{reviews_join}{deadlines_join}
+        WHERE {where}
+        {page.order_by()} {limit}
+    """, sql_params)
+
+    rows, next_cursor = page.rows(cursor.fetchall())
+
+    skills = {}
+    if "skills" in extras and rows:
+        # a page only needs its own employees' skills
+        page_filter = f"AND ets.employee_id IN ({', '.join('?' for _ in rows)})" if page.paged else ""
+        cursor.execute(f"""
+            SELECT ets.employee_id, ts.tech_stack_name
+            FROM employee_tech_stack ets
+            JOIN employees e ON ets.employee_id = e.employee_id
+            JOIN tech_stack ts ON ets.tech_stack_id = ts.tech_stack_id
+            WHERE e.user_id = ? {page_filter}
+            ORDER BY ts.tech_stack_name
+        """, [user_id] + ([row[0] for row in rows] if page.paged else []))
+        for employee_id, name in cursor.fetchall():
+            skills.setdefault(employee_id, []).append(name)
+
+    ratings = {}
+    if page_ratings and rows:
+        cursor.execute(f"""
+            SELECT employee_id, AVG(CAST(rating AS FLOAT)),
+                   {"MAX(reviewed_at)" if "last_review" in extras else "NULL"}
+            FROM reviews
+            WHERE employee_id IN ({', '.join('?' for _ in rows)})
+            GROUP BY employee_id
+        """, [row[0] for row in rows])
+        ratings = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
 
-    return [
-        {
+    employees = []
+    for row in rows:
+        avg_rating, last_reviewed_at = ratings.get(row[0], (None, None)) if page_ratings else (row[6], row[7])
+        employee = {
             "employee_id": row[0],
             "employee_name": row[1],
             "role": row[2],
             "weekly_hours": row[3],
             "current_load": row[4],
             "task_count": row[5],
-            "average_rating": round(row[6], 2) if row[6] is not None else None
+            "average_rating": round(avg_rating, 2) if avg_rating is not None else None
         }
-        for row in rows
-    ]
+        if "last_review" in extras:
+            employee["last_reviewed_at"] = last_reviewed_at
+        if "deadlines" in extras:
+            employee["next_deadline"] = row[8]
+            employee["overdue_tasks"] = row[9] or 0
+        if "skills" in extras:
+            employee["skills"] = skills.get(row[0], [])
+        employees.append(employee)
+
+    def count():
+        if not filters:
+            cursor.execute("SELECT COUNT(*) FROM employees WHERE user_id = ?", (user_id,))
+            return cursor.fetchone()[0]
+        rating_join = reviews_join if min_rating is not None else ""
+        cursor.execute(f"""
+            SELECT COUNT(*)
+            FROM employees e
+            LEFT JOIN employee_load l ON e.employee_id = l.employee_id{rating_join}
+            WHERE {" AND ".join(["e.user_id = ?"] + filters)}
+        """, ([user_id] if rating_join else []) + [user_id] + filter_params)
+        return cursor.fetchone()[0]
+
+    scope = (role, tech_stack_id, min_load_pct, max_load_pct, min_rating)
+    return page.respond(employees, next_cursor, user_id, scope, count)
 
 @app.get("/employees/{employee_id}")
-def get_employee_profile(employee_id: int, current_user: dict = Depends(get_current_user)):
+@offload("crud")
+def get_employee_profile(employee_id: int, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     # conn = connect_to_db()
     # cursor = conn.cursor()
 
@@ -364,7 +688,6 @@ def get_employee_profile(employee_id: int, current_user: dict = Depends(get_curr
 
     # if not emp:
     #     raise HTTPException(status_code=404, detail="Employee not found")
-    conn = connect_to_db()
     cursor = conn.cursor()
 
     # 🔐 Ensure this employee belongs to the user
@@ -379,12 +702,9 @@ def get_employee_profile(employee_id: int, current_user: dict = Depends(get_curr
         raise HTTPException(status_code=404, detail="Employee not found")
 
     # Accurate current load for INCOMPLETE tasks only
-    cursor.execute("""
-        SELECT ISNULL(SUM(estimated_hours), 0)
-        FROM tasks
-        WHERE employee_id = ? AND completed = 0
-    """, (employee_id,))
-    current_load = cursor.fetchone()[0]
+    cursor.execute("SELECT open_hours FROM employee_load WHERE employee_id = ?", (employee_id,))
+    load_row = cursor.fetchone()
+    current_load = load_row[0] if load_row else 0
 
     # Fetch tasks + most recent review (if any)
     cursor.execute("""
@@ -417,7 +737,6 @@ def get_employee_profile(employee_id: int, current_user: dict = Depends(get_curr
     avg_rating = cursor.fetchone()[0]
 
     cursor.close()
-    conn.close()
 
     return {
         "employee_id": emp[0],
@@ -443,6 +762,74 @@ def get_employee_profile(employee_id: int, current_user: dict = Depends(get_curr
         ]
     }
 
+
+def _capacity_range(start, end):
+    start, end = default_range(start, end)
+    if end < start:
+        raise HTTPException(status_code=422, detail="'to' is before 'from'")
+    return start, end
+
+
+# 📅 Planned hours per week: open tasks spread from start_date to deadline (src/capacityTimeline.py)
+@app.get("/employees/{employee_id}/capacity")
+@offload("analytics")
+def get_employee_capacity(
+    employee_id: int,
+    start: Optional[date] = Query(None, alias="from", description="First week (the week containing this day); default this week"),
+    end: Optional[date] = Query(None, alias="to", description="Last week; default 12 weeks from 'from'"),
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
+    start, end = _capacity_range(start, end)
+    try:
+        timeline = capacity_timeline.covering(conn.cursor(), current_user["user_id"], start, end, [employee_id])
+        found = timeline.employee(employee_id, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if found is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    name, weekly_hours, unscheduled, hours = found
+    weeks = timeline.week_starts(timeline.columns(start, end))
+    return {
+        "employee_id": employee_id,
+        "employee_name": name,
+        "weekly_hours": weekly_hours,
+        "unscheduled_hours": round(unscheduled, 2),
+        "weeks": [
+            {
+                "week_start": week,
+                "hours": round(planned, 2),
+                "free_hours": round(weekly_hours - planned, 2),
+                "load_percent": round(planned / weekly_hours * 100, 0) if weekly_hours > 0 else 0,
+            }
+            for week, planned in zip(weeks, hours)
+        ],
+    }
+
+
+# 🌡️ Tenant-wide heatmap: one row per employee, one column per week. The timeline writes the JSON
+# itself (10k employees x 52 weeks is half a million cells), so FastAPI doesn't encode it again.
+@app.get("/capacity/heatmap")
+@offload("analytics")
+def get_capacity_heatmap(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    unit: str = Query("hours", regex="^(hours|percent)$", description="Cells as planned hours or % of weekly_hours"),
+    role: Optional[str] = Query(None, description="comma-separated roles"),
+    min_load_pct: Optional[float] = Query(None, ge=0, description="Only employees above this load in some week"),
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
+    start, end = _capacity_range(start, end)
+    try:
+        timeline = capacity_timeline.covering(conn.cursor(), current_user["user_id"], start, end)
+        roles = {name.strip() for name in (role or "").split(",") if name.strip()}
+        body = timeline.heatmap(start, end, unit, roles, min_load_pct)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return Response(body, media_type="application/json")
+
 # @app.post("/tasks/assign")
 # def assign_task(data: dict = Body(...), current_user: dict = Depends(get_current_user)):
 #     task_id = data.get("task_id")
@@ -528,8 +915,8 @@ def get_employee_profile(employee_id: int, current_user: dict = Depends(get_curr
 #         conn.close()
 
 @app.post("/tasks/assign")
-def assign_task(data: TaskAssignmentRequest, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def assign_task(data: TaskAssignmentRequest, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         # 🔐 Check if task belongs to the user
@@ -549,34 +936,230 @@ def assign_task(data: TaskAssignmentRequest, current_user: dict = Depends(get_cu
         if not data.employee_ids:
             raise HTTPException(status_code=400, detail="No employee IDs provided")
 
+        before = taskChanges.snapshot(cursor, data.task_id)
         if len(data.employee_ids) == 1:
             emp_id = data.employee_ids[0]
             cursor.execute("""
                 UPDATE tasks SET employee_id = ?, start_date = ?
                 WHERE task_id = ?
             """, (emp_id, data.start_date, data.task_id))
+            taskChanges.apply(cursor, before, taskChanges.snapshot(cursor, data.task_id))
         else:
             if not data.hours or len(data.hours) != len(data.employee_ids):
                 raise HTTPException(status_code=400, detail="Invalid hours list")
             for emp_id, hrs in zip(data.employee_ids, data.hours):
-                cursor.execute("""
-                    INSERT INTO tasks (project_id, tech_stack_id, estimated_hours, start_date, deadline, employee_id, completed, user_id)
-                    VALUES (?, ?, ?, ?, ?, ?, 0, ?)
-                """, (project_id, tech_id, hrs, data.start_date, deadline, emp_id, current_user["user_id"]))
+                new_id = dialect.insert_returning_id(
+                    cursor, "tasks",
+                    ("project_id", "tech_stack_id", "estimated_hours", "start_date", "deadline", "employee_id", "completed",
+                     "user_id", "created_at"),
+                    (project_id, tech_id, hrs, data.start_date, deadline, emp_id, 0, current_user["user_id"], before.created_at),
+                    "task_id",
+                )
+                taskChanges.inserted(cursor, new_id)
             cursor.execute("DELETE FROM tasks WHERE task_id = ?", (data.task_id,))
+            taskChanges.apply(cursor, before, None)
 
         conn.commit()
         return {"message": "Task assignment successful"}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
+
+
+ASSIGN_BATCH_MAX_ITEMS = int(os.getenv("ASSIGN_BATCH_MAX_ITEMS", "1000"))
+
+
+# 📋 Many /tasks/assign requests in one: validated with set-based queries, written with batched statements
+# in one transaction. Each item gets its own status; valid items are written even if others fail,
+# unless all_or_nothing is set.
+@app.post("/tasks/assign-batch")
+@offload("crud")
+def assign_tasks_batch(data: AssignBatchRequest, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
+    if not data.assignments:
+        raise HTTPException(status_code=422, detail="No assignments in batch")
+    if len(data.assignments) > ASSIGN_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=422, detail=f"At most {ASSIGN_BATCH_MAX_ITEMS} assignments per batch")
+    user_id = current_user["user_id"]
+    cursor = conn.cursor()
+    try:
+        # 🔐 every task and employee in the batch checked at once; tasks locked until the commit
+        task_ids = {item.task_id for item in data.assignments}
+        before = {}
+        for ids in chunked(task_ids):
+            before.update(taskChanges.snapshot_many(
+                cursor, f"p.user_id = ? AND tasks.task_id IN ({', '.join('?' for _ in ids)})", [user_id] + ids))
+        owned_tasks = {}
+        for ids in chunked(before):
+            cursor.execute(f"""
+                SELECT t.task_id, t.project_id, t.tech_stack_id, t.deadline
+                FROM tasks t
+                JOIN projects p ON t.project_id = p.project_id
+                WHERE p.user_id = ? AND t.task_id IN ({', '.join('?' for _ in ids)})
+            """, [user_id] + ids)
+            owned_tasks.update({row[0]: row for row in cursor.fetchall()})
+        employee_ids = {emp_id for item in data.assignments for emp_id in item.employee_ids or ()}
+        owned_employees = set()
+        for ids in chunked(employee_ids):
+            cursor.execute(f"SELECT employee_id FROM employees WHERE user_id = ? AND employee_id IN ({', '.join('?' for _ in ids)})",
+                           [user_id] + ids)
+            owned_employees.update(row[0] for row in cursor.fetchall())
+
+        results, updates, inserts, deletes, changes, seen = [], [], [], [], [], set()
+        for item in data.assignments:
+            if item.task_id not in owned_tasks:
+                status, detail = 403, "Unauthorized access to task"
+            elif item.task_id in seen:
+                status, detail = 409, "Task appears more than once in this batch"
+            elif not item.employee_ids:
+                status, detail = 400, "No employee IDs provided"
+            elif any(emp_id not in owned_employees for emp_id in item.employee_ids):
+                status, detail = 403, "Unauthorized access to employee"
+            elif len(item.employee_ids) > 1 and (not item.hours or len(item.hours) != len(item.employee_ids)):
+                status, detail = 400, "Invalid hours list"
+            else:
+                status, detail = 200, "Task assignment successful"
+            seen.add(item.task_id)
+            results.append({"task_id": item.task_id, "status": status, "detail": detail})
+            if status != 200:
+                continue
+
+            # same writes as /tasks/assign
+            if len(item.employee_ids) == 1:
+                updates.append((item.employee_ids[0], item.start_date, item.task_id))
+            else:
+                _, project_id, tech_id, deadline = owned_tasks[item.task_id]
+                for emp_id, hrs in zip(item.employee_ids, item.hours):
+                    inserts.append((project_id, tech_id, hrs, item.start_date, deadline, emp_id, 0, user_id,
+                                    before[item.task_id].created_at))  # a split isn't a new task
+                deletes.append((item.task_id,))
+                changes.append((before[item.task_id], None))
+
+        failed = sum(result["status"] != 200 for result in results)
+        if data.all_or_nothing and failed:
+            conn.rollback()
+            return JSONResponse(status_code=422, content={"written": 0, "failed": failed, "results": results})
+
+        dialect.executemany(cursor, "UPDATE tasks SET employee_id = ?, start_date = ? WHERE task_id = ?", updates)
+        written = [task_id for _, _, task_id in updates] + dialect.insert_many_returning_ids(
+            cursor, "tasks",
+            ("project_id", "tech_stack_id", "estimated_hours", "start_date", "deadline", "employee_id", "completed", "user_id",
+             "created_at"),
+            inserts, "task_id",
+        )
+        dialect.executemany(cursor, "DELETE FROM tasks WHERE task_id = ?", deletes)
+        # the written rows are read back, not rebuilt from the request: the counters have to see what the
+        # columns kept (estimated_hours is an INT, so 2.5 split hours are stored as 2 on SQL Server)
+        after = {}
+        for ids in chunked(written):
+            after.update(taskChanges.snapshot_many(cursor, f"tasks.task_id IN ({', '.join('?' for _ in ids)})", ids))
+        changes.extend((before.get(task_id), after[task_id]) for task_id in written)
+        taskChanges.apply_many(cursor, changes)
+        conn.commit()
+        return {"written": len(results) - failed, "failed": failed, "results": results}
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# 🧪 What-if: the load and project forecasts a set of assignment changes would lead to, computed on an
+# in-memory snapshot of the tenant (src/simulation.py). Nothing is written.
+@app.post("/simulate")
+@offload("analytics")
+def simulate_changes(data: SimulateRequest, request: Request, current_user: dict = Depends(get_current_user),
+                     conn=Depends(get_db)):
+    if len(data.changes) > SIMULATE_MAX_CHANGES:
+        raise HTTPException(status_code=422, detail=f"At most {SIMULATE_MAX_CHANGES} changes per simulation")
+    request.state.read_only = True  # nothing is written, so keep the tenant's cached responses
+    cursor = conn.cursor()
+    user_id = current_user["user_id"]
+    index = skill_index.get(cursor, user_id)
+    plan = simulation.get(cursor, user_id)
+    # plain JSON types already: skip jsonable_encoder, a sizeable share of a simulation's time
+    return JSONResponse(simulate(plan, index, data.changes, data.capacity_pct))
+
+# 🤖 Assign every open unassigned task of the project to a skilled employee with room for it (src/autoAssign.py)
+@app.post("/projects/{project_id}/auto-assign")
+@offload("crud")
+def auto_assign_project(project_id: int, request: Request, data: AutoAssignRequest = Body(AutoAssignRequest()),
+                        current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
+    cursor = conn.cursor()
+    cursor.execute("SELECT user_id FROM projects WHERE project_id = ?", (project_id,))
+    owner = cursor.fetchone()
+    if not owner or owner[0] != current_user["user_id"]:
+        raise HTTPException(status_code=403, detail="Unauthorized to assign tasks in this project")
+
+    open_tasks = "tasks.project_id = ? AND tasks.employee_id IS NULL AND tasks.completed = 0"
+    try:
+        if data.dry_run:
+            request.state.read_only = True  # nothing is written, so keep the tenant's cached responses
+        else:
+            # lock the tasks first, so none gets assigned by someone else between the solve and the write
+            before = taskChanges.snapshot_many(cursor, open_tasks, (project_id,))
+        cursor.execute(f"""
+            SELECT tasks.task_id, tasks.tech_stack_id, tasks.estimated_hours, tasks.deadline
+            FROM tasks
+            WHERE {open_tasks}
+        """, (project_id,))
+        tasks = cursor.fetchall()
+        columns = skill_index.get(cursor, current_user["user_id"]).columns()
+
+        started = time.perf_counter()
+        placements, unplaced, used = autoAssign.solve(tasks, columns, data.capacity_pct, data.rating_weight)
+        solve_ms = round((time.perf_counter() - started) * 1000, 2)
+
+        if not data.dry_run and placements:
+            dialect.executemany(
+                cursor,
+                "UPDATE tasks SET employee_id = ?, start_date = COALESCE(?, start_date) WHERE task_id = ?",
+                [(int(columns.ids[p.row]), data.start_date, p.task_id) for p in placements],
+            )
+            after = taskChanges.snapshot_many(cursor, "tasks.project_id = ?", (project_id,))
+            taskChanges.apply_many(cursor, [(before[p.task_id], after.get(p.task_id)) for p in placements])
+            changeFeed.touch(current_user["user_id"], "tasks")
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    deadlines = {row[0]: row[3] for row in tasks}
+    employees = {}
+    for p in placements:
+        employees.setdefault(p.row, 0)
+        employees[p.row] += p.hours or 0
+    return {
+        "dry_run": data.dry_run,
+        "assigned": [
+            {
+                "task_id": p.task_id,
+                "employee_id": int(columns.ids[p.row]),
+                "employee_name": columns.names[p.row],
+                "estimated_hours": p.hours,
+                "deadline": deadlines[p.task_id],
+            } for p in placements
+        ],
+        "unassigned": [{"task_id": task_id, "reason": reason} for task_id, reason in unplaced],
+        "employees": [
+            {
+                "employee_id": int(columns.ids[row]),
+                "employee_name": columns.names[row],
+                "hours_added": hours,
+                "load_after": float(used[row]),
+                "load_percent_after": round(float(used[row]) / float(columns.weekly_hours[row]) * 100, 0)
+                if columns.weekly_hours[row] > 0 else 0,
+            } for row, hours in sorted(employees.items(), key=lambda item: int(columns.ids[item[0]]))
+        ],
+        "solve_ms": solve_ms,
+    }
 
 
 @app.get("/tasks/{task_id}/candidates")
-def get_matching_employees(task_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def get_matching_employees(
+    task_id: int,
+    limit: Optional[int] = Query(None, ge=1, description="only the best N matches"),
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
     cursor = conn.cursor()
 
     # Confirm task belongs to user
@@ -592,43 +1175,16 @@ def get_matching_employees(task_id: int, current_user: dict = Depends(get_curren
         raise HTTPException(status_code=404, detail="Task not found or unauthorized")
 
     tech_stack_id, est_hours = result
+    if tech_stack_id is None:
+        return []
 
-    # 🔐 Scope employees to current user
-    cursor.execute("""
-        SELECT e.employee_id, e.employee_name, e.weekly_hours,
-               ISNULL(SUM(t.estimated_hours), 0) AS current_load, r.avg_rating
-        FROM employees e
-        JOIN employee_tech_stack ets ON e.employee_id = ets.employee_id
-        LEFT JOIN tasks t ON e.employee_id = t.employee_id
-        LEFT JOIN (
-            SELECT employee_id, AVG(CAST(rating AS FLOAT)) AS avg_rating
-            FROM reviews
-            GROUP BY employee_id
-        ) r ON e.employee_id = r.employee_id
-        WHERE ets.tech_stack_id = ? AND e.user_id = ?
-        GROUP BY 
-            e.employee_id, e.employee_name, e.weekly_hours, r.avg_rating
-    """, (tech_stack_id, current_user["user_id"]))
-
-    matches = cursor.fetchall()
-    conn.close()
-
-    return [
-        {
-            "employee_id": row[0],
-            "employee_name": row[1],
-            "weekly_hours": row[2],
-            "current_workload": row[3],
-            "tentative_workload": row[3] + est_hours,
-            "over_capacity": (row[3] + est_hours) > row[2],
-            "average_rating": round(row[4], 2) if row[4] is not None else None,
-            "load_percent": round((row[3] / row[2]) * 100, 0) if row[2] > 0 else 0
-        } for row in matches
-    ]
+    # 🧭 Skill match and ranking on the tenant's in-memory index (src/skillIndex.py), best fit first
+    index = skill_index.get(cursor, current_user["user_id"])
+    return index.candidates([tech_stack_id], est_hours, limit)
 
 @app.post("/projects/{project_id}/tasks")
-def add_task_to_project(project_id: int, task: TaskCreate, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def add_task_to_project(project_id: int, task: TaskCreate, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         # 🔒 Step 1: Confirm project belongs to the current user
@@ -638,32 +1194,28 @@ def add_task_to_project(project_id: int, task: TaskCreate, current_user: dict =
             raise HTTPException(status_code=403, detail="Unauthorized to add tasks to this project")
 
         # ✅ Step 2: Proceed with task insert
-        cursor.execute("""
-            INSERT INTO tasks (project_id, tech_stack_id, estimated_hours, deadline, employee_id, completed)
-            VALUES (?, ?, ?, ?, NULL, 0)
-        """, (
-            project_id,
-            task.tech_stack_id,
-            task.estimated_hours,
-            task.deadline
-        ))
+        task_id = dialect.insert_returning_id(
+            cursor, "tasks",
+            ("project_id", "tech_stack_id", "estimated_hours", "deadline", "employee_id", "completed", "created_at"),
+            (project_id, task.tech_stack_id, task.estimated_hours, task.deadline, None, 0, date.today().isoformat()),
+            "task_id",
+        )
+        taskChanges.inserted(cursor, task_id)
         conn.commit()
         return {"message": "Task added successfully"}
 
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 
 @app.get("/tech_stack")
-def get_tech_stack():
-    conn = connect_to_db()
+@cached_response
+@offload("crud")
+def get_tech_stack(conn=Depends(get_db)):
     cursor = conn.cursor()
     cursor.execute("SELECT tech_stack_id, tech_stack_name FROM tech_stack")
     rows = cursor.fetchall()
-    conn.close()
     return [{"tech_stack_id": r[0], "tech_stack_name": r[1]} for r in rows]
 
 # @app.patch("/tasks/{task_id}/unassign")
@@ -691,8 +1243,8 @@ def get_tech_stack():
 #         conn.close()
 
 @app.patch("/tasks/{task_id}/unassign")
-def unassign_task(task_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def unassign_task(task_id: int, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         # Check if the task exists and belongs to the current user
@@ -711,11 +1263,13 @@ def unassign_task(task_id: int, current_user: dict = Depends(get_current_user)):
             raise HTTPException(status_code=403, detail="Unauthorized")
 
         # Perform unassignment
+        before = taskChanges.snapshot(cursor, task_id)
         cursor.execute("""
             UPDATE tasks
             SET employee_id = NULL
             WHERE task_id = ?
         """, (task_id,))
+        taskChanges.apply(cursor, before, taskChanges.snapshot(cursor, task_id))
         
         conn.commit()
         return {"message": "Task unassigned successfully"}
@@ -724,13 +1278,11 @@ def unassign_task(task_id: int, current_user: dict = Depends(get_current_user)):
         conn.rollback()
         print("❌ Error during unassign:", e)
         raise HTTPException(status_code=500, detail="Failed to unassign task")
-    finally:
-        conn.close()
 
 
 @app.patch("/tasks/{task_id}/toggle-completion")
-def toggle_completion(task_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def toggle_completion(task_id: int, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         # 🔐 Step 1: Confirm task belongs to the current user
@@ -746,16 +1298,17 @@ def toggle_completion(task_id: int, current_user: dict = Depends(get_current_use
             raise HTTPException(status_code=404, detail="Task not found or unauthorized")
 
         # ✅ Step 2: Toggle completion status
+        before = taskChanges.snapshot(cursor, task_id)
         new_status = 0 if row[0] else 1
-        cursor.execute("UPDATE tasks SET completed = ? WHERE task_id = ?", (new_status, task_id))
+        completed_at = datetime.now().strftime("%Y-%m-%d") if new_status else None
+        cursor.execute("UPDATE tasks SET completed = ?, completed_at = ? WHERE task_id = ?", (new_status, completed_at, task_id))
+        taskChanges.apply(cursor, before, taskChanges.snapshot(cursor, task_id))
         conn.commit()
         return {"completed": new_status}
 
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 
 # 🔁 Assign tech stack to newly added employee
@@ -812,8 +1365,8 @@ def assign_skills_to_new_employee(employee_id: int, role: str, db_conn):
 #         conn.close()
 
 @app.post("/employees")
-def add_employee(data: EmployeeCreate, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def add_employee(data: EmployeeCreate, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         cursor.execute("""
@@ -823,20 +1376,19 @@ def add_employee(data: EmployeeCreate, current_user: dict = Depends(get_current_
 
         assign_skills_to_new_employee(data.employee_id, data.role, conn)
 
+        changeFeed.touch(current_user["user_id"], "employees", employee_ids=[data.employee_id])
         conn.commit()
         return {"message": "Employee added"}
     except Exception as e:
         print("❌ Error inserting employee:", e)
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 
 
 @app.patch("/employees/{employee_id}/release")
-def release_employee(employee_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def release_employee(employee_id: int, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         # 🔒 Ownership check
@@ -844,27 +1396,29 @@ def release_employee(employee_id: int, current_user: dict = Depends(get_current_
         if not cursor.fetchone():
             raise HTTPException(status_code=403, detail="Unauthorized")
 
+        dialect.begin_write(cursor)
+        cursor.execute("SELECT DISTINCT project_id FROM tasks WHERE employee_id = ?", (employee_id,))
+        project_ids = [row[0] for row in cursor.fetchall()]
         cursor.execute("UPDATE tasks SET employee_id = NULL WHERE employee_id = ?", (employee_id,))
+        employeeLoad.reset(cursor, employee_id)
+        changeFeed.touch(current_user["user_id"], "employees", "tasks", employee_ids=[employee_id], project_ids=project_ids)
         conn.commit()
         return {"message": "Employee released from all tasks"}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @app.get("/stats/total-projects")
-def get_total_projects(current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("analytics")
+def get_total_projects(current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     cursor.execute("SELECT COUNT(*) FROM projects WHERE user_id = ?", (current_user["user_id"],))
     count = cursor.fetchone()[0]
-    conn.close()
     return {"total_projects": count}
 
 @app.get("/stats/task-completion")
-def get_task_completion(current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("analytics")
+def get_task_completion(current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     cursor.execute("""
         SELECT COUNT(*) 
@@ -882,24 +1436,21 @@ def get_task_completion(current_user: dict = Depends(get_current_user)):
     """, (current_user["user_id"],))
     done = cursor.fetchone()[0]
 
-    conn.close()
     return {"completed": done, "total": total}
 
 
 @app.get("/stats/employee-availability")
-def get_employee_availability(current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("analytics")
+def get_employee_availability(current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     cursor.execute("""
         SELECT weekly_hours, 
-               ISNULL(SUM(t.estimated_hours), 0) AS current_load
+               COALESCE(l.open_hours, 0) AS current_load
         FROM employees e
-        LEFT JOIN tasks t ON e.employee_id = t.employee_id
+        LEFT JOIN employee_load l ON e.employee_id = l.employee_id
         WHERE e.user_id = ?
-        GROUP BY e.employee_id, weekly_hours
     """, (current_user["user_id"],))
     rows = cursor.fetchall()
-    conn.close()
 
     available = sum(1 for row in rows if float(row[1]) < 35)
     loaded = len(rows) - available
@@ -910,103 +1461,99 @@ def get_employee_availability(current_user: dict = Depends(get_current_user)):
     }
 
 
+# 📊 Every Home dashboard metric in one statement: one CTE per table scan, one row per metric group.
+# Employee load comes from the employee_load counters (src/employeeLoad.py).
+ANALYTICS_SQL = """
+    WITH emp AS (
+        SELECT e.employee_id, e.weekly_hours,
+               COALESCE(l.total_hours, 0) AS total_load,
+               COALESCE(l.open_hours, 0) AS open_load
+        FROM employees e
+        LEFT JOIN employee_load l ON e.employee_id = l.employee_id
+        WHERE e.user_id = ?
+    ),
+    tk AS (
+        SELECT t.tech_stack_id, t.completed, t.estimated_hours
+        FROM tasks t
+        JOIN projects p ON t.project_id = p.project_id
+        WHERE p.user_id = ?
+    )
+    SELECT 'employees' AS metric, NULL AS name,
+           SUM(CASE WHEN weekly_hours > 0 AND open_load < ? * weekly_hours THEN 1 ELSE 0 END) AS a,
+           SUM(CASE WHEN weekly_hours > 0 AND open_load >= ? * weekly_hours THEN 1 ELSE 0 END) AS b,
+           SUM(CASE WHEN {bench_load} <= ? THEN 1 ELSE 0 END) AS c,
+           COUNT(*) AS d
+    FROM emp
+    UNION ALL
+    SELECT 'tasks', NULL, SUM(CASE WHEN completed = 1 THEN 1 ELSE 0 END), COUNT(*), NULL, NULL
+    FROM tk
+    UNION ALL
+    SELECT 'projects', NULL, COUNT(*), NULL, NULL, NULL
+    FROM projects WHERE user_id = ?
+    UNION ALL
+    SELECT 'tech', ts.tech_stack_name, SUM(tk.estimated_hours), NULL, NULL, NULL
+    FROM tk
+    JOIN tech_stack ts ON tk.tech_stack_id = ts.tech_stack_id
+    GROUP BY ts.tech_stack_name
+"""
+
+# which load decides "benched": only open tasks (default) or every task ever assigned
+BENCH_LOAD_COLUMNS = {"open": "open_load", "all": "total_load"}
+
+
 @app.get("/analytics")
-def get_analytics(current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("analytics")
+def get_analytics(
+    threshold: float = Query(0.95, gt=0, description="load / weekly_hours at or above this counts as overloaded"),
+    bench_load: str = Query("open", regex="^(open|all)$", description="open: incomplete tasks only, all: every task"),
+    bench_hours: float = Query(0, ge=0, description="employees with at most this many hours of load are benched"),
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
     cursor = conn.cursor()
+    user_id = current_user["user_id"]
 
     try:
-        # Total Projects
-        cursor.execute("SELECT COUNT(*) FROM projects WHERE user_id = ?", (current_user["user_id"],))
-        total_projects = cursor.fetchone()[0]
-
-        # Employee availability
-        cursor.execute("""
-            SELECT weekly_hours, 
-                   ISNULL(SUM(t.estimated_hours), 0) AS current_load
-            FROM employees e
-            LEFT JOIN tasks t ON e.employee_id = t.employee_id
-            WHERE e.user_id = ?
-            GROUP BY e.employee_id, weekly_hours
-        """, (current_user["user_id"],))
-        employee_rows = cursor.fetchall()
-
-        threshold = 0.95
-        available = 0
-        overloaded = 0
-        for weekly, current in employee_rows:
-            if weekly > 0:
-                load = current / weekly
-                if load < threshold:
-                    available += 1
-                else:
-                    overloaded += 1
-
-        # Benched = 0 hours of incomplete tasks
-        cursor.execute("""
-            SELECT e.employee_id,
-                   ISNULL(SUM(CASE WHEN t.completed = 0 THEN t.estimated_hours ELSE 0 END), 0) AS incomplete_load
-            FROM employees e
-            LEFT JOIN tasks t ON e.employee_id = t.employee_id
-            WHERE e.user_id = ?
-            GROUP BY e.employee_id
-        """, (current_user["user_id"],))
+        cursor.execute(
+            ANALYTICS_SQL.format(bench_load=BENCH_LOAD_COLUMNS[bench_load]),
+            (user_id, user_id, threshold, threshold, bench_hours, user_id),
+        )
         rows = cursor.fetchall()
-        benched = sum(1 for r in rows if r[1] == 0)
-        active = len(rows) - benched
 
-        # Tasks
-        cursor.execute("""
-            SELECT COUNT(*) FROM tasks t
-            JOIN projects p ON t.project_id = p.project_id
-            WHERE t.completed = 1 AND p.user_id = ?
-        """, (current_user["user_id"],))
-        tasks_completed = cursor.fetchone()[0]
-
-        cursor.execute("""
-            SELECT COUNT(*) FROM tasks t
-            JOIN projects p ON t.project_id = p.project_id
-            WHERE p.user_id = ?
-        """, (current_user["user_id"],))
-        total_tasks = cursor.fetchone()[0]
-        tasks_pending = total_tasks - tasks_completed
-
-        # Workload by Tech Stack
-        cursor.execute("""
-            SELECT ts.tech_stack_name, ISNULL(SUM(t.estimated_hours), 0) as total_hours
-            FROM tech_stack ts
-            LEFT JOIN tasks t ON ts.tech_stack_id = t.tech_stack_id
-            JOIN projects p ON t.project_id = p.project_id
-            WHERE p.user_id = ?
-            GROUP BY ts.tech_stack_name
-        """, (current_user["user_id"],))
-        workload_rows = cursor.fetchall()
-        workload_distribution = [
-            {"name": row[0], "value": row[1]} for row in workload_rows if row[1] > 0
-        ]
-
-        return {
-            "total_projects": total_projects,
-            "employees_benched": benched,
-            "employees_active": active,
-            "employees_available": available,
-            "employees_overloaded": overloaded,
-            "tasks_completed": tasks_completed,
-            "tasks_pending": tasks_pending,
-            "workload_distribution": workload_distribution
+        result = {
+            "total_projects": 0,
+            "employees_benched": 0,
+            "employees_active": 0,
+            "employees_available": 0,
+            "employees_overloaded": 0,
+            "tasks_completed": 0,
+            "tasks_pending": 0,
+            "workload_distribution": [],
         }
+        for metric, name, a, b, c, d in rows:
+            if metric == "employees":
+                result["employees_available"] = a or 0
+                result["employees_overloaded"] = b or 0
+                result["employees_benched"] = c or 0
+                result["employees_active"] = d - (c or 0)
+            elif metric == "tasks":
+                result["tasks_completed"] = a or 0
+                result["tasks_pending"] = b - (a or 0)
+            elif metric == "projects":
+                result["total_projects"] = a
+            elif a:
+                result["workload_distribution"].append({"name": name, "value": a})
+        return result
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analytics error: {str(e)}")
-    finally:
-        conn.close()
 
 
 
 
 @app.get("/analytics/bench")
-def get_bench_vs_active(current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("analytics")
+def get_bench_vs_active(current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         cursor.execute("""
@@ -1014,24 +1561,21 @@ def get_bench_vs_active(current_user: dict = Depends(get_current_user)):
                 SUM(CASE WHEN current_load = 0 THEN 1 ELSE 0 END) AS benched,
                 SUM(CASE WHEN current_load > 0 THEN 1 ELSE 0 END) AS active
             FROM (
-                SELECT e.employee_id, ISNULL(SUM(t.estimated_hours), 0) AS current_load
+                SELECT e.employee_id, COALESCE(l.open_hours, 0) AS current_load
                 FROM employees e
-                LEFT JOIN tasks t ON e.employee_id = t.employee_id
+                LEFT JOIN employee_load l ON e.employee_id = l.employee_id
                 WHERE e.user_id = ?
-                GROUP BY e.employee_id
             ) x
         """, (current_user["user_id"],))
         row = cursor.fetchone()
         return {"benched": row.benched, "active": row.active}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @app.get("/stats/projects")
-def get_project_stats(current_user: dict = Depends(get_current_user)):
+@offload("analytics")
+def get_project_stats(current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     from datetime import date, timedelta
-    conn = connect_to_db()
     cursor = conn.cursor()
     try:
         today = date.today()
@@ -1058,13 +1602,11 @@ def get_project_stats(current_user: dict = Depends(get_current_user)):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 
 @app.put("/employees/{employee_id}")
-def update_employee(employee_id: int, data: EmployeeCreate, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def update_employee(employee_id: int, data: EmployeeCreate, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
 
     try:
@@ -1077,17 +1619,16 @@ def update_employee(employee_id: int, data: EmployeeCreate, current_user: dict =
             SET employee_name = ?, role = ?
             WHERE employee_id = ?
         """, (data.employee_name, data.role, employee_id))
+        changeFeed.touch(current_user["user_id"], "employees", employee_ids=[employee_id])
         conn.commit()
         return {"message": "Employee updated"}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @app.delete("/employees/{employee_id}")
-def delete_employee(employee_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def delete_employee(employee_id: int, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
 
     try:
@@ -1096,19 +1637,21 @@ def delete_employee(employee_id: int, current_user: dict = Depends(get_current_u
             raise HTTPException(status_code=403, detail="Unauthorized")
 
         cursor.execute("DELETE FROM employee_tech_stack WHERE employee_id = ?", (employee_id,))
+        removed = taskChanges.collect(cursor, "tasks.employee_id = ?", (employee_id,))
         cursor.execute("DELETE FROM tasks WHERE employee_id = ?", (employee_id,))
+        taskChanges.apply_removed(cursor, removed)
         cursor.execute("DELETE FROM employees WHERE employee_id = ?", (employee_id,))
+        employeeLoad.forget(cursor, employee_id)
+        changeFeed.touch(current_user["user_id"], "employees", "tasks", employee_ids=[employee_id])
         conn.commit()
         return {"message": "Employee deleted"}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @app.put("/tasks/{task_id}")
-def update_task(task_id: int, data: TaskEdit, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def update_task(task_id: int, data: TaskEdit, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
 
     try:
@@ -1123,24 +1666,25 @@ def update_task(task_id: int, data: TaskEdit, current_user: dict = Depends(get_c
             raise HTTPException(status_code=403, detail="Unauthorized")
 
         # ✅ Now update only editable fields
+        before = taskChanges.snapshot(cursor, task_id)
         cursor.execute("""
             UPDATE tasks
             SET estimated_hours = ?, deadline = ?, start_date = ?
             WHERE task_id = ?
         """, (data.estimated_hours, data.deadline, data.start_date, task_id))
+        taskChanges.apply(cursor, before, taskChanges.snapshot(cursor, task_id))
+        changeFeed.touch(current_user["user_id"], "tasks")
 
         conn.commit()
         return {"message": "Task updated"}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 
 @app.delete("/tasks/{task_id}")
-def delete_task(task_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def delete_task(task_id: int, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
 
     try:
@@ -1153,23 +1697,24 @@ def delete_task(task_id: int, current_user: dict = Depends(get_current_user)):
         if not cursor.fetchone():
             raise HTTPException(status_code=403, detail="Unauthorized")
 
+        before = taskChanges.snapshot(cursor, task_id)
         cursor.execute("DELETE FROM tasks WHERE task_id = ?", (task_id,))
+        taskChanges.apply(cursor, before, None)
         conn.commit()
         return {"message": "Task deleted"}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 
 @app.put("/projects/{project_id}")
-def update_project(project_id: int, data: ProjectCreate, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def update_project(project_id: int, data: ProjectCreate, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
 
     try:
-        cursor.execute("SELECT user_id FROM projects WHERE project_id = ?", (project_id,))
+        dialect.begin_write(cursor)
+        cursor.execute(f"SELECT user_id, start_date FROM {dialect.locked('projects')} WHERE project_id = ?", (project_id,))
         owner = cursor.fetchone()
         if not owner or owner[0] != current_user["user_id"]:
             raise HTTPException(status_code=403, detail="Unauthorized")
@@ -1179,39 +1724,42 @@ def update_project(project_id: int, data: ProjectCreate, current_user: dict = De
             SET project_name = ?, client_name = ?, start_date = ?, deadline = ?
             WHERE project_id = ?
         """, (data.project_name, data.client_name, data.start_date, data.deadline, project_id))
+        trendRollups.apply_project_change(cursor, owner[0], owner[1], data.start_date)
+        changeFeed.touch(owner[0], "projects")
         conn.commit()
         return {"message": "Project updated"}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 @app.delete("/projects/{project_id}")
-def delete_project(project_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def delete_project(project_id: int, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
 
     try:
-        cursor.execute("SELECT user_id FROM projects WHERE project_id = ?", (project_id,))
+        dialect.begin_write(cursor)
+        cursor.execute(f"SELECT user_id, start_date FROM {dialect.locked('projects')} WHERE project_id = ?", (project_id,))
         owner = cursor.fetchone()
         if not owner or owner[0] != current_user["user_id"]:
             raise HTTPException(status_code=403, detail="Unauthorized")
         
+        removed = taskChanges.collect(cursor, "tasks.project_id = ?", (project_id,))
         cursor.execute("DELETE FROM tasks WHERE project_id = ?", (project_id,))
+        taskChanges.apply_removed(cursor, removed)
         cursor.execute("DELETE FROM projects WHERE project_id = ?", (project_id,))
+        trendRollups.apply_project_change(cursor, owner[0], owner[1], None)
+        changeFeed.touch(owner[0], "projects", "tasks")
         conn.commit()
         return {"message": "Project deleted"}
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 
 @app.post("/tasks")
-def create_task(task: dict, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def create_task(task: dict, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
 
     try:
@@ -1219,25 +1767,28 @@ def create_task(task: dict, current_user: dict = Depends(get_current_user)):
         if not cursor.fetchone():
             raise HTTPException(status_code=403, detail="Unauthorized project")
         
-        cursor.execute("""
-            INSERT INTO tasks (tech_stack_id, project_id, estimated_hours, deadline, start_date, completed, user_id)
-            VALUES (?, ?, ?, ?, ?, 0, ?)
-        """, (
-            task["tech_stack_id"],
-            task["project_id"],
-            task["estimated_hours"],
-            task["deadline"],
-            task.get("start_date"),
-            current_user["user_id"]  # ✅ This line fixes your NULL problem
-        ))
+        task_id = dialect.insert_returning_id(
+            cursor, "tasks",
+            ("tech_stack_id", "project_id", "estimated_hours", "deadline", "start_date", "completed", "user_id", "created_at"),
+            (
+                task["tech_stack_id"],
+                task["project_id"],
+                task["estimated_hours"],
+                task["deadline"],
+                task.get("start_date"),
+                0,
+                current_user["user_id"],  # ✅ This line fixes your NULL problem
+                date.today().isoformat(),
+            ),
+            "task_id",
+        )
+        taskChanges.inserted(cursor, task_id)
         conn.commit()
         return {"message": "Task created"}
     except Exception as e:
         print("❌ Task creation failed:", e)
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 # @app.put("/tasks/{task_id}")
 # def update_task(task_id: int, task: dict):
@@ -1268,8 +1819,8 @@ def create_task(task: dict, current_user: dict = Depends(get_current_user)):
 #         conn.close()
 
 @app.get("/stats/dept-workload")
-def get_department_workload_stats(current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("analytics")
+def get_department_workload_stats(current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         # Get total employees per role
@@ -1309,45 +1860,100 @@ def get_department_workload_stats(current_user: dict = Depends(get_current_user)
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
     
 @app.get("/stats/dashboard")
-def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@cached_response
+@offload("analytics")
+def get_dashboard_stats(current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
 
-    # ✅ Project Completion Stats
+    # ✅ Project Completion Stats (per project: two projects may share a name)
     cursor.execute("""
-        SELECT p.project_name,
+        SELECT p.project_id, p.project_name,
             SUM(CASE WHEN t.completed = 1 THEN 1 ELSE 0 END) AS completed,
             COUNT(t.task_id) - SUM(CASE WHEN t.completed = 1 THEN 1 ELSE 0 END) AS remaining
         FROM projects p
         LEFT JOIN tasks t ON p.project_id = t.project_id
         WHERE p.user_id = ?
-        GROUP BY p.project_name
+        GROUP BY p.project_id, p.project_name
     """, (current_user["user_id"],))
     project_progress = [
-        {"project_name": row[0], "completed": row[1], "remaining": row[2]}
+        {"project_id": row[0], "project_name": row[1], "completed": row[2], "remaining": row[3]}
         for row in cursor.fetchall()
     ]
 
-    # ✅ Monthly Project Creation Trends
+    # ✅ Monthly Project Creation Trends (maintained rollups, src/trendRollups.py)
     cursor.execute("""
-        SELECT FORMAT(start_date, 'yyyy-MM') AS month, COUNT(*) AS count
-        FROM projects
-        WHERE user_id = ?
-        GROUP BY FORMAT(start_date, 'yyyy-MM')
-        ORDER BY month
+        SELECT bucket, value
+        FROM trend_rollups
+        WHERE user_id = ? AND granularity = 'm' AND metric = 'projects_created' AND tech_stack_id = 0 AND value <> 0
+        ORDER BY bucket
     """, (current_user["user_id"],))
-    monthly_trends = [{"month": row[0], "count": row[1]} for row in cursor.fetchall()]
+    monthly_trends = [
+        {"month": trendRollups.as_date(row[0]).strftime("%Y-%m"), "count": row[1]}
+        for row in cursor.fetchall()
+    ]
 
-    conn.close()
     return {
         "project_progress": project_progress,
         "monthly_project_trends": monthly_trends
     }
 
+
+TREND_MAX_BUCKETS = 1000
+
+
+# 📆 Trend series from the day/week/month rollups: one value per bucket for each metric, plus
+# estimated hours per tech stack. Cost depends on the number of buckets, not on how much history there is.
+@app.get("/stats/trends")
+@cached_response
+@offload("analytics")
+def get_trends(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    granularity: str = Query("month", regex="^(day|week|month)$"),
+    tech_stack_id: Optional[int] = None,
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
+    end = end or date.today()
+    start = start or end - timedelta(days=365)
+    if start > end:
+        raise HTTPException(status_code=422, detail="'from' must not be after 'to'")
+
+    g = trendRollups.GRANULARITIES[granularity]
+    first, last = trendRollups.bucket_start(start, g), trendRollups.bucket_start(end, g)
+    buckets = [first]
+    while buckets[-1] < last:
+        buckets.append(trendRollups.next_bucket(buckets[-1], g))
+        if len(buckets) > TREND_MAX_BUCKETS:
+            raise HTTPException(status_code=422, detail=f"More than {TREND_MAX_BUCKETS} buckets, use a coarser granularity")
+    index = {bucket: i for i, bucket in enumerate(buckets)}
+
+    cursor = conn.cursor()
+    series = {metric: [0] * len(buckets) for metric in ("projects_created", "tasks_created", "tasks_completed")}
+    hours = {}
+    for metric, tech_id, bucket, value in trendRollups.read(cursor, current_user["user_id"], g, first, last, tech_stack_id):
+        if metric == "hours":
+            hours.setdefault(tech_id, [0] * len(buckets))[index[bucket]] += value
+        else:
+            series[metric][index[bucket]] += value
+
+    cursor.execute("SELECT tech_stack_id, tech_stack_name FROM tech_stack")
+    names = dict(cursor.fetchall())
+
+    return {
+        "granularity": granularity,
+        "from": first,
+        "to": last,
+        "buckets": buckets,
+        **series,
+        "hours_by_tech_stack": [
+            {"tech_stack_id": tech_id, "tech_stack_name": names.get(tech_id), "hours": values}
+            for tech_id, values in sorted(hours.items())
+        ],
+    }
+
 # @app.post("/reviews")
 # def submit_review(review: dict):
 #     conn = connect_to_db()
@@ -1366,8 +1972,8 @@ def get_dashboard_stats(current_user: dict = Depends(get_current_user)):
 #     return {"message": "Review submitted successfully"}
 
 @app.post("/reviews")
-def submit_review(review: dict, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def submit_review(review: dict, current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
     cursor = conn.cursor()
     try:
         employee_id = review.get("employee_id")
@@ -1398,14 +2004,13 @@ def submit_review(review: dict, current_user: dict = Depends(get_current_user)):
             review.get("rating"),
             review.get("comment", None)
         ))
+        changeFeed.touch(current_user["user_id"], "reviews", employee_ids=[employee_id])
         conn.commit()
         return {"message": "Review submitted successfully"}
 
     except Exception as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 # @app.get("/employees/{employee_id}/reviews")
 # def get_reviews(employee_id: int):
@@ -1433,9 +2038,23 @@ def submit_review(review: dict, current_user: dict = Depends(get_current_user)):
 
 #     return reviews
 
+REVIEW_LIST = ListSpec(
+    "reviews", "review_id",
+    {
+        "review_id": SortKey("review_id", False),
+        "reviewed_at": SortKey("reviewed_at", True),
+        "rating": SortKey("rating", True),
+    },
+    "-reviewed_at",
+    ("review_id", "task_id", "rating", "comment", "reviewed_at"),
+)
+
+
 @app.get("/employees/{employee_id}/reviews")
-def get_reviews(employee_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def get_reviews(employee_id: int, params: ListParams = Depends(list_params),
+                current_user: dict = Depends(get_current_user), conn=Depends(get_db)):
+    page = REVIEW_LIST.page(params)
     cursor = conn.cursor()
 
     # 🔐 Check employee ownership
@@ -1443,16 +2062,16 @@ def get_reviews(employee_id: int, current_user: dict = Depends(get_current_user)
     if not cursor.fetchone():
         raise HTTPException(status_code=403, detail="Unauthorized")
 
-    cursor.execute("""
-        SELECT review_id, task_id, rating, comment, reviewed_at
+    keyset, keyset_params = page.where()
+    limit, limit_params = page.limit_clause()
+    cursor.execute(f"""
+        SELECT review_id, task_id, rating, comment, reviewed_at{page.columns}
         FROM reviews
-        WHERE employee_id = ?
-        ORDER BY reviewed_at DESC
-    """, (employee_id,))
+        WHERE employee_id = ? AND {keyset}
+        {page.order_by()} {limit}
+    """, [employee_id] + keyset_params + limit_params)
 
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    rows, next_cursor = page.rows(cursor.fetchall())
 
     reviews = [ {
         "review_id": r[0],
@@ -1462,7 +2081,11 @@ def get_reviews(employee_id: int, current_user: dict = Depends(get_current_user)
         "reviewed_at": r[4]
     } for r in rows ]
 
-    return reviews
+    def count():
+        cursor.execute("SELECT COUNT(*) FROM reviews WHERE employee_id = ?", (employee_id,))
+        return cursor.fetchone()[0]
+
+    return page.respond(reviews, next_cursor, current_user["user_id"], (employee_id,), count)
 
 
 
@@ -1483,60 +2106,54 @@ def get_reviews(employee_id: int, current_user: dict = Depends(get_current_user)
 #         raise HTTPException(status_code=404, detail="No tech skills found")
 
 @app.get("/employees/{employee_id}/suggested_tasks")
-def suggest_tasks(employee_id: int, current_user: dict = Depends(get_current_user)):
-    conn = connect_to_db()
+@offload("crud")
+def suggest_tasks(
+    employee_id: int,
+    limit: int = Query(10, ge=1, le=100, description="How many tasks to suggest"),
+    current_user: dict = Depends(get_current_user),
+    conn=Depends(get_db),
+):
     cursor = conn.cursor()
+    user_id = current_user["user_id"]
 
-    # 🔐 Confirm ownership of employee
-    cursor.execute("SELECT 1 FROM employees WHERE employee_id = ? AND user_id = ?", (employee_id, current_user["user_id"]))
-    if not cursor.fetchone():
+    # 🔐 The employee's skills and load come from the tenant's skill index, so only its employees are found
+    employee = skill_index.get(cursor, user_id).employee(employee_id)
+    if employee is None:
         raise HTTPException(status_code=403, detail="Unauthorized")
+    skill_ids, weekly_hours, open_hours = employee
 
-    tech_ids = [row.tech_stack_id for row in cursor.fetchall()]
-    # Step 2: Get matching unassigned, incomplete tasks
-    placeholders = ",".join("?" * len(tech_ids))
-    cursor.execute(f"""
-        SELECT t.task_id, t.estimated_hours, t.start_date, t.deadline, t.project_id,
-               p.project_name, ts.tech_stack_name
-        FROM tasks t
-        JOIN projects p ON t.project_id = p.project_id
-        JOIN tech_stack ts ON t.tech_stack_id = ts.tech_stack_id
-        WHERE t.employee_id IS NULL
-          AND t.completed = 0
-          AND t.tech_stack_id IN ({placeholders})
-        ORDER BY t.deadline ASC
-    """, *tech_ids)
-
-    tasks = [
+    # 💡 Unassigned open tasks of the tenant with those skills: fitting the spare hours first, by deadline
+    suggestions = task_suggestions.get(cursor, user_id).suggest(skill_ids, weekly_hours - open_hours, limit)
+    return [
         {
-            "task_id": row.task_id,
-            "project_name": row.project_name,
-            "tech_stack": row.tech_stack_name,
-            "estimated_hours": row.estimated_hours,
-            "start_date": row.start_date,
-            "deadline": row.deadline
+            "task_id": row[0],
+            "project_id": row[5],
+            "project_name": row[6],
+            "tech_stack": row[7],
+            "estimated_hours": row[2],
+            "start_date": row[3],
+            "deadline": row[4],
+            "fits_capacity": fits,
         }
-        for row in cursor.fetchall()
+        for row, fits in suggestions
     ]
-    conn.close()
-    return tasks
 
 @app.post("/auth/register")
-def register(form_data: OAuth2PasswordRequestForm = Depends()):
-    conn = connect_to_db()
+@offload("auth")
+def register(form_data: OAuth2PasswordRequestForm = Depends(), conn=Depends(get_db)):
     cursor = conn.cursor()
-    existing = get_user_by_username(form_data.username)
+    existing = get_user_by_username(conn, form_data.username)
     if existing:
         raise HTTPException(status_code=400, detail="Username already exists")
     hashed_pw = get_password_hash(form_data.password)
     cursor.execute("INSERT INTO users (username, hashed_password) VALUES (?, ?)", (form_data.username, hashed_pw))
     conn.commit()
-    conn.close()
     return {"message": "User registered"}
 
 @app.post("/auth/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = get_user_by_username(form_data.username)
+@offload("auth")
+def login(form_data: OAuth2PasswordRequestForm = Depends(), conn=Depends(get_db)):
+    user = get_user_by_username(conn, form_data.username)
     if not user or not verify_password(form_data.password, user["hashed_password"]):
         raise HTTPException(status_code=401, detail="Invalid username or password")
     access_token = create_access_token(data={"sub": str(user["user_id"])})
@@ -0,0 +1,10 @@
+# 🏷️ Every list/stat query starts with "WHERE user_id = ?" on projects or employees.
+DESCRIPTION = "Per-tenant indexes on projects and employees"
+ENDPOINTS = ["/projects", "/employees", "/stats/projects", "/stats/dept-workload"]
+
+
+def upgrade(cursor, dialect):
+    dialect.create_index(cursor, "ix_projects_user", "projects", ["user_id", "deadline"],
+                         include=["project_name", "client_name", "start_date"])
+    dialect.create_index(cursor, "ix_employees_user", "employees", ["user_id"],
+                         include=["employee_name", "role", "weekly_hours"])
@@ -0,0 +1,23 @@
+# 📋 Tasks are read by project (ProjectDetails), by employee (profiles, workload sums) and — for
+# suggestions — as the pool of open, unassigned tasks per technology.
+DESCRIPTION = "Task indexes for project, employee load and open-task lookups"
+ENDPOINTS = [
+    "/projects/{project_id}/tasks",
+    "/employees/{employee_id}",
+    "/tasks/{task_id}/candidates",
+    "/employees/{employee_id}/suggested_tasks",
+    "/analytics",
+]
+
+
+def upgrade(cursor, dialect):
+    dialect.create_index(cursor, "ix_tasks_project", "tasks", ["project_id"],
+                         include=["employee_id", "completed", "estimated_hours", "tech_stack_id"])
+    dialect.create_index(cursor, "ix_tasks_employee_completed", "tasks", ["employee_id", "completed"],
+                         include=["estimated_hours"])
+    # current load only ever sums incomplete tasks, so keep a small index of just those
+    dialect.create_index(cursor, "ix_tasks_open_by_employee", "tasks", ["employee_id"],
+                         include=["estimated_hours"], where="completed = 0")
+    dialect.create_index(cursor, "ix_tasks_unassigned_open", "tasks", ["tech_stack_id", "deadline"],
+                         where="employee_id IS NULL AND completed = 0")
+    dialect.create_index(cursor, "ix_employee_tech_stack_tech", "employee_tech_stack", ["tech_stack_id", "employee_id"])
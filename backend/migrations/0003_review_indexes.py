@@ -0,0 +1,8 @@
+# ⭐ Ratings are averaged per employee and the latest review is looked up per task.
+DESCRIPTION = "Review indexes by employee and by task"
+ENDPOINTS = ["/employees", "/employees/{employee_id}", "/tasks/{task_id}/candidates"]
+
+
+def upgrade(cursor, dialect):
+    dialect.create_index(cursor, "ix_reviews_employee", "reviews", ["employee_id"], include=["rating"])
+    dialect.create_index(cursor, "ix_reviews_task", "reviews", ["task_id", "review_id"], include=["rating"])
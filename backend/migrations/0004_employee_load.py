@@ -0,0 +1,26 @@
+# ⚖️ Per-employee load counters, kept up to date by the task write paths (src/employeeLoad.py)
+DESCRIPTION = "employee_load summary table (open hours, open tasks, total hours)"
+ENDPOINTS = ["/employees", "/employees/{employee_id}", "/tasks/{task_id}/candidates", "/analytics"]
+
+
+def upgrade(cursor, dialect):
+    if not dialect.table_exists(cursor, "employee_load"):
+        cursor.execute("""
+            CREATE TABLE employee_load (
+                employee_id INT PRIMARY KEY,
+                open_hours INT NOT NULL DEFAULT 0,
+                open_tasks INT NOT NULL DEFAULT 0,
+                total_hours INT NOT NULL DEFAULT 0
+            )
+        """)
+    cursor.execute("DELETE FROM employee_load")
+    cursor.execute("""
+        INSERT INTO employee_load (employee_id, open_hours, open_tasks, total_hours)
+        SELECT e.employee_id,
+               COALESCE(SUM(CASE WHEN t.completed = 0 THEN t.estimated_hours ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN t.completed = 0 THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(t.estimated_hours), 0)
+        FROM employees e
+        LEFT JOIN tasks t ON e.employee_id = t.employee_id
+        GROUP BY e.employee_id
+    """)
@@ -0,0 +1,26 @@
+# 📆 Day/week/month rollups for the trend charts, kept up to date by the project and task write paths
+# (src/trendRollups.py). Tasks get a completed_at date so completions can be bucketed; tasks completed
+# before this migration didn't record one, so their deadline (or start date) stands in for it.
+DESCRIPTION = "trend_rollups table and tasks.completed_at"
+ENDPOINTS = ["/stats/dashboard"]
+
+
+def upgrade(cursor, dialect):
+    dialect.add_column(cursor, "tasks", "completed_at", "DATE NULL")
+    cursor.execute("""
+        UPDATE tasks SET completed_at = COALESCE(deadline, start_date)
+        WHERE completed = 1 AND completed_at IS NULL
+    """)
+    if not dialect.table_exists(cursor, "trend_rollups"):
+        cursor.execute("""
+            CREATE TABLE trend_rollups (
+                user_id INT NOT NULL,
+                granularity CHAR(1) NOT NULL,
+                bucket DATE NOT NULL,
+                metric VARCHAR(20) NOT NULL,
+                tech_stack_id INT NOT NULL,
+                value INT NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, granularity, bucket, metric, tech_stack_id)
+            )
+        """)
+    # the rows are computed by 0008, which adds the tasks.created_at they bucket tasks by
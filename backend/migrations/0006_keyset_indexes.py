@@ -0,0 +1,13 @@
+# 📄 Keyset pages (src/listQuery.py) seek to "WHERE user_id = ? AND id > ?" in id order, and reviews
+# are listed newest first, so each list needs an index ordered the way its pages are read.
+DESCRIPTION = "Keyset pagination indexes for the project, employee and review lists"
+ENDPOINTS = ["/projects", "/employees", "/employees/{employee_id}/reviews"]
+
+
+def upgrade(cursor, dialect):
+    dialect.create_index(cursor, "ix_projects_user_id", "projects", ["user_id", "project_id"],
+                         include=["project_name", "client_name", "start_date", "deadline"])
+    dialect.create_index(cursor, "ix_employees_user_id", "employees", ["user_id", "employee_id"],
+                         include=["employee_name", "role", "weekly_hours"])
+    dialect.create_index(cursor, "ix_reviews_employee_reviewed", "reviews", ["employee_id", "reviewed_at", "review_id"],
+                         include=["rating"])
@@ -0,0 +1,11 @@
+# 🔎 Server-side filters: /employees by role within a tenant, and task lists by completion state and
+# deadline window within each of the tenant's projects (skill filters use ix_employee_tech_stack_tech).
+DESCRIPTION = "Indexes for the employee and task list filters"
+ENDPOINTS = ["/employees", "/tasks", "/projects/{project_id}/tasks"]
+
+
+def upgrade(cursor, dialect):
+    dialect.create_index(cursor, "ix_employees_user_role", "employees", ["user_id", "role"],
+                         include=["employee_name", "weekly_hours"])
+    dialect.create_index(cursor, "ix_tasks_project_state", "tasks", ["project_id", "completed", "deadline"],
+                         include=["employee_id", "tech_stack_id", "estimated_hours", "start_date"])
@@ -0,0 +1,13 @@
+# 📆 tasks_created and hours trends bucket tasks by the day they were created. start_date can't stand in
+# for that: assigning a task rewrites it (or clears it), which moved the task to another day of the
+# trend. Existing tasks didn't record a creation day, so their start date is the best guess.
+DESCRIPTION = "tasks.created_at for the task creation trends"
+ENDPOINTS = ["/stats/trends"]
+
+
+def upgrade(cursor, dialect):
+    from src import trendRollups
+
+    dialect.add_column(cursor, "tasks", "created_at", "DATE NULL")
+    cursor.execute("UPDATE tasks SET created_at = start_date WHERE created_at IS NULL")
+    trendRollups.rebuild(cursor)
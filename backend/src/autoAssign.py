@@ -0,0 +1,80 @@
+"""🤖 Auto-assign — the solver behind POST /projects/{id}/auto-assign.
+
+Greedy, in deadline order: tasks with the earliest deadline (then the biggest, so they aren't left
+without room) pick first. Each takes the skilled employee with the lowest load after taking it, as
+a share of their capacity (weekly_hours x capacity_pct), minus a bonus for a high average rating.
+Nobody is given more than their capacity. A task no one can take is reported with the reason.
+
+Each step is a handful of numpy operations over the employees that have the task's skill (taken
+from the tenant's skill index, src/skillIndex.py), so thousands of tasks against thousands of
+employees solve in well under a second. This is a heuristic, not an optimal matching: it balances
+load well, but a task can go unplaced when a different earlier choice would have left it room.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from src import skillIndex
+from src.trendRollups import as_date
+
+NO_SKILL = "No employee has this skill"
+NO_CAPACITY = "No skilled employee has enough free hours"
+NO_TECH_STACK = "Task has no tech stack"
+
+Placement = namedtuple("Placement", ["task_id", "row", "hours"])
+
+
+def _deadline_key(deadline):
+    day = as_date(deadline)
+    return day.toordinal() if day is not None else np.inf  # no deadline: last
+
+
+def solve(tasks, columns, capacity_pct=100, rating_weight=0.25):
+    """tasks: [(task_id, tech_stack_id, hours, deadline)]; columns: skillIndex.Columns of the tenant.
+
+    Returns (placements [Placement(task_id, employee row, hours)] in assignment order,
+    unplaced [(task_id, reason)], hours per employee row after the assignments)."""
+    capacity = columns.weekly_hours * (capacity_pct / 100.0)
+    used = columns.open_hours.copy()
+    # rating 1..5 -> 0..1; unrated employees sit in the middle
+    rating = np.where(np.isnan(columns.avg_rating), 0.5, (columns.avg_rating - 1) / 4)
+
+    task_ids = np.array([task[0] for task in tasks], dtype=np.int64)
+    hours = np.array([task[2] or 0 for task in tasks], dtype=float)
+    deadlines = np.array([_deadline_key(task[3]) for task in tasks], dtype=float)
+    order = np.lexsort((task_ids, -hours, deadlines))
+
+    # per skill, computed once: the employee rows (in id order, so ties go to the lowest id), their
+    # capacity, 1 / capacity and rating bonus
+    by_id = np.argsort(columns.ids, kind="stable")
+    skilled = {}
+    placements, unplaced = [], []
+    for i in order:
+        task_id, tech_stack_id = int(task_ids[i]), tasks[i][1]
+        if tech_stack_id is None:
+            unplaced.append((task_id, NO_TECH_STACK))
+            continue
+        group = skilled.get(tech_stack_id)
+        if group is None:
+            mask = skillIndex.match(columns.skills, columns.alive, [tech_stack_id])
+            rows = by_id[mask[by_id]]
+            room = capacity[rows]
+            inverse = np.divide(1.0, room, out=np.zeros(len(rows)), where=room > 0)
+            group = skilled[tech_stack_id] = (rows, room, inverse, rating_weight * rating[rows])
+        rows, room, inverse, bonus = group
+        if not len(rows):
+            unplaced.append((task_id, NO_SKILL))
+            continue
+
+        after = used[rows]
+        after += hours[i]
+        cost = after * inverse
+        cost -= bonus
+        cost[after > room] = np.inf
+        best = int(np.argmin(cost))
+        if cost[best] == np.inf:
+            unplaced.append((task_id, NO_CAPACITY))
+            continue
+        used[rows[best]] += hours[i]
+        placements.append(Placement(task_id, int(rows[best]), tasks[i][2]))
+    return placements, unplaced, used
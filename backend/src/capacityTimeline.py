@@ -0,0 +1,320 @@
+"""📅 Capacity timeline — each employee's open task hours spread over the weeks they'll be worked.
+
+Current load (employee_load) is one number per employee. Here each open task's estimated hours are
+spread evenly over the calendar days from its start_date to its deadline, and summed per Monday-based
+week into a float32 matrix per tenant (employees x weeks):
+
+    task: 30 h, Wed 4 Jun -> Tue 17 Jun (14 days)      week of 2 Jun: 5 days -> 10.7 h
+                                                       week of 9 Jun: 7 days -> 15.0 h
+                                                       week of 16 Jun: 2 days -> 4.3 h
+
+A task without a start_date sits in its deadline's week, one without a deadline in its start week, and
+one that starts after its deadline in its start week. A task with neither date can't be placed; its
+hours are reported per employee as unscheduled_hours. Completed tasks don't count.
+
+The matrix covers CAPACITY_WEEKS_BACK weeks before the current one and CAPACITY_WEEKS_AHEAD after it,
+and moves with the calendar: the first lookup in a new week reloads it around that week. It follows task
+writes employee by employee like the skill index (src/tenantCache.py), so /employees/{id}/capacity and
+/capacity/heatmap slice arrays in memory. A range reaching outside the window is answered from a
+timeline read from the database for just those weeks (CapacityTimeline.covering); a request may span at
+most as many weeks as the window holds.
+"""
+import json
+import os
+from datetime import date, timedelta
+from json.encoder import encode_basestring_ascii
+
+import numpy as np
+
+from src.metrics import Counter, GaugeFunc
+from src.tenantCache import TenantCache, TenantState
+from src.trendRollups import as_date
+
+CAPACITY_TIMELINE_ENABLED = os.getenv("CAPACITY_TIMELINE_ENABLED", "1") != "0"
+CAPACITY_TIMELINE_TTL = float(os.getenv("CAPACITY_TIMELINE_TTL", "300"))
+CAPACITY_TIMELINE_MAX_TENANTS = int(os.getenv("CAPACITY_TIMELINE_MAX_TENANTS", "64"))
+CAPACITY_WEEKS_BACK = int(os.getenv("CAPACITY_WEEKS_BACK", "52"))
+CAPACITY_WEEKS_AHEAD = int(os.getenv("CAPACITY_WEEKS_AHEAD", "104"))
+CAPACITY_MAX_WEEKS = CAPACITY_WEEKS_BACK + CAPACITY_WEEKS_AHEAD + 1  # per request, in the window or not
+
+timeline_refreshes = Counter("skillboard_capacity_timeline_refreshes_total",
+                             "Capacity timeline loads: whole tenant (full), dirty employees only (rows) "
+                             "or a range outside the window read for one request (outside)", ("kind",))
+
+EMPLOYEES_SQL = """
+    SELECT e.employee_id, e.employee_name, e.role, e.weekly_hours
+    FROM employees e
+    WHERE e.user_id = ?{only}
+"""
+
+TASKS_SQL = """
+    SELECT t.employee_id, t.estimated_hours, t.start_date, t.deadline
+    FROM tasks t
+    JOIN employees e ON t.employee_id = e.employee_id
+    WHERE e.user_id = ? AND t.completed = 0{only}
+"""
+
+
+def week_of(day):
+    """Monday-based week number (day 1 of the proleptic calendar, 0001-01-01, is a Monday)."""
+    return (day.toordinal() - 1) // 7
+
+
+def week_start(week):
+    return date.fromordinal(week * 7 + 1)
+
+
+def _ordinal(value):
+    day = as_date(value)
+    return day.toordinal() if day is not None else -1
+
+
+def spread(starts, ends, hours):
+    """Split each task's hours over the days start..end (ordinals, inclusive) by week.
+
+    Returns (task index, week number, hours) arrays with one entry per task and week it touches."""
+    first, last = (starts - 1) // 7, (ends - 1) // 7
+    weeks = last - first + 1
+    task = np.repeat(np.arange(len(starts)), weeks)
+    # 0, 1, 2... within each task's run of weeks
+    offset = np.arange(len(task)) - np.repeat(np.cumsum(weeks) - weeks, weeks)
+    week = first[task] + offset
+    monday = week * 7 + 1
+    days = np.minimum(ends[task], monday + 6) - np.maximum(starts[task], monday) + 1
+    return task, week, hours[task] * days / (ends - starts + 1)[task]
+
+
+def _string(value):
+    return "null" if value is None else encode_basestring_ascii(value)
+
+
+def _number(value):
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def _number_rows(values, scale):
+    """Each row of `values` rounded to 1/scale and joined as JSON numbers ("0,12.5,40").
+
+    A heatmap is hundreds of thousands of cells but only a few hundred distinct values, so each
+    distinct value is formatted once and the rows are joined from a lookup table; building a float
+    object per cell for json.dumps takes several times longer."""
+    if not values.size:
+        return ["" for _ in range(len(values))]
+    steps = np.rint(values * scale).astype(np.int64)
+    low = int(steps.min())
+    steps -= low
+    if steps.max() > 1_000_000:  # a few absurd cells: look values up by rank instead
+        distinct, steps = np.unique(steps, return_inverse=True)
+        steps = steps.reshape(values.shape)
+        table = np.array([_number((step + low) / scale) for step in distinct.tolist()], dtype=object)
+    else:
+        present = np.flatnonzero(np.bincount(steps.ravel()))
+        table = np.empty(int(present[-1]) + 1, dtype=object)
+        table[present] = [_number((step + low) / scale) for step in present.tolist()]
+    return [",".join(row) for row in table[steps].tolist()]
+
+
+class TenantTimeline(TenantState):
+    """One tenant's employees (rows) by weeks (columns) of planned open hours. The weeks are the window
+    around the current week, or the fixed `first_week` and `weeks` of a one-off range."""
+
+    def __init__(self, user_id, ttl=CAPACITY_TIMELINE_TTL, first_week=None, weeks=None):
+        super().__init__(user_id, ttl)
+        self.fixed = None if first_week is None else (first_week, weeks)
+        self._reset(0)
+
+    def _reset(self, size):
+        # the window moves with the calendar at each full load
+        self.anchor_week = week_of(date.today())
+        if self.fixed:
+            self.first_week, self.weeks = self.fixed
+        else:
+            self.first_week = self.anchor_week - CAPACITY_WEEKS_BACK
+            self.weeks = CAPACITY_MAX_WEEKS
+        self.ids = np.zeros(size, dtype=np.int64)
+        self.names = [None] * size
+        self.roles = [None] * size
+        self.weekly_hours = np.zeros(size)
+        self.alive = np.zeros(size, dtype=bool)
+        self.hours = np.zeros((size, self.weeks), dtype=np.float32)
+        self.unscheduled = np.zeros(size)
+        self.positions = {}
+
+    def refresh(self, cursor):
+        if self.loaded and not self.fixed and self.anchor_week != week_of(date.today()):
+            self.mark()  # a new week began since the load: reload the window around it
+        return super().refresh(cursor)
+
+    def load(self, cursor, employee_ids):
+        only, params = "", []
+        if employee_ids is not None:
+            only = f" AND e.employee_id IN ({', '.join('?' for _ in employee_ids)})"
+            params = list(employee_ids)
+        cursor.execute(EMPLOYEES_SQL.format(only=only), [self.user_id] + params)
+        employees = cursor.fetchall()
+        cursor.execute(TASKS_SQL.format(only=only), [self.user_id] + params)
+        return employees, cursor.fetchall()
+
+    def _set_employees(self, start, employees):
+        for offset, row in enumerate(employees):
+            at = start + offset
+            self.positions[row[0]] = at
+            self.ids[at], self.names[at], self.roles[at] = row[0], row[1], row[2]
+            self.weekly_hours[at] = row[3] or 0
+            self.alive[at] = True
+            self.hours[at] = 0
+            self.unscheduled[at] = 0
+
+    def _add_tasks(self, tasks):
+        rows, starts, ends, hours = [], [], [], []
+        for employee_id, estimated_hours, start_date, deadline in tasks:
+            at = self.positions.get(employee_id)
+            if at is None or not estimated_hours:
+                continue
+            start, end = _ordinal(start_date), _ordinal(deadline)
+            if start < 0 and end < 0:
+                self.unscheduled[at] += estimated_hours
+                continue
+            if start < 0 or end < start:
+                start, end = (end, end) if start < 0 else (start, start)
+            elif end < 0:
+                end = start
+            rows.append(at)
+            starts.append(start)
+            ends.append(end)
+            hours.append(estimated_hours)
+        if not rows:
+            return
+        task, week, share = spread(np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64),
+                                   np.array(hours, dtype=float))
+        column = week - self.first_week
+        inside = (column >= 0) & (column < self.weeks)
+        np.add.at(self.hours, (np.array(rows)[task[inside]], column[inside]), share[inside])
+
+    def replace(self, data):
+        employees, tasks = data
+        self._reset(len(employees))
+        self._set_employees(0, employees)
+        self._add_tasks(tasks)
+
+    def update(self, employee_ids, data):
+        employees, tasks = data
+        found = {row[0] for row in employees}
+        for employee_id in employee_ids:
+            if employee_id not in found and employee_id in self.positions:
+                self.alive[self.positions.pop(employee_id)] = False
+        known = [row for row in employees if row[0] in self.positions]
+        new = [row for row in employees if row[0] not in self.positions]
+        for row in known:
+            self._set_employees(self.positions[row[0]], [row])
+        if new:
+            start, extra = len(self.ids), len(new)
+            self.ids = np.concatenate([self.ids, np.zeros(extra, dtype=np.int64)])
+            self.names.extend([None] * extra)
+            self.roles.extend([None] * extra)
+            self.weekly_hours = np.concatenate([self.weekly_hours, np.zeros(extra)])
+            self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+            self.hours = np.vstack([self.hours, np.zeros((extra, self.weeks), dtype=np.float32)])
+            self.unscheduled = np.concatenate([self.unscheduled, np.zeros(extra)])
+            self._set_employees(start, new)
+        self._add_tasks(tasks)
+
+    def covers(self, start, end):
+        return week_of(start) >= self.first_week and week_of(end) < self.first_week + self.weeks
+
+    def columns(self, start, end):
+        """Column slice for the weeks containing `start` .. `end`; ValueError outside the window."""
+        first, last = week_of(start) - self.first_week, week_of(end) - self.first_week
+        if first < 0 or last >= self.weeks:
+            window = (week_start(self.first_week), week_start(self.first_week + self.weeks - 1))
+            raise ValueError(f"Only weeks from {window[0]} to {window[1]} are tracked")
+        return slice(first, last + 1)
+
+    def week_starts(self, span):
+        return [week_start(self.first_week + column).isoformat() for column in range(span.start, span.stop)]
+
+    def employee(self, employee_id, start, end):
+        """(name, weekly_hours, unscheduled hours, hours per week) of one employee; None if not in this tenant."""
+        span = self.columns(start, end)
+        with self._lock:
+            at = self.positions.get(employee_id)
+            if at is None:
+                return None
+            return (self.names[at], float(self.weekly_hours[at]), float(self.unscheduled[at]),
+                    self.hours[at, span].astype(float).tolist())
+
+    def heatmap(self, start, end, unit="hours", roles=None, min_load_pct=None):
+        """The /capacity/heatmap body as JSON text: live employees in id order, each with one cell per week
+        (planned hours, or % of weekly_hours). `roles` keeps only those roles; `min_load_pct` only the
+        employees above it in at least one week."""
+        span = self.columns(start, end)
+        with self._lock:
+            rows = np.flatnonzero(self.alive)
+            if roles:
+                rows = rows[[self.roles[row] in roles for row in rows]]
+            rows = rows[np.argsort(self.ids[rows], kind="stable")]
+            hours = self.hours[rows, span].astype(float)
+            weekly = self.weekly_hours[rows]
+            percent = np.divide(hours * 100, weekly[:, None], out=np.zeros_like(hours), where=weekly[:, None] > 0)
+            if min_load_pct is not None:
+                keep = (percent > min_load_pct).any(axis=1)
+                rows, hours, weekly, percent = rows[keep], hours[keep], weekly[keep], percent[keep]
+            names = [self.names[row] for row in rows]
+            roles = [self.roles[row] for row in rows]
+            ids = self.ids[rows].tolist()
+        cells = _number_rows(percent, 1) if unit == "percent" else _number_rows(hours, 10)
+        employees = ",".join(
+            f'{{"employee_id":{employee_id},"employee_name":{_string(name)},"role":{_string(role)},'
+            f'"weekly_hours":{_number(weekly_hours)},"cells":[{row}]}}'
+            for employee_id, name, role, weekly_hours, row in zip(ids, names, roles, weekly.tolist(), cells)
+        )
+        head = json.dumps({"unit": unit, "weeks": self.week_starts(span),
+                           "total_hours": np.round(hours.sum(axis=0), 1).tolist()}, separators=(",", ":"))
+        return f'{head[:-1]},"employees":[{employees}]}}'
+
+    def size(self):
+        return int(self.alive.sum())
+
+
+class CapacityTimeline(TenantCache):
+    def __init__(self, enabled=CAPACITY_TIMELINE_ENABLED, max_tenants=CAPACITY_TIMELINE_MAX_TENANTS):
+        super().__init__(TenantTimeline, enabled, max_tenants, timeline_refreshes)
+
+    def covering(self, cursor, user_id, start, end, employee_ids=None):
+        """A timeline holding the weeks `start` .. `end`: the tenant's window when they're inside it,
+        otherwise one read from the database for just those weeks (and just `employee_ids`, if given)."""
+        weeks = week_of(end) - week_of(start) + 1
+        if weeks > CAPACITY_MAX_WEEKS:
+            raise ValueError(f"At most {CAPACITY_MAX_WEEKS} weeks per request")
+        timeline = self.get(cursor, user_id)
+        if timeline.covers(start, end):
+            return timeline
+        outside = TenantTimeline(user_id, 0, first_week=week_of(start), weeks=weeks)
+        outside.replace(outside.load(cursor, employee_ids))
+        timeline_refreshes.inc("outside")
+        return outside
+
+    def stats(self):
+        tenants = self.tenants()
+        return {
+            "enabled": self.enabled,
+            "tenants": len(tenants),
+            "employees": sum(timeline.size() for timeline in tenants),
+            "bytes": sum(timeline.hours.nbytes for timeline in tenants),
+            "weeks_back": CAPACITY_WEEKS_BACK,
+            "weeks_ahead": CAPACITY_WEEKS_AHEAD,
+            "ttl": CAPACITY_TIMELINE_TTL,
+        }
+
+
+capacity_timeline = CapacityTimeline()
+
+
+def default_range(start, end, weeks=12):
+    """`start`..`end` with the blanks filled in: this week, and `weeks` weeks from the start."""
+    start = start or date.today()
+    return start, end or start + timedelta(weeks=weeks - 1)
+
+
+GaugeFunc("skillboard_capacity_timeline_bytes", "Bytes of hours-per-week arrays held by the capacity timeline", (),
+          lambda: {(): sum(timeline.hours.nbytes for timeline in capacity_timeline.tenants())})
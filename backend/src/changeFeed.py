@@ -0,0 +1,244 @@
+"""📡 Change feed — what each write changed, pushed to the tenant's /events subscribers (event_routes.py).
+
+Write paths record deltas while they run; PublishChanges hands them to the hub once the response
+starts with a success status (after the commit), so a rolled-back write never shows up. A delta:
+
+    {"tasks":     {"total": 1, "completed": 0},                  tenant-wide task counters
+     "projects":  {"168": {"completed": 1, "remaining": -1}},    same keys as /stats/dashboard progress
+     "employees": {"12": {"open_hours": -5, "open_tasks": -1}},  same counters as employee_load
+     "changed":   ["employees"],                                lists to refetch (created/edited/deleted rows)
+     "employee_ids": [12]}                                        which employees, when the write knows
+
+The hub merges a tenant's deltas for SSE_COALESCE_MS and sends the sum as one `changes` event, so a
+burst of writes (an upload, a batch of assignments) is one message per subscriber. A subscriber that
+falls SSE_QUEUE_SIZE events behind gets a `resync` event instead and should refetch.
+
+Listeners registered with on_commit() get every tenant's delta as soon as it's published, whether or
+not anyone is subscribed (the skill index uses this to stay current).
+
+Like the response cache, the hub lives in this process: with several API workers a subscriber only
+hears about writes handled by its own worker.
+"""
+import asyncio
+import json
+import os
+from contextvars import ContextVar
+
+from src.metrics import Counter, GaugeFunc
+
+SSE_COALESCE_SECONDS = float(os.getenv("SSE_COALESCE_MS", "250")) / 1000
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "100"))
+SSE_MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", "10000"))
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+events_sent = Counter("skillboard_sse_events_total", "Events queued for /events subscribers", ("event",))
+events_coalesced = Counter("skillboard_sse_coalesced_total", "Deltas merged into an already pending event")
+
+# user_id -> merged delta, for the request being handled (set by PublishChanges)
+_pending = ContextVar("change_feed_pending", default=None)
+
+# called with (user_id, delta) for every committed write, on the event loop: keep them quick
+_listeners = []
+
+
+def on_commit(listener):
+    _listeners.append(listener)
+
+
+def merge(into, delta):
+    for key, value in delta.items():
+        if isinstance(value, set):
+            into.setdefault(key, set()).update(value)
+        elif isinstance(value, dict):
+            merge(into.setdefault(key, {}), value)
+        else:
+            into[key] = into.get(key, 0) + value
+    return into
+
+
+def compact(delta):
+    """Drop zero counters and empty groups; sets become sorted lists (ready for json.dumps)."""
+    out = {}
+    for key, value in delta.items():
+        if isinstance(value, set):
+            value = sorted(value)
+        elif isinstance(value, dict):
+            value = compact(value)
+        if value:
+            out[str(key)] = value
+    return out
+
+
+def record(user_id, delta):
+    """Queue a delta for the tenant; dropped when there's no request to publish it (CLI, datagen)."""
+    pending = _pending.get()
+    if pending is None or user_id is None:
+        return
+    merge(pending.setdefault(user_id, {}), delta)
+
+
+def touch(user_id, *resources, employee_ids=(), project_ids=()):
+    """Rows of these lists ("employees", "projects", "tasks", "reviews") were created, edited or deleted.
+    employee_ids names the employees whose rows, skills, load or reviews changed, when that's known;
+    project_ids the projects whose tasks changed outside taskChanges (a release)."""
+    delta = {"changed": set(resources)}
+    if employee_ids:
+        delta["employee_ids"] = set(employee_ids)
+    if project_ids:
+        delta["project_ids"] = set(project_ids)
+    record(user_id, delta)
+
+
+def _task_counts(delta, project_id, employee_id, tasks, completed, open_hours, sign):
+    delta.setdefault("tasks", {})
+    merge(delta["tasks"], {"total": sign * tasks, "completed": sign * completed})
+    if project_id is not None:
+        merge(delta.setdefault("projects", {}),
+              {project_id: {"completed": sign * completed, "remaining": sign * (tasks - completed)}})
+    if employee_id is not None:
+        merge(delta.setdefault("employees", {}),
+              {employee_id: {"open_hours": sign * open_hours, "open_tasks": sign * (tasks - completed)}})
+
+
+def task_changed(before, after):
+    """One task moved from `before` to `after` (taskChanges.TaskState, either may be None)."""
+    deltas = {}
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None or state.user_id is None:
+            continue
+        completed = 1 if state.completed else 0
+        _task_counts(deltas.setdefault(state.user_id, {}), state.project_id, state.employee_id,
+                     1, completed, 0 if completed else state.hours, sign)
+    for user_id, delta in deltas.items():
+        record(user_id, delta)
+
+
+def collect(cursor, where, params):
+    """Counts of the tasks matching `where` (columns qualified as tasks.), before deleting them."""
+    cursor.execute(f"""
+        SELECT p.user_id, tasks.project_id, tasks.employee_id, COUNT(*),
+               SUM(CASE WHEN tasks.completed = 0 THEN 0 ELSE 1 END),
+               SUM(CASE WHEN tasks.completed = 0 THEN COALESCE(tasks.estimated_hours, 0) ELSE 0 END)
+        FROM tasks JOIN projects p ON tasks.project_id = p.project_id
+        WHERE {where}
+        GROUP BY p.user_id, tasks.project_id, tasks.employee_id
+    """, params)
+    return cursor.fetchall()
+
+
+def removed(collected):
+    for user_id, project_id, employee_id, tasks, completed, open_hours in collected:
+        delta = {}
+        _task_counts(delta, project_id, employee_id, tasks, completed or 0, open_hours or 0, -1)
+        record(user_id, delta)
+
+
+def format_event(event, data=None, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append("data: " + json.dumps(data if data is not None else {}, separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscriber:
+    def __init__(self, user_id, queue_size):
+        self.user_id = user_id
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, message, event):
+        if self.queue.full():
+            # too far behind for the deltas to be worth replaying: tell it to refetch instead
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            message, event = format_event("resync"), "resync"
+        self.queue.put_nowait(message)
+        events_sent.inc(event)
+
+
+class ChangeHub:
+    """Fan-out of merged deltas to each tenant's subscribers. Everything runs on the event loop."""
+
+    def __init__(self, coalesce=SSE_COALESCE_SECONDS, queue_size=SSE_QUEUE_SIZE, max_subscribers=SSE_MAX_SUBSCRIBERS):
+        self.coalesce = coalesce
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subscribers = {}  # user_id -> set of Subscriber
+        self._pending = {}      # user_id -> delta waiting for its flush
+        self._count = 0
+        self._seq = 0
+
+    def full(self):
+        return self._count >= self.max_subscribers
+
+    def subscribe(self, user_id):
+        subscriber = Subscriber(user_id, self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(subscriber)
+        self._count += 1
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        subscribers = self._subscribers.get(subscriber.user_id)
+        if subscribers and subscriber in subscribers:
+            subscribers.discard(subscriber)
+            self._count -= 1
+            if not subscribers:
+                del self._subscribers[subscriber.user_id]
+
+    def publish(self, user_id, delta):
+        if user_id not in self._subscribers:
+            return  # nobody listening: nothing to build
+        pending = self._pending.get(user_id)
+        if pending is None:
+            pending = self._pending[user_id] = {}
+            asyncio.get_running_loop().call_later(self.coalesce, self._flush, user_id)
+        else:
+            events_coalesced.inc()
+        merge(pending, delta)
+
+    def _flush(self, user_id):
+        delta = compact(self._pending.pop(user_id, {}))
+        subscribers = self._subscribers.get(user_id)
+        if not delta or not subscribers:
+            return
+        self._seq += 1
+        message = format_event("changes", delta, self._seq)  # serialized once for every subscriber
+        for subscriber in list(subscribers):
+            subscriber.put(message, "changes")
+
+    def stats(self):
+        return {"subscribers": self._count, "tenants": len(self._subscribers), "pending": len(self._pending)}
+
+
+change_hub = ChangeHub()
+
+GaugeFunc("skillboard_sse_subscribers", "Open /events streams", (), lambda: {(): change_hub._count})
+
+
+class PublishChanges:
+    """ASGI middleware: collects the deltas a POST/PUT/PATCH/DELETE records and publishes them when its
+    response starts with a status below 400 — after the handler committed."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            return await self.app(scope, receive, send)
+        pending = {}
+        token = _pending.set(pending)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                for user_id, delta in pending.items():
+                    for listener in _listeners:
+                        listener(user_id, delta)
+                    change_hub.publish(user_id, delta)
+                pending.clear()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _pending.reset(token)
@@ -0,0 +1,363 @@
+# 🗄️ Database backends — MSSQL (production) and embedded SQLite (local profiling / load tests)
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from functools import lru_cache
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "schema.sql")
+
+# ids per IN (...) list: SQL Server takes at most 2100 parameters in one statement
+IN_LIST_MAX = 1000
+
+
+def chunked(values, size=IN_LIST_MAX):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _values_lists(columns, rows):
+    """(placeholders, params) per multi-row INSERT: SQL Server takes at most 1000 rows and 2100 parameters."""
+    row = f"({', '.join('?' for _ in columns)})"
+    for part in chunked(rows, max(1, min(IN_LIST_MAX, 2000 // len(columns)))):
+        yield ", ".join(row for _ in part), [value for values in part for value in values]
+
+
+class MSSQLDialect:
+    name = "mssql"
+
+    def insert_returning_id(self, cursor, table, columns, params, id_column):
+        placeholders = ", ".join("?" for _ in columns)
+        cursor.execute(f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            OUTPUT INSERTED.{id_column}
+            VALUES ({placeholders})
+        """, tuple(params))
+        return cursor.fetchone()[0]
+
+    def insert_many_returning_ids(self, cursor, table, columns, rows, id_column):
+        """Ids of the inserted rows, in no particular order; a multi-row INSERT per 1000 rows."""
+        ids = []
+        for values, params in _values_lists(columns, rows):
+            cursor.execute(f"""
+                INSERT INTO {table} ({", ".join(columns)})
+                OUTPUT INSERTED.{id_column}
+                VALUES {values}
+            """, params)
+            ids.extend(row[0] for row in cursor.fetchall())
+        return ids
+
+    def identity_insert(self, cursor, table, enabled):
+        cursor.execute(f"SET IDENTITY_INSERT {table} {'ON' if enabled else 'OFF'}")
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SELECT 1 FROM sys.tables WHERE name = ?", (table,))
+        return cursor.fetchone() is not None
+
+    def add_column(self, cursor, table, column, definition):
+        cursor.execute("SELECT 1 FROM sys.columns WHERE object_id = OBJECT_ID(?) AND name = ?", (table, column))
+        if cursor.fetchone() is None:
+            cursor.execute(f"ALTER TABLE {table} ADD {column} {definition}")
+
+    def create_index(self, cursor, name, table, columns, include=(), where=None):
+        sql = f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"
+        if include:
+            sql += f" INCLUDE ({', '.join(include)})"
+        if where:
+            sql += f" WHERE {where}"
+        cursor.execute(f"""
+            IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = '{name}' AND object_id = OBJECT_ID('{table}'))
+            {sql}
+        """)
+
+    def limit_clause(self):
+        """Goes after ORDER BY; takes the row count as one ? param."""
+        return "OFFSET 0 ROWS FETCH NEXT ? ROWS ONLY"
+
+    def executemany(self, cursor, sql, rows):
+        """One statement over many parameter rows, sent as a single parameter array (fast_executemany)
+        instead of a round trip per row."""
+        if rows:
+            cursor.fast_executemany = True
+            cursor.executemany(sql, rows)
+
+    def begin(self, cursor):
+        pass  # pyodbc runs with autocommit off, DDL included
+
+    def begin_write(self, cursor):
+        pass  # the UPDLOCK hint from locked() serializes the read-then-write
+
+    def locked(self, table_ref):
+        """Table reference for a read whose rows the transaction is about to change."""
+        return f"{table_ref} WITH (UPDLOCK, ROWLOCK)"
+
+    def refresh_statistics(self, cursor):
+        pass  # SQL Server builds statistics for new indexes itself
+
+    def explain(self, cursor, sql, params):
+        """Estimated plan (showplan XML); the statement itself is not executed."""
+        cursor.execute("SET SHOWPLAN_XML ON")
+        try:
+            cursor.execute(sql, params)
+            return cursor.fetchone()[0]
+        finally:
+            cursor.execute("SET SHOWPLAN_XML OFF")
+
+
+class SQLiteDialect:
+    name = "sqlite"
+
+    def insert_returning_id(self, cursor, table, columns, params, id_column):
+        placeholders = ", ".join("?" for _ in columns)
+        cursor.execute(f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES ({placeholders})
+            RETURNING {id_column}
+        """, tuple(params))
+        return cursor.fetchone()[0]
+
+    def insert_many_returning_ids(self, cursor, table, columns, rows, id_column):
+        ids = []
+        for values, params in _values_lists(columns, rows):
+            cursor.execute(f"""
+                INSERT INTO {table} ({", ".join(columns)})
+                VALUES {values}
+                RETURNING {id_column}
+            """, params)
+            ids.extend(row[0] for row in cursor.fetchall())
+        return ids
+
+    def identity_insert(self, cursor, table, enabled):
+        pass  # SQLite accepts explicit values for INTEGER PRIMARY KEY columns
+
+    def table_exists(self, cursor, table):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone() is not None
+
+    def add_column(self, cursor, table, column, definition):
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in (row[1] for row in cursor.fetchall()):
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+    def create_index(self, cursor, name, table, columns, include=(), where=None):
+        # no INCLUDE in SQLite: covered columns go at the end of the key instead
+        sql = f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(list(columns) + list(include))})"
+        if where:
+            sql += f" WHERE {where}"
+        cursor.execute(sql)
+
+    def limit_clause(self):
+        return "LIMIT ?"
+
+    def executemany(self, cursor, sql, rows):
+        if rows:
+            cursor.executemany(sql, rows)  # already one prepared statement stepped over the rows
+
+    def begin(self, cursor):
+        cursor.execute("BEGIN")  # sqlite3 would otherwise autocommit each DDL statement
+
+    def begin_write(self, cursor):
+        # take the write lock before reading rows we are about to change (sqlite3 would only BEGIN
+        # at the first UPDATE, leaving the read outside the transaction)
+        if not cursor.connection.in_transaction:
+            cursor.execute("BEGIN IMMEDIATE")
+
+    def locked(self, table_ref):
+        return table_ref  # begin_write() already holds the database write lock
+
+    def refresh_statistics(self, cursor):
+        cursor.execute("ANALYZE")
+
+    def explain(self, cursor, sql, params):
+        """EXPLAIN QUERY PLAN as an indented tree; the statement itself is not executed."""
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        depth = {0: -1}
+        lines = []
+        for node_id, parent, _, detail in cursor.fetchall():
+            depth[node_id] = depth.get(parent, -1) + 1
+            lines.append("  " * depth[node_id] + detail)
+        return "\n".join(lines)
+
+
+class MSSQLBackend:
+    dialect = MSSQLDialect()
+
+    def __init__(self, connection_string):
+        self.connection_string = connection_string
+
+    def connect(self):
+        import pyodbc  # imported lazily so the SQLite backend runs without an ODBC driver manager
+        return pyodbc.connect(self.connection_string)
+
+
+# ---------------------------------------------------------------------------
+# SQLite
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=512)
+def _row_class(names):
+    """A tuple subclass with pyodbc-style attribute access (row.task_id) for one column layout."""
+    index = {name: i for i, name in enumerate(names)}
+
+    def __getattr__(self, name):
+        try:
+            return self[index[name]]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    return type("Row", (tuple,), {"__slots__": (), "__getattr__": __getattr__})
+
+
+def _row_factory(cursor, values):
+    return _row_class(tuple(d[0] for d in cursor.description))(values)
+
+
+class SQLiteCursor(sqlite3.Cursor):
+    """Accepts pyodbc's calling conventions: execute(sql, a, b) as well as execute(sql, (a, b))."""
+
+    fast_executemany = False  # pyodbc knob; SQLite's executemany is already a single prepared statement
+
+    def execute(self, sql, *params):
+        if len(params) == 1 and isinstance(params[0], (tuple, list, dict)):
+            params = params[0]
+        return super().execute(sql, params)
+
+
+class SQLiteConnection(sqlite3.Connection):
+    def cursor(self, factory=SQLiteCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, *params):
+        return self.cursor().execute(sql, *params)
+
+
+def _to_date(raw):
+    return date.fromisoformat(raw[:10].decode())
+
+
+def _to_datetime(raw):
+    text = raw.decode()
+    return datetime.fromisoformat(text) if len(text) > 10 else datetime.fromisoformat(text + " 00:00:00")
+
+
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("DATE", _to_date)
+sqlite3.register_converter("DATETIME", _to_datetime)
+sqlite3.register_converter("BIT", lambda raw: raw not in (b"0", b""))
+
+
+def _strip_sql_comments(script):
+    lines = []
+    for line in script.splitlines():
+        in_string = False
+        for i, ch in enumerate(line):
+            if ch == "'":
+                in_string = not in_string
+            elif ch == "-" and not in_string and line[i:i + 2] == "--":
+                line = line[:i]
+                break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def sqlite_statements_from_mssql(script, include_data=True):
+    """Translate the CREATE TABLE / INSERT statements of schema.sql into SQLite.
+
+    Everything else in the script (DROPs, sample SELECTs, the NOCHECK/DBCC reset block) is skipped,
+    so running the result never wipes existing data.
+    """
+    statements = []
+    for stmt in _strip_sql_comments(script).split(";"):
+        stmt = stmt.strip()
+        head = stmt[:12].upper()
+        if head.startswith("CREATE TABLE"):
+            stmt = re.sub(r"^CREATE TABLE\s+", "CREATE TABLE IF NOT EXISTS ", stmt, flags=re.I)
+            stmt = re.sub(r"\bINT\s+IDENTITY\s*\(\s*1\s*,\s*1\s*\)\s+PRIMARY KEY", "INTEGER PRIMARY KEY AUTOINCREMENT", stmt, flags=re.I)
+            stmt = re.sub(r"\bFOREIGN KEY\s+REFERENCES\b", "REFERENCES", stmt, flags=re.I)
+            stmt = re.sub(r"\bDATETIME\s+DEFAULT\s+GETDATE\(\)", "DATETIME DEFAULT CURRENT_TIMESTAMP", stmt, flags=re.I)
+            stmt = re.sub(r"\bDATE\s+DEFAULT\s+GETDATE\(\)", "DATE DEFAULT (date('now'))", stmt, flags=re.I)
+            statements.append(stmt)
+        elif include_data and head.startswith("INSERT INTO"):
+            statements.append(re.sub(r"\bGETDATE\(\)", "CURRENT_TIMESTAMP", stmt, flags=re.I))
+    return statements
+
+
+class SQLiteBackend:
+    dialect = SQLiteDialect()
+
+    def __init__(self, path, schema_path=SCHEMA_PATH, seed=True, auto_migrate=True, busy_timeout=5.0):
+        self.path = path
+        self.schema_path = schema_path
+        self.seed = seed
+        self.auto_migrate = auto_migrate
+        self.busy_timeout = busy_timeout
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.busy_timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,  # the pool hands connections to whichever worker thread asks
+            factory=SQLiteConnection,
+        )
+        conn.row_factory = _row_factory
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def initialize(self, conn):
+        """Create the schema.sql tables (plus its sample data on a fresh file) if they don't exist yet,
+        then bring the file up to date with the migrations."""
+        cursor = conn.cursor()
+        if not self.dialect.table_exists(cursor, "users"):
+            with open(self.schema_path, encoding="utf-8") as f:
+                statements = sqlite_statements_from_mssql(f.read(), include_data=self.seed)
+            for stmt in statements:
+                cursor.execute(stmt)
+            conn.commit()
+        if self.auto_migrate:
+            from src.migrations import apply_pending
+            apply_pending(conn, self.dialect, log=lambda *a: None)
+
+    def connect(self):
+        conn = self._open()
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self.initialize(conn)
+                    self._initialized = True
+        return conn
+
+
+def mssql_connection_string():
+    if os.getenv("DB_CONNECTION_STRING"):
+        return os.getenv("DB_CONNECTION_STRING")
+    parts = [
+        f"Driver={{{os.getenv('DB_DRIVER', 'ODBC Driver 17 for SQL Server')}}};",
+        f"Server={os.getenv('DB_HOST', 'AFSHAD')};",
+        f"Database={os.getenv('DB_NAME', 'WorkDB')};",
+    ]
+    if os.getenv("DB_USER"):
+        parts.append(f"UID={os.getenv('DB_USER')};PWD={os.getenv('DB_PASSWORD', '')};")
+    else:
+        parts.append("Trusted_Connection=yes;")
+    return "".join(parts)
+
+
+def backend_from_env():
+    kind = os.getenv("DB_BACKEND", "mssql").lower()
+    if kind == "sqlite":
+        return SQLiteBackend(
+            os.getenv("SQLITE_PATH", "skillboard.db"),
+            seed=os.getenv("SQLITE_SEED", "1") != "0",
+            auto_migrate=os.getenv("DB_AUTO_MIGRATE", "1") != "0",
+        )
+    if kind == "mssql":
+        return MSSQLBackend(mssql_connection_string())
+    raise ValueError(f"Unknown DB_BACKEND '{kind}' (expected 'mssql' or 'sqlite')")
@@ -1,14 +1,470 @@
-import pyodbc
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+
+from src.dbBackends import backend_from_env
+from src.metrics import GaugeFunc, Histogram, WAIT_BUCKETS
+
+log = logging.getLogger("skillboard")  # auth_utils attaches the RedactTokens filter
+
+# ⚙️ Pool settings (override through the environment)
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "1800"))   # seconds a connection may live
+POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))       # seconds to wait for a free connection
+POOL_PING_AFTER_IDLE = float(os.getenv("DB_POOL_PING_AFTER_IDLE", "1"))  # health-check connections idle longer than this
+
+
+pool_wait_seconds = Histogram("skillboard_db_pool_wait_seconds", "Time spent waiting for a pooled DB connection",
+                              buckets=WAIT_BUCKETS)
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class StatementCounter:
+    """Statements run while it is the current counter: how many, how long (execute + fetch) and
+    the rows they returned. `log` keeps one [sql, seconds, rows, params] entry per statement."""
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.log = []
+
+    def record(self, sql, seconds, params=None):
+        self.statements += 1
+        self.seconds += seconds
+        entry = [sql, seconds, 0, params]
+        self.log.append(entry)
+        return entry
+
+    def add_fetch(self, entry, seconds, rows):
+        entry[1] += seconds
+        entry[2] += rows
+        self.seconds += seconds
+        self.rows += rows
+
+
+# 🔢 Set around a request by the SQL instrumentation middleware (src/queryStats.py);
+# None means "don't count" (no overhead)
+statement_counter = ContextVar("statement_counter", default=None)
+
+
+@contextmanager
+def count_statements():
+    counter = StatementCounter()
+    token = statement_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        statement_counter.reset(token)
+
+
+class CountingCursor:
+    def __init__(self, cursor, counter):
+        self._cursor = cursor
+        self._counter = counter
+        self._entry = None
+
+    def execute(self, sql, *params):
+        start = time.perf_counter()
+        try:
+            self._cursor.execute(sql, *params)
+        finally:
+            # pyodbc takes both execute(sql, a, b) and execute(sql, (a, b))
+            bound = params[0] if len(params) == 1 and isinstance(params[0], (tuple, list)) else params
+            self._entry = self._counter.record(sql, time.perf_counter() - start, bound)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        start = time.perf_counter()
+        try:
+            self._cursor.executemany(sql, seq_of_params)
+        finally:
+            self._entry = self._counter.record(sql, time.perf_counter() - start)
+        return self
+
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        result = getattr(self._cursor, method)(*args)
+        if self._entry is not None:
+            rows = (1 if result is not None else 0) if method == "fetchone" else len(result)
+            self._counter.add_fetch(self._entry, time.perf_counter() - start, rows)
+        return result
+
+    def fetchone(self):
+        return self._fetch("fetchone")
+
+    def fetchall(self):
+        return self._fetch("fetchall")
+
+    def fetchmany(self, *size):
+        return self._fetch("fetchmany", *size)
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    @property
+    def fast_executemany(self):
+        return self._cursor.fast_executemany
+
+    @fast_executemany.setter
+    def fast_executemany(self, value):
+        self._cursor.fast_executemany = value  # a pyodbc cursor setting, not ours
+
+
+class PooledConnection:
+    """Proxy around a driver connection. close() hands it back to the pool instead of closing it."""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise RuntimeError("Connection has already been returned to the pool")
+        return getattr(self._raw, name)
+
+    def cursor(self):
+        cursor = self.__getattr__("cursor")()
+        counter = statement_counter.get()
+        return cursor if counter is None else CountingCursor(cursor, counter)
+
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw, self._created_at)
+
+
+class ConnectionPool:
+    def __init__(self, factory, min_size=POOL_MIN_SIZE, max_size=POOL_MAX_SIZE,
+                 max_lifetime=POOL_MAX_LIFETIME, acquire_timeout=POOL_ACQUIRE_TIMEOUT,
+                 ping_after_idle=POOL_PING_AFTER_IDLE):
+        self._factory = factory
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.max_lifetime = max_lifetime
+        self.acquire_timeout = acquire_timeout
+        self.ping_after_idle = ping_after_idle
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw, created_at, returned_at) — most recently used on the right
+        self._size = 0        # open connections, idle + checked out
+        self._in_use = 0
+        self._waiting = 0
+
+        self._acquired = 0
+        self._timeouts = 0
+        self._created = 0
+        self._discarded = 0
+        self._failed_checks = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _expired(self, created_at, now):
+        return self.max_lifetime > 0 and now - created_at >= self.max_lifetime
+
+    def _open(self):
+        raw = self._factory()
+        with self._cond:
+            self._created += 1
+        return raw
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._discarded += 1
+            self._cond.notify()
+
+    def _healthy(self, raw):
+        try:
+            cursor = raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            return True
+        except Exception:
+            with self._cond:
+                self._failed_checks += 1
+            return False
+
+    def acquire(self, timeout=None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            raw = created_at = returned_at = None
+            with self._cond:
+                while True:
+                    if self._idle:
+                        raw, created_at, returned_at = self._idle.pop()
+                        self._in_use += 1
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        self._in_use += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(f"No database connection available after {timeout:.1f}s")
+                    self._waiting += 1
+                    try:
+                        self._cond.wait(remaining)
+                    finally:
+                        self._waiting -= 1
+
+            now = time.monotonic()
+            if raw is None:
+                try:
+                    raw = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+                created_at = now
+            elif self._expired(created_at, now) or (
+                now - returned_at >= self.ping_after_idle and not self._healthy(raw)
+            ):
+                with self._cond:
+                    self._in_use -= 1
+                self._discard(raw)
+                continue
+
+            waited = now - start
+            pool_wait_seconds.observe(waited)
+            with self._cond:
+                self._acquired += 1
+                self._wait_total += waited
+                if waited > self._wait_max:
+                    self._wait_max = waited
+            return PooledConnection(self, raw, created_at)
+
+    def release(self, raw, created_at):
+        now = time.monotonic()
+        reusable = not self._expired(created_at, now)
+        if reusable:
+            try:
+                raw.rollback()  # 🧹 never hand out a connection with an open transaction
+            except Exception:
+                reusable = False
+
+        with self._cond:
+            self._in_use -= 1
+        if not reusable:
+            self._discard(raw)
+            return
+        with self._cond:
+            self._idle.append((raw, created_at, now))
+            self._cond.notify()
+
+    def warm(self):
+        """Open connections up to min_size so the first requests don't pay the handshake."""
+        opened = []
+        try:
+            while True:
+                with self._cond:
+                    if self._size >= self.min_size or self._size >= self.max_size:
+                        break
+                    self._size += 1
+                try:
+                    raw = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                    raise
+                opened.append(raw)
+        finally:
+            now = time.monotonic()
+            with self._cond:
+                for raw in opened:
+                    self._idle.appendleft((raw, now, now))
+                self._cond.notify_all()
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for raw, _, _ in idle:
+            self._discard(raw)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "utilization": round(self._in_use / self.max_size, 3),
+                "acquired": self._acquired,
+                "timeouts": self._timeouts,
+                "created": self._created,
+                "discarded": self._discarded,
+                "failed_health_checks": self._failed_checks,
+                "wait_seconds_total": round(self._wait_total, 6),
+                "wait_seconds_avg": round(self._wait_total / self._acquired, 6) if self._acquired else 0.0,
+                "wait_seconds_max": round(self._wait_max, 6),
+            }
+
+
+# 🔌 DB_BACKEND=mssql (default) or DB_BACKEND=sqlite for a local, in-process database
+backend = backend_from_env()
+dialect = backend.dialect
+pool = ConnectionPool(backend.connect)
+
+GaugeFunc("skillboard_db_pool_connections", "Pooled DB connections by state", ("state",),
+          lambda: {(state,): pool.stats()[state] for state in ("size", "idle", "in_use", "waiting")})
+
 
 def connect_to_db():
     try:
-        conn = pyodbc.connect(
-            "Driver={ODBC Driver 17 for SQL Server};"
-            "Server=AFSHAD;"
-            "Database=WorkDB;"
-            "Trusted_Connection=yes;"
-        )
-        return conn
-    except pyodbc.Error as e:
-        print("Connection failed:", e)
+        return pool.acquire()
+    except Exception as e:
+        log.warning("Connection failed: %s", e)
         return None
+
+
+class LazyConnection:
+    """Checks a pooled connection out on first use, from whichever thread uses it.
+
+    Route handlers run on their subsystem's executor (src/executors.py), so the checkout and the
+    queries happen on that executor's threads and never block the event loop or the shared threadpool.
+    """
+
+    is_lazy_connection = True
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+        self._closed = False
+
+    @property
+    def acquired(self):
+        return self._conn is not None
+
+    def _connection(self):
+        if self._conn is None:
+            if self._closed:
+                raise RuntimeError("Connection has already been returned to the pool")
+            try:
+                self._conn = self._pool.acquire()
+            except PoolTimeout as e:
+                log.warning("⛔ DB pool exhausted: %s", e)
+                raise HTTPException(status_code=503, detail="Database busy, try again")
+            except Exception as e:
+                log.warning("Connection failed: %s", e)
+                raise HTTPException(status_code=503, detail="Database connection failed")
+        return self._conn
+
+    def __getattr__(self, name):
+        return getattr(self._connection(), name)
+
+    def commit(self):
+        if self._conn is not None:
+            self._conn.commit()
+
+    def rollback(self):
+        if self._conn is not None:
+            self._conn.rollback()
+
+    def close(self):
+        self._closed = True
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            conn.close()
+
+
+class SharedConnection:
+    """One pooled connection lent to several handlers in turn — the /batch sub-requests.
+
+    Each handler gets a borrow(). A borrower takes the lock on its first statement and gives it back
+    (rolled back, so no read transaction leaks into the next handler) when its connection is closed:
+    handlers that need the database take turns on it, cache hits don't wait at all.
+    """
+
+    def __init__(self, pool):
+        self._lazy = LazyConnection(pool)
+        self._lock = threading.Lock()
+
+    def borrow(self):
+        return BorrowedConnection(self)
+
+    def close(self):
+        # a borrower still holding the lock is still using the connection: wait for it to give it back
+        # rather than roll back and re-lend a connection another thread is in the middle of
+        with self._lock:
+            self._lazy.close()
+
+
+class BorrowedConnection:
+    is_lazy_connection = True
+
+    def __init__(self, shared):
+        self._shared = shared
+        self._holding = False
+
+    @property
+    def acquired(self):
+        return self._holding
+
+    def _connection(self):
+        if not self._holding:
+            self._shared._lock.acquire()
+            self._holding = True
+        return self._shared._lazy._connection()
+
+    def __getattr__(self, name):
+        return getattr(self._connection(), name)
+
+    def commit(self):
+        if self._holding:
+            self._shared._lazy.commit()
+
+    def rollback(self):
+        if self._holding:
+            self._shared._lazy.rollback()
+
+    def close(self):
+        if not self._holding:
+            return
+        self._holding = False
+        try:
+            self._shared._lazy.rollback()
+        finally:
+            self._shared._lock.release()
+
+
+# 🔗 Set by /batch for its sub-requests: get_db lends them the batch's connection instead of the pool's
+shared_connection = ContextVar("shared_connection", default=None)
+
+
+async def get_db():
+    """FastAPI dependency: hands out a pooled connection and always returns it."""
+    shared = shared_connection.get()
+    conn = shared.borrow() if shared is not None else LazyConnection(pool)
+    try:
+        yield conn
+    finally:
+        if conn.acquired:
+            await run_in_threadpool(conn.close)
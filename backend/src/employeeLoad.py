@@ -0,0 +1,191 @@
+"""⚖️ employee_load — per-employee counters of open hours, open tasks and total hours.
+
+Every route that assigns, unassigns, completes, edits or deletes tasks updates the counters in the
+same transaction as the task change, so reads are a primary-key lookup instead of a SUM over the
+employee's whole task history. "Current load" everywhere means open_hours (incomplete tasks only).
+
+Write paths go through src/taskChanges.py, which hands apply_task_change() before/after snapshots
+of the task; bulk deletes use collect() before the write and apply(..., sign=-1) after it.
+
+    cd backend
+    python -m src.employeeLoad --check     # list employees whose counters disagree with tasks
+    python -m src.employeeLoad --rebuild   # recompute every counter from tasks
+"""
+import argparse
+import sys
+
+from src.dbBackends import chunked
+from src.dbConnect import dialect
+
+LOAD_SQL = """
+    SELECT e.employee_id,
+           COALESCE(SUM(CASE WHEN t.completed = 0 THEN t.estimated_hours ELSE 0 END), 0) AS open_hours,
+           COALESCE(SUM(CASE WHEN t.completed = 0 THEN 1 ELSE 0 END), 0) AS open_tasks,
+           COALESCE(SUM(t.estimated_hours), 0) AS total_hours
+    FROM employees e
+    LEFT JOIN tasks t ON e.employee_id = t.employee_id
+    {where}
+    GROUP BY e.employee_id
+"""
+
+
+def collect(cursor, where, params):
+    """Per-employee load of the tasks matching `where` (columns qualified as tasks.), read under a write lock.
+    Call it before deleting or unassigning those tasks, then apply(cursor, deltas, sign=-1)."""
+    dialect.begin_write(cursor)
+    cursor.execute(f"""
+        SELECT tasks.employee_id,
+               SUM(CASE WHEN completed = 0 THEN estimated_hours ELSE 0 END),
+               SUM(CASE WHEN completed = 0 THEN 1 ELSE 0 END),
+               SUM(estimated_hours)
+        FROM {dialect.locked('tasks')}
+        WHERE tasks.employee_id IS NOT NULL AND ({where})
+        GROUP BY tasks.employee_id
+    """, params)
+    return {row[0]: (row[1] or 0, row[2] or 0, row[3] or 0) for row in cursor.fetchall()}
+
+
+def apply(cursor, deltas, sign=1):
+    """deltas: {employee_id: (open_hours, open_tasks, total_hours)} added (sign=1) or removed (sign=-1)."""
+    for employee_id, (open_hours, open_tasks, total_hours) in deltas.items():
+        if not (open_hours or open_tasks or total_hours):
+            continue
+        cursor.execute("""
+            UPDATE employee_load
+            SET open_hours = open_hours + ?, open_tasks = open_tasks + ?, total_hours = total_hours + ?
+            WHERE employee_id = ?
+        """, (sign * open_hours, sign * open_tasks, sign * total_hours, employee_id))
+        if cursor.rowcount == 0:
+            # no counter row yet (employee created after the table was built): derive it from tasks,
+            # which already include this change
+            refresh(cursor, employee_id)
+
+
+def apply_bulk(cursor, deltas):
+    """Same result as apply(deltas) for many employees: one batched UPDATE, then the employees without
+    a counter row yet get theirs derived from tasks."""
+    deltas = {employee_id: d for employee_id, d in deltas.items() if any(d)}
+    dialect.executemany(cursor, """
+        UPDATE employee_load
+        SET open_hours = open_hours + ?, open_tasks = open_tasks + ?, total_hours = total_hours + ?
+        WHERE employee_id = ?
+    """, [(open_hours, open_tasks, total_hours, employee_id)
+          for employee_id, (open_hours, open_tasks, total_hours) in deltas.items()])
+    found = set()
+    for chunk in chunked(deltas):
+        cursor.execute(f"SELECT employee_id FROM employee_load WHERE employee_id IN ({', '.join('?' for _ in chunk)})", chunk)
+        found.update(row[0] for row in cursor.fetchall())
+    for employee_id in deltas.keys() - found:
+        refresh(cursor, employee_id)
+
+
+def task_deltas(before, after, deltas=None):
+    """One task's move from `before` to `after` (taskChanges.TaskState, either may be None), added into
+    {employee_id: [open_hours, open_tasks, total_hours]}."""
+    deltas = {} if deltas is None else deltas
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None or state.employee_id is None:
+            continue
+        employee_id, hours, completed = state.employee_id, state.hours, state.completed
+        d = deltas.setdefault(employee_id, [0, 0, 0])
+        d[2] += sign * hours
+        if not completed:
+            d[0] += sign * hours
+            d[1] += sign
+    return deltas
+
+
+def apply_task_change(cursor, before, after):
+    """Move one task's contribution from its old state to its new one (taskChanges.TaskState, either may be None)."""
+    apply(cursor, {employee_id: tuple(d) for employee_id, d in task_deltas(before, after).items()})
+
+
+def reset(cursor, employee_id):
+    """The employee no longer has any tasks (released)."""
+    cursor.execute(
+        "UPDATE employee_load SET open_hours = 0, open_tasks = 0, total_hours = 0 WHERE employee_id = ?",
+        (employee_id,),
+    )
+
+
+def forget(cursor, employee_id):
+    cursor.execute("DELETE FROM employee_load WHERE employee_id = ?", (employee_id,))
+
+
+def refresh(cursor, employee_id):
+    forget(cursor, employee_id)
+    cursor.execute(
+        "INSERT INTO employee_load (employee_id, open_hours, open_tasks, total_hours) "
+        + LOAD_SQL.format(where="WHERE e.employee_id = ?"),
+        (employee_id,),
+    )
+
+
+def rebuild(conn, user_id=None):
+    """Recompute counters from tasks (all employees, or one tenant's). Returns the number of rows written."""
+    cursor = conn.cursor()
+    if user_id is None:
+        cursor.execute("DELETE FROM employee_load")
+        cursor.execute("INSERT INTO employee_load (employee_id, open_hours, open_tasks, total_hours) "
+                       + LOAD_SQL.format(where=""))
+    else:
+        cursor.execute("DELETE FROM employee_load WHERE employee_id IN (SELECT employee_id FROM employees WHERE user_id = ?)",
+                       (user_id,))
+        cursor.execute("INSERT INTO employee_load (employee_id, open_hours, open_tasks, total_hours) "
+                       + LOAD_SQL.format(where="WHERE e.user_id = ?"), (user_id,))
+    written = cursor.rowcount
+    conn.commit()
+    return written
+
+
+def check(conn, user_id=None):
+    """Employees whose stored counters differ from what their tasks add up to. A missing row reads as
+    all zeros (that's how the endpoints LEFT JOIN it), so it only counts if the employee has tasks."""
+    cursor = conn.cursor()
+    where, params = ("WHERE e.user_id = ?", (user_id,)) if user_id is not None else ("", ())
+    cursor.execute(f"""
+        SELECT a.employee_id, a.open_hours, a.open_tasks, a.total_hours,
+               l.open_hours, l.open_tasks, l.total_hours
+        FROM ({LOAD_SQL.format(where=where)}) a
+        LEFT JOIN employee_load l ON a.employee_id = l.employee_id
+        WHERE a.open_hours <> COALESCE(l.open_hours, 0)
+           OR a.open_tasks <> COALESCE(l.open_tasks, 0)
+           OR a.total_hours <> COALESCE(l.total_hours, 0)
+    """, params)
+    return [
+        {
+            "employee_id": row[0],
+            "expected": {"open_hours": row[1], "open_tasks": row[2], "total_hours": row[3]},
+            "stored": None if row[4] is None else {"open_hours": row[4], "open_tasks": row[5], "total_hours": row[6]},
+        }
+        for row in cursor.fetchall()
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--check", action="store_true", help="report counters that disagree with tasks")
+    action.add_argument("--rebuild", action="store_true", help="recompute counters from tasks")
+    parser.add_argument("--user-id", type=int, help="only this tenant's employees")
+    args = parser.parse_args()
+
+    from src.dbConnect import pool
+
+    conn = pool.acquire()
+    try:
+        if args.check:
+            mismatches = check(conn, args.user_id)
+            for m in mismatches[:50]:
+                print(f"❌ employee {m['employee_id']}: stored {m['stored']}, tasks say {m['expected']}")
+            print(f"{'✅' if not mismatches else '⚠️'} {len(mismatches)} employee(s) out of sync")
+            sys.exit(1 if mismatches else 0)
+        written = rebuild(conn, args.user_id)
+        print(f"✅ Rebuilt load counters for {written} employee(s)")
+    finally:
+        conn.close()
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
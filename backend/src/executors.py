@@ -0,0 +1,162 @@
+# 🧵 Per-subsystem executors — each route group gets its own bounded thread pool and queue,
+# so a burst on one (e.g. /analytics) can't starve another (e.g. /auth/login).
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+from src.metrics import Counter, GaugeFunc
+
+log = logging.getLogger("skillboard")  # auth_utils attaches the RedactTokens filter
+
+# name: (default workers, default queue depth). Keep the worker total at or below DB_POOL_MAX_SIZE,
+# so every worker thread can always get a connection.
+SUBSYSTEMS = {
+    "auth": (4, 64),
+    "crud": (8, 256),
+    "analytics": (4, 64),
+    "imports": (2, 8),
+}
+
+EXECUTORS_ENABLED = os.getenv("EXECUTORS_ENABLED", "1") != "0"
+
+
+executor_rejected = Counter("skillboard_executor_rejected_total", "Requests turned away by a full executor",
+                            ("subsystem",))
+
+
+class ExecutorBusy(Exception):
+    pass
+
+
+class BoundedExecutor:
+    def __init__(self, name, workers, queue_depth):
+        self.name = name
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"skillboard-{name}")
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def _run(self, ctx, fn, args, kwargs):
+        with self._lock:
+            self._running += 1
+        try:
+            return ctx.run(fn, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _done(self, _future):
+        with self._lock:
+            self._pending -= 1
+            self._completed += 1
+        self._slots.release()
+
+    def submit(self, fn, *args, **kwargs):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            executor_rejected.inc(self.name)
+            raise ExecutorBusy(f"{self.name} executor is saturated ({self.workers} workers, {self.queue_depth} queued)")
+        with self._lock:
+            self._pending += 1
+        # contextvars (current request, query stats, ...) follow the work into the worker thread
+        future = self._pool.submit(self._run, contextvars.copy_context(), fn, args, kwargs)
+        future.add_done_callback(self._done)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+
+def _from_env(name, workers, queue_depth):
+    key = name.upper()
+    return BoundedExecutor(
+        name,
+        int(os.getenv(f"EXECUTOR_{key}_WORKERS", workers)),
+        int(os.getenv(f"EXECUTOR_{key}_QUEUE", queue_depth)),
+    )
+
+
+executors = {name: _from_env(name, *sizes) for name, sizes in SUBSYSTEMS.items()}
+
+
+def _in_flight():
+    values = {}
+    for name, ex in executors.items():
+        stats = ex.stats()
+        values[(name, "running")] = stats["running"]
+        values[(name, "queued")] = stats["queued"]
+    return values
+
+
+GaugeFunc("skillboard_executor_in_flight", "Handlers running or queued on each subsystem executor",
+          ("subsystem", "state"), _in_flight)
+
+
+def _call_and_release(fn, args, kwargs):
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        # hand pooled connections back from the worker thread that used them
+        for value in kwargs.values():
+            if getattr(value, "is_lazy_connection", False):
+                value.close()
+
+
+def offload(subsystem):
+    """Turn a blocking route handler into an async endpoint that runs on the subsystem's executor.
+
+    Requests beyond the executor's workers + queue depth are rejected with 503 instead of piling up.
+    """
+    executor = executors[subsystem]
+
+    def decorate(fn):
+        if not EXECUTORS_ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        async def endpoint(*args, **kwargs):
+            try:
+                return await executor.run(_call_and_release, fn, args, kwargs)
+            except ExecutorBusy as e:
+                log.warning("⛔ %s", e)
+                raise HTTPException(status_code=503, detail=f"Server busy ({subsystem}), try again",
+                                    headers={"Retry-After": "1"})
+
+        return endpoint
+
+    return decorate
+
+
+def executor_stats():
+    return {name: ex.stats() for name, ex in executors.items()}
+
+
+def shutdown_executors():
+    for ex in executors.values():
+        ex.shutdown()
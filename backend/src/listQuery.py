@@ -0,0 +1,204 @@
+"""📄 List paging — keyset cursors, sort keys and ?fields= for the tenant list endpoints.
+
+    ?sort=deadline | -deadline     one sort key (minus = descending), ties broken by the row id;
+                                   NULLs sort last either way
+    ?limit=50                      page size; turns the response into {"items", "next_cursor", "total_estimate"}
+    ?cursor=...                    next_cursor of the previous page (same sort)
+    ?fields=project_id,deadline    only these keys in each item
+
+Pages are keyset pages: the cursor holds the last row's sort value and id, and the next page starts
+with `WHERE (key, id) > (value, last_id)` — an index seek, however deep the client has paged, and no
+rows skipped or repeated when rows are added in between. Without limit/cursor an endpoint still
+returns its plain list, so existing clients see no change.
+
+total_estimate is an exact COUNT taken once per tenant data version (the response-cache version, bumped
+by every write) and reused for the following pages; a short first page needs no count at all.
+"""
+import base64
+import json
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+from src.dbConnect import dialect
+from src.responseCache import response_cache
+
+LIST_MAX_LIMIT = int(os.getenv("LIST_MAX_LIMIT", "500"))
+
+SortKey = namedtuple("SortKey", ["expr", "nullable"])
+ListParams = namedtuple("ListParams", ["sort", "cursor", "limit", "fields"])
+
+
+def list_params(
+    sort: Optional[str] = Query(None, description="sort key, prefix with - for descending"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: Optional[int] = Query(None, ge=1, le=LIST_MAX_LIMIT, description="page size"),
+    fields: Optional[str] = Query(None, description="comma-separated keys to return"),
+):
+    """FastAPI dependency shared by the paged list endpoints."""
+    return ListParams(sort, cursor, limit, fields)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if value is not None and not isinstance(value, (str, int, float, bool)):
+        return float(value)  # Decimal from SQL Server aggregates
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("bad cursor value")
+    return value
+
+
+def _split_fields(text):
+    return [name.strip() for name in (text or "").split(",") if name.strip()]
+
+
+class ListSpec:
+    """What one list endpoint can be sorted by and which keys its items have."""
+
+    def __init__(self, name, id_expr, sort_keys, default_sort, fields):
+        self.name = name
+        self.id_expr = id_expr
+        self.sort_keys = sort_keys        # name -> SortKey(SQL expression, may be NULL)
+        self.default_sort = default_sort
+        self.fields = tuple(fields)
+
+    def page(self, params: ListParams, extra_fields=()):
+        return Page(self, params, extra_fields)
+
+
+class Page:
+    def __init__(self, spec, params, extra_fields=()):
+        self.spec = spec
+        self.sort = params.sort or spec.default_sort
+        self.descending = self.sort.startswith("-")
+        self.key_name = self.sort.lstrip("-")
+        if self.key_name not in spec.sort_keys:
+            raise HTTPException(status_code=422, detail=f"Unknown sort key: {self.key_name} "
+                                                        f"(one of {', '.join(spec.sort_keys)})")
+        self.key = spec.sort_keys[self.key_name]
+        self.by_id = self.key.expr == spec.id_expr
+        self.paged = params.limit is not None or params.cursor is not None
+        self.limit = params.limit or LIST_MAX_LIMIT
+
+        allowed = spec.fields + tuple(extra_fields)
+        self.fields = _split_fields(params.fields)
+        unknown = [name for name in self.fields if name not in allowed]
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown field: {', '.join(unknown)}")
+
+        self.after = None
+        if params.cursor:
+            try:
+                state = json.loads(base64.urlsafe_b64decode(params.cursor.encode() + b"=="))
+                self.after = (_decode_value(state["v"]), state["i"])
+                if state["s"] != self.sort:
+                    raise HTTPException(status_code=422, detail="Cursor was issued for a different sort")
+            except HTTPException:
+                raise
+            except Exception:
+                raise HTTPException(status_code=422, detail="Invalid cursor")
+
+    def wants(self, *names):
+        """Does the client want any of these keys (all keys if it didn't pass ?fields=)."""
+        return not self.fields or any(name in self.fields for name in names)
+
+    @property
+    def columns(self):
+        """Trailing select-list columns the cursor is built from: sort value, then id."""
+        return f", {self.key.expr} AS sort_value, {self.spec.id_expr} AS sort_id"
+
+    def where(self):
+        """Keyset predicate (AND-able) and its params; rows after the cursor, in ORDER BY order."""
+        if self.after is None:
+            return "1 = 1", []
+        value, last_id = self.after
+        expr, id_expr = self.key.expr, self.spec.id_expr
+        op = "<" if self.descending else ">"
+        if self.by_id:
+            return f"{id_expr} {op} ?", [last_id]
+        if value is None:
+            return f"({expr} IS NULL AND {id_expr} > ?)", [last_id]
+        sql = f"({expr} {op} ? OR ({expr} = ? AND {id_expr} > ?)"
+        sql += f" OR {expr} IS NULL)" if self.key.nullable else ")"
+        return sql, [value, value, last_id]
+
+    def order_by(self):
+        direction = "DESC" if self.descending else "ASC"
+        if self.by_id:
+            return f"ORDER BY {self.spec.id_expr} {direction}"
+        nulls_last = f"CASE WHEN {self.key.expr} IS NULL THEN 1 ELSE 0 END, " if self.key.nullable else ""
+        return f"ORDER BY {nulls_last}{self.key.expr} {direction}, {self.spec.id_expr}"
+
+    def limit_clause(self):
+        """Goes after order_by(); one more row than the page so we know whether another follows."""
+        if not self.paged:
+            return "", []
+        return dialect.limit_clause(), [self.limit + 1]
+
+    def rows(self, rows):
+        """Trim the extra row; returns (rows of this page, next_cursor or None)."""
+        if not self.paged or len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        last = rows[-1]
+        state = {"s": self.sort, "v": _encode_value(last[-2]), "i": last[-1]}
+        return rows, base64.urlsafe_b64encode(json.dumps(state, separators=(",", ":")).encode()).decode().rstrip("=")
+
+    def project(self, item):
+        if not self.fields:
+            return item
+        return {name: item[name] for name in self.fields if name in item}
+
+    def respond(self, items, next_cursor, tenant, scope, count):
+        """Plain list, or the paged envelope. `count()` runs COUNT(*) for the whole list when needed."""
+        items = [self.project(item) for item in items]
+        if not self.paged:
+            return items
+        if self.after is None and next_cursor is None:
+            total = len(items)
+        else:
+            total = total_counts.get(tenant, (self.spec.name, scope), count)
+        return {"items": items, "next_cursor": next_cursor, "total_estimate": total}
+
+
+class TotalCounts:
+    """COUNT(*) per (tenant, list, scope), reused until the tenant's data version changes."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant, key, count):
+        version = response_cache.version(tenant)
+        key = (tenant,) + key
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+        total = count()
+        with self._lock:
+            self._entries[key] = (version, total)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return total
+
+
+total_counts = TotalCounts()
@@ -0,0 +1,185 @@
+# 📈 Prometheus-style metrics without the client library.
+# Writers only touch their own thread's shard (no lock on the hot path); /metrics sums the shards.
+import threading
+import time
+from bisect import bisect_left
+
+REGISTRY = []
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000, 50000)
+WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class _Shards:
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all = []
+
+    def mine(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:  # once per thread
+                self._all.append(shard)
+            return shard
+
+    def snapshot(self):
+        with self._lock:
+            shards = list(self._all)
+        return [dict(s) for s in shards]
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _Shards()
+        REGISTRY.append(self)
+
+    def inc(self, *labelvalues, amount=1):
+        shard = self._shards.mine()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def values(self):
+        totals = {}
+        for shard in self._shards.snapshot():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def collect(self):
+        for key, value in sorted(self.values().items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Gauge(Counter):
+    """Up/down gauge (in-flight requests): inc() when work starts, dec() when it ends."""
+
+    kind = "gauge"
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+
+class GaugeFunc:
+    """Gauge read at scrape time, for state something else already tracks (pool size, queue length)."""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labelnames, fn):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.fn = fn  # -> {labelvalues tuple: value}
+        REGISTRY.append(self)
+
+    def collect(self):
+        for key, value in sorted(self.fn().items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _Shards()
+        REGISTRY.append(self)
+
+    def observe(self, value, *labelvalues):
+        shard = self._shards.mine()
+        series = shard.get(labelvalues)
+        if series is None:
+            series = shard[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]  # bucket counts, sum, count
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def collect(self):
+        merged = {}
+        for shard in self._shards.snapshot():
+            for key, (counts, total, count) in shard.items():
+                m = merged.setdefault(key, [[0] * (len(self.buckets) + 1), 0.0, 0])
+                for i, c in enumerate(counts):
+                    m[0][i] += c
+                m[1] += total
+                m[2] += count
+        names = self.labelnames + ("le",)
+        for key, (counts, total, count) in sorted(merged.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                yield f"{self.name}_bucket{_labels(names, key + (_number(bound),))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {count}"
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+
+# 🌐 HTTP metrics
+http_requests = Counter("skillboard_http_requests_total", "HTTP requests by route template and status",
+                        ("method", "route", "status"))
+http_latency = Histogram("skillboard_http_request_duration_seconds", "HTTP request latency by route template",
+                         ("method", "route"))
+http_in_flight = Gauge("skillboard_http_requests_in_flight", "HTTP requests currently being served")
+
+
+class MetricsMiddleware:
+    """Plain ASGI middleware (no extra task per request like @app.middleware) that records latency,
+    status and in-flight count. The route label is the declared template, read after routing."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            http_in_flight.dec()
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            http_latency.observe(elapsed, scope["method"], route)
+            http_requests.inc(scope["method"], route, str(status[0]))
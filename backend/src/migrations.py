@@ -0,0 +1,234 @@
+"""Versioned, forward-only schema migrations.
+
+Each file in backend/migrations/ named NNNN_description.py is one migration and defines:
+
+    DESCRIPTION = "what it does"
+    ENDPOINTS = ["/projects", ...]       # routes it is meant to speed up (timed with --time-endpoints)
+    def upgrade(cursor, dialect): ...   # idempotent DDL, never drops or rewrites data
+
+Applied versions are recorded in the schema_migrations table, together with how long the migration
+took and, when requested, the before/after latency of its ENDPOINTS.
+
+    cd backend
+    python -m src.migrations --status
+    python -m src.migrations                           # apply everything pending
+    python -m src.migrations --time-endpoints --user-id 1
+
+The SQLite backend applies pending migrations on its own when it opens the database (DB_AUTO_MIGRATE=0
+turns that off); SQL Server databases are migrated by running this module.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(BACKEND_DIR, "migrations")
+FILENAME_RE = re.compile(r"^(\d{4})_(\w+)\.py$")
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration:
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.description = getattr(module, "DESCRIPTION", name.replace("_", " "))
+        self.endpoints = list(getattr(module, "ENDPOINTS", []))
+        self.upgrade = module.upgrade
+
+    def __repr__(self):
+        return f"<Migration {self.version:04d} {self.name}>"
+
+
+def discover(directory=MIGRATIONS_DIR):
+    migrations = {}
+    for filename in sorted(os.listdir(directory)):
+        match = FILENAME_RE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise MigrationError(f"Two migrations share version {version:04d}")
+        spec = importlib.util.spec_from_file_location(f"migrations.m{filename[:-3]}", os.path.join(directory, filename))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        migrations[version] = Migration(version, match.group(2), module)
+    return [migrations[v] for v in sorted(migrations)]
+
+
+def ensure_migrations_table(conn, dialect):
+    cursor = conn.cursor()
+    if not dialect.table_exists(cursor, "schema_migrations"):
+        cursor.execute("""
+            CREATE TABLE schema_migrations (
+                version INT PRIMARY KEY,
+                name VARCHAR(200) NOT NULL,
+                applied_at DATETIME NOT NULL,
+                duration_ms FLOAT NOT NULL,
+                timings TEXT
+            )
+        """)
+        conn.commit()
+
+
+def applied_versions(conn):
+    cursor = conn.cursor()
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def pending_migrations(conn, dialect, migrations=None):
+    ensure_migrations_table(conn, dialect)
+    migrations = discover() if migrations is None else migrations
+    applied = applied_versions(conn)
+    pending = [m for m in migrations if m.version not in applied]
+    if pending and applied and pending[0].version < max(applied):
+        # forward-only: never slot an old migration in underneath newer ones
+        raise MigrationError(
+            f"Migration {pending[0].version:04d} is older than the applied version {max(applied):04d}; "
+            "give it a new number"
+        )
+    return pending
+
+
+def apply_migration(conn, dialect, migration, timings=None):
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    try:
+        dialect.begin(cursor)
+        migration.upgrade(cursor, dialect)
+        duration_ms = (time.perf_counter() - start) * 1000
+        cursor.execute(
+            "INSERT INTO schema_migrations (version, name, applied_at, duration_ms, timings) VALUES (?, ?, ?, ?, ?)",
+            (migration.version, migration.name, datetime.now(), round(duration_ms, 2),
+             json.dumps(timings) if timings else None),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    dialect.refresh_statistics(conn.cursor())
+    conn.commit()
+    return duration_ms
+
+
+def record_timings(conn, migration, timings):
+    cursor = conn.cursor()
+    cursor.execute("UPDATE schema_migrations SET timings = ? WHERE version = ?",
+                   (json.dumps(timings), migration.version))
+    conn.commit()
+
+
+def apply_pending(conn, dialect, timer=None, log=print):
+    """Apply every pending migration in version order. `timer(endpoints)` -> {endpoint: ms}, if given,
+    is run before and after each migration and the results are stored with it."""
+    applied = []
+    for migration in pending_migrations(conn, dialect):
+        before = timer(migration.endpoints) if timer and migration.endpoints else None
+        log(f"⏫ {migration.version:04d} {migration.description} ...")
+        duration_ms = apply_migration(conn, dialect, migration)
+        log(f"   done in {duration_ms:.0f}ms")
+        if before is not None:
+            after = timer(migration.endpoints)
+            timings = {ep: {"before_ms": before[ep], "after_ms": after[ep]} for ep in migration.endpoints}
+            record_timings(conn, migration, timings)
+            for ep, t in timings.items():
+                log(f"   {ep:<44} {t['before_ms']:>9.2f}ms -> {t['after_ms']:>9.2f}ms")
+        applied.append(migration)
+    return applied
+
+
+class EndpointTimer:
+    """Times GET endpoints in-process against the app, as one tenant. Path parameters are filled in
+    with that tenant's first project, employee and task."""
+
+    def __init__(self, user_id, repeat):
+        from fastapi.testclient import TestClient
+        import main
+
+        self.client = TestClient(main.app)
+        self.headers = {"Authorization": f"Bearer {main.create_access_token({'sub': str(user_id)})}"}
+        self.repeat = repeat
+        self.params = self._sample_ids(user_id)
+
+    def _sample_ids(self, user_id):
+        from src.dbConnect import pool
+
+        conn = pool.acquire()
+        try:
+            cursor = conn.cursor()
+            params = {}
+            for key, table in (("project_id", "projects"), ("employee_id", "employees"), ("task_id", "tasks")):
+                cursor.execute(f"SELECT MIN({key}) FROM {table} WHERE user_id = ?", (user_id,))
+                params[key] = cursor.fetchone()[0]
+            return params
+        finally:
+            conn.close()
+
+    def __call__(self, endpoints):
+        results = {}
+        for endpoint in endpoints:
+            path = endpoint.format(**self.params)
+            self.client.get(path, headers=self.headers)  # warm-up
+            samples = []
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                response = self.client.get(path, headers=self.headers)
+                samples.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    print(f"⚠️ {path} returned {response.status_code}")
+            results[endpoint] = round(statistics.median(samples) * 1000, 2)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations, change nothing")
+    parser.add_argument("--time-endpoints", action="store_true",
+                        help="time each migration's ENDPOINTS before and after applying it")
+    parser.add_argument("--user-id", type=int, default=1, help="tenant used for --time-endpoints")
+    parser.add_argument("--repeat", type=int, default=20, help="requests per endpoint for --time-endpoints")
+    parser.add_argument("--sqlite", help="migrate this SQLite file instead of the configured database")
+    args = parser.parse_args()
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.chdir(BACKEND_DIR)
+    if args.sqlite:
+        os.environ["DB_BACKEND"] = "sqlite"
+        os.environ["SQLITE_PATH"] = args.sqlite
+    os.environ["DB_AUTO_MIGRATE"] = "0"  # this module is the one applying them
+
+    from src.dbConnect import pool, dialect
+
+    conn = pool.acquire()
+    try:
+        pending = pending_migrations(conn, dialect)
+        if args.status:
+            cursor = conn.cursor()
+            cursor.execute("SELECT version, name, applied_at, duration_ms FROM schema_migrations ORDER BY version")
+            for row in cursor.fetchall():
+                print(f"✅ {row[0]:04d} {row[1]:<40} applied {row[2]} ({row[3]:.0f}ms)")
+            for m in pending:
+                print(f"⏳ {m.version:04d} {m.name:<40} pending")
+            return
+        if not pending:
+            print("✅ Database is up to date")
+            return
+        timer = EndpointTimer(args.user_id, args.repeat) if args.time_endpoints else None
+        applied = apply_pending(conn, dialect, timer=timer)
+        print(f"✅ Applied {len(applied)} migration(s)")
+    finally:
+        conn.close()
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# 🔬 Per-request SQL instrumentation — counts and times every statement a request runs, reports it in
+# the Server-Timing / X-DB-Queries response headers and keeps a per-route aggregate for /debug/queries.
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+
+from src.dbConnect import count_statements
+from src.metrics import Histogram, ROW_BUCKETS
+from src.slowQueries import slow_query_log
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "1") != "0"
+MAX_STATEMENTS_PER_ROUTE = int(os.getenv("QUERY_STATS_MAX_STATEMENTS", "100"))
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """One line, literals replaced by ?, IN (?, ?, ...) lists collapsed — so the same query shape
+    always aggregates under the same key."""
+    sql = _COMMENT_RE.sub(" ", sql)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("(?...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def route_template(request):
+    """The path the route was declared with (/tasks/{task_id}/candidates), not the raw URL."""
+    route = request.scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
+
+
+query_rows = Histogram("skillboard_db_query_rows", "Rows returned per SQL statement", ("route",),
+                       buckets=ROW_BUCKETS)
+query_seconds = Histogram("skillboard_db_query_duration_seconds", "SQL statement time (execute + fetch)", ("route",))
+
+
+class RouteQueryStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, key, counter, seconds):
+        with self._lock:
+            route = self._routes.get(key)
+            if route is None:
+                route = self._routes[key] = {
+                    "requests": 0, "statements": 0, "max_statements": 0,
+                    "db_seconds": 0.0, "request_seconds": 0.0, "rows": 0, "queries": {},
+                }
+            route["requests"] += 1
+            route["statements"] += counter.statements
+            route["max_statements"] = max(route["max_statements"], counter.statements)
+            route["db_seconds"] += counter.seconds
+            route["request_seconds"] += seconds
+            route["rows"] += counter.rows
+            queries = route["queries"]
+            for sql, elapsed, rows, _ in counter.log:
+                text = normalize_sql(sql)
+                q = queries.get(text)
+                if q is None:
+                    if len(queries) >= MAX_STATEMENTS_PER_ROUTE:
+                        continue
+                    q = queries[text] = [0, 0.0, 0.0, 0]  # count, seconds, max seconds, rows
+                q[0] += 1
+                q[1] += elapsed
+                q[2] = max(q[2], elapsed)
+                q[3] += rows
+
+    def snapshot(self, limit=10):
+        with self._lock:
+            routes = {key: dict(r, queries=dict(r["queries"])) for key, r in self._routes.items()}
+        result = {}
+        for key, r in sorted(routes.items(), key=lambda kv: -kv[1]["db_seconds"]):
+            n = r["requests"]
+            queries = sorted(r["queries"].items(), key=lambda kv: -kv[1][1])[:limit]
+            result[key] = {
+                "requests": n,
+                "avg_statements": round(r["statements"] / n, 2),
+                "max_statements": r["max_statements"],
+                "avg_db_ms": round(r["db_seconds"] / n * 1000, 3),
+                "avg_request_ms": round(r["request_seconds"] / n * 1000, 3),
+                "avg_rows": round(r["rows"] / n, 1),
+                "statements": [
+                    {
+                        "sql": text,
+                        "count": count,
+                        "per_request": round(count / n, 2),  # > 1 on every request smells like N+1
+                        "total_ms": round(total * 1000, 3),
+                        "avg_ms": round(total / count * 1000, 3),
+                        "max_ms": round(peak * 1000, 3),
+                        "avg_rows": round(rows / count, 1),
+                    }
+                    for text, (count, total, peak, rows) in queries
+                ],
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+query_stats = RouteQueryStats()
+
+
+async def sql_instrumentation(request, call_next):
+    if not QUERY_STATS_ENABLED:
+        return await call_next(request)
+    with count_statements() as counter:
+        start = time.perf_counter()
+        response = await call_next(request)
+        elapsed = time.perf_counter() - start
+    template = route_template(request)
+    query_stats.record(f"{request.method} {template}", counter, elapsed)
+    for _, seconds, rows, _ in counter.log:
+        query_rows.observe(rows, template)
+        query_seconds.observe(seconds, template)
+    if slow_query_log.enabled:
+        slow_query_log.check(request.method, template, counter.log)
+    response.headers["X-DB-Queries"] = str(counter.statements)
+    response.headers["Server-Timing"] = (
+        f'db;dur={counter.seconds * 1000:.2f};desc="{counter.statements} queries", app;dur={elapsed * 1000:.2f}'
+    )
+    return response
@@ -0,0 +1,232 @@
+# 🗄️ Per-tenant response cache — GET payloads are kept per (user, path, query string) and tagged with
+# the tenant's data version. Any POST/PUT/PATCH/DELETE made by that tenant bumps the version, so the
+# next read recomputes. Responses carry a strong ETag (hash of the body) and If-None-Match gets a 304.
+#
+# Versions live in this process: with several API workers, a write on one worker doesn't invalidate the
+# others, and writes made outside the API (datagen, migrations, SQL) aren't seen. RESPONSE_CACHE_TTL
+# limits how long either can be served.
+import functools
+import hashlib
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+from src.metrics import Counter, GaugeFunc
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") != "0"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "5000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))  # seconds; 0 = until the next write
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+cache_lookups = Counter("skillboard_response_cache_total", "Response cache lookups by route and result",
+                        ("route", "result"))
+cache_not_modified = Counter("skillboard_response_cache_not_modified_total", "304 answers to If-None-Match",
+                             ("route",))
+cache_evictions = Counter("skillboard_response_cache_evictions_total", "Entries pushed out by the size limits")
+cache_invalidations = Counter("skillboard_response_cache_invalidations_total", "Tenant data-version bumps")
+
+
+def etag_for(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(header, etag):
+    """If-None-Match uses the weak comparison: W/ prefixes are ignored, * matches anything."""
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ResponseCache:
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, max_bytes=RESPONSE_CACHE_MAX_BYTES,
+                 ttl=RESPONSE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (version, stored_at, etag, body)
+        self._versions = {}            # user_id -> data version
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._hits = {}                # route -> [hits, misses], for hit_ratio()
+
+    def version(self, tenant):
+        return self._versions.get(tenant, 0)
+
+    def bump(self, tenant):
+        """The tenant's data changed: everything cached for it is stale from now on."""
+        with self._lock:
+            self._versions[tenant] = self._versions.get(tenant, 0) + 1
+        cache_invalidations.inc()
+
+    def get(self, key, version, route):
+        with self._lock:
+            entry = self._entries.get(key)
+            fresh = (
+                entry is not None
+                and entry[0] == version
+                and (self.ttl <= 0 or time.monotonic() - entry[1] < self.ttl)
+            )
+            if fresh:
+                self._entries.move_to_end(key)
+            counts = self._hits.setdefault(route, [0, 0])
+            counts[0 if fresh else 1] += 1
+        cache_lookups.inc(route, "hit" if fresh else "miss")
+        return entry if fresh else None
+
+    def put(self, key, version, etag, body):
+        if len(body) > self.max_bytes // 4:
+            return  # one payload shouldn't flush the whole cache
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[3])
+            self._entries[key] = (version, time.monotonic(), etag, body)
+            self._bytes += len(body)
+            evicted = 0
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped[3])
+                evicted += 1
+        if evicted:
+            cache_evictions.inc(amount=evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def hit_ratio(self):
+        with self._lock:
+            return {route: hits / (hits + misses) for route, (hits, misses) in self._hits.items() if hits + misses}
+
+    def stats(self):
+        with self._lock:
+            hits = sum(h for h, _ in self._hits.values())
+            misses = sum(m for _, m in self._hits.values())
+            per_route = {route: {"hits": h, "misses": m} for route, (h, m) in self._hits.items()}
+            entries, size = len(self._entries), self._bytes
+        return {
+            "enabled": RESPONSE_CACHE_ENABLED,
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / (hits + misses), 4) if hits + misses else None,
+            "routes": {
+                route: dict(c, hit_ratio=round(c["hits"] / (c["hits"] + c["misses"]), 4))
+                for route, c in sorted(per_route.items())
+            },
+        }
+
+
+response_cache = ResponseCache()
+
+GaugeFunc("skillboard_response_cache_entries", "Responses currently cached", (),
+          lambda: {(): len(response_cache._entries)})
+GaugeFunc("skillboard_response_cache_bytes", "Bytes of cached response bodies", (),
+          lambda: {(): response_cache._bytes})
+GaugeFunc("skillboard_response_cache_hit_ratio", "Cache hits / lookups since start, by route", ("route",),
+          lambda: {(route,): ratio for route, ratio in response_cache.hit_ratio().items()})
+
+
+def _respond(request, etag, body, cache_status):
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization", "X-Cache": cache_status}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        cache_not_modified.inc(getattr(request.scope.get("route"), "path", "<unmatched>"))
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def cached_response(fn):
+    """Cache a GET route's JSON per tenant. Goes between @app.get and @offload, so hits are answered
+    on the event loop without a worker thread or a DB connection (get_db is lazy).
+
+    The tenant is the `current_user` dependency; routes without one (/tech_stack) share one entry.
+    """
+    signature = inspect.signature(fn)
+    wants_request = "request" in signature.parameters
+    if not wants_request:
+        request_param = inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+        params = list(signature.parameters.values())
+        # keyword-only parameters have to come after the others
+        signature = signature.replace(parameters=[p for p in params if p.kind != p.VAR_KEYWORD]
+                                      + [request_param] + [p for p in params if p.kind == p.VAR_KEYWORD])
+
+    async def call(kwargs):
+        if inspect.iscoroutinefunction(fn):
+            return await fn(**kwargs)
+        return await run_in_threadpool(fn, **kwargs)
+
+    @functools.wraps(fn)
+    async def endpoint(**kwargs):
+        request = kwargs["request"] if wants_request else kwargs.pop("request")
+        if not RESPONSE_CACHE_ENABLED:
+            return await call(kwargs)
+
+        current_user = kwargs.get("current_user")
+        tenant = current_user["user_id"] if current_user else None
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        key = (tenant, request.url.path, request.url.query)
+        # read the version before the data: a write that commits while we compute makes this entry stale
+        version = response_cache.version(tenant)
+
+        entry = response_cache.get(key, version, route)
+        if entry is not None:
+            return _respond(request, entry[2], entry[3], "HIT")
+
+        result = await call(kwargs)
+        if isinstance(result, Response):
+            return result  # error responses and the like pass through uncached
+        body = JSONResponse(jsonable_encoder(result)).body
+        etag = etag_for(body)
+        response_cache.put(key, version, etag, body)
+        return _respond(request, etag, body, "MISS")
+
+    endpoint.__signature__ = signature
+    return endpoint
+
+
+class InvalidateOnWrite:
+    """ASGI middleware: when a POST/PUT/PATCH/DELETE by an authenticated user answers, bump that user's
+    data version (get_current_user leaves the user id in request.state). The bump happens as the
+    response starts — after the handler has committed, before the client can send its next read —
+    whatever the status."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            return await self.app(scope, receive, send)
+        bumped = [False]
+
+        def bump():
+            state = scope.get("state", {})
+            user_id = state.get("user_id")
+            # POST routes that only read (/batch) set read_only so they don't flush the tenant's cache
+            if user_id is not None and not bumped[0] and not state.get("read_only"):
+                bumped[0] = True
+                response_cache.bump(user_id)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                bump()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            bump()
@@ -0,0 +1,324 @@
+"""🧪 What-if simulation — the load and project forecasts a set of assignment changes would lead to,
+computed in memory without writing anything (POST /simulate).
+
+Per tenant, the open tasks (project, assignee, hours, deadline) and the projects' deadlines are held
+in memory, re-read by project as task writes commit like the task suggestion queues. A scenario
+never copies them: it is a small dict of the tasks it changed, laid over the shared snapshot
+(copy-on-write), so each simulation costs in proportion to the tasks and employees it touches.
+
+Load is open task hours against weekly_hours x capacity_pct, as in /tasks/{id}/candidates. The
+completion forecast assumes each employee works through their open tasks earliest deadline first at
+weekly_hours x capacity_pct / 7 hours a day, from today. A project's forecast is the day its last open
+task would be finished; it has none while a task is unassigned or held by someone with no hours.
+"""
+import math
+import os
+from collections import namedtuple
+from datetime import date, timedelta
+
+from src.metrics import Counter
+from src.tenantCache import ProjectTenantCache, TenantState
+from src.trendRollups import as_date
+
+SIMULATION_TTL = float(os.getenv("SIMULATION_TTL", "300"))
+SIMULATION_MAX_TENANTS = int(os.getenv("SIMULATION_MAX_TENANTS", "64"))
+SIMULATE_MAX_CHANGES = int(os.getenv("SIMULATE_MAX_CHANGES", "500"))
+
+plan_refreshes = Counter("skillboard_simulation_refreshes_total",
+                         "What-if snapshot loads: whole tenant (full) or dirty projects only (rows)", ("kind",))
+
+PROJECTS_SQL = """
+    SELECT p.project_id, p.project_name, p.deadline
+    FROM projects p
+    WHERE p.user_id = ?{only}
+"""
+
+TASKS_SQL = """
+    SELECT t.task_id, t.project_id, t.employee_id, t.estimated_hours, t.deadline
+    FROM tasks t
+    JOIN projects p ON t.project_id = p.project_id
+    WHERE p.user_id = ? AND t.completed = 0{only}
+"""
+
+NOT_FOUND = "Task not found, completed or not yours"
+
+PlannedTask = namedtuple("PlannedTask", ["project_id", "employee_id", "hours", "deadline"])
+
+
+def _ordinal(value):
+    day = as_date(value)
+    return day.toordinal() if day is not None else None
+
+
+class TenantPlan(TenantState):
+    """One tenant's open tasks and projects. Dirty ids here are project ids."""
+
+    def __init__(self, user_id, ttl=SIMULATION_TTL):
+        super().__init__(user_id, ttl)
+        self.tasks = {}        # task_id -> PlannedTask (deadline as an ordinal, or None)
+        self.projects = {}     # project_id -> (name, deadline ordinal)
+        self.by_project = {}   # project_id -> {task_id}
+        self.by_employee = {}  # employee_id -> {task_id}
+        self.finish = {}       # employee_id -> {capacity_pct: (weekly_hours, finish days)}, see baseline_finish()
+
+    def load(self, cursor, project_ids):
+        only, params = "", []
+        if project_ids is not None:
+            only = f" AND p.project_id IN ({', '.join('?' for _ in project_ids)})"
+            params = list(project_ids)
+        cursor.execute(PROJECTS_SQL.format(only=only), [self.user_id] + params)
+        projects = cursor.fetchall()
+        cursor.execute(TASKS_SQL.format(only=only), [self.user_id] + params)
+        return projects, cursor.fetchall()
+
+    def _add(self, projects, tasks):
+        for project_id, name, deadline in projects:
+            self.projects[project_id] = (name, _ordinal(deadline))
+        for task_id, project_id, employee_id, hours, deadline in tasks:
+            self.tasks[task_id] = PlannedTask(project_id, employee_id, hours or 0, _ordinal(deadline))
+            self.by_project.setdefault(project_id, set()).add(task_id)
+            if employee_id is not None:
+                self.by_employee.setdefault(employee_id, set()).add(task_id)
+                self.finish.pop(employee_id, None)
+
+    def replace(self, data):
+        self.tasks, self.projects, self.by_project, self.by_employee, self.finish = {}, {}, {}, {}, {}
+        self._add(*data)
+
+    def update(self, project_ids, data):
+        for project_id in project_ids:
+            self.projects.pop(project_id, None)
+            for task_id in self.by_project.pop(project_id, ()):
+                employee_id = self.tasks.pop(task_id).employee_id
+                if employee_id is not None:
+                    self.by_employee[employee_id].discard(task_id)
+                    self.finish.pop(employee_id, None)
+        self._add(*data)
+
+    def baseline_finish(self, employee_id, weekly_hours, capacity_pct):
+        """_finish_days() of the employee's queue as it stands, kept until their tasks or hours change:
+        most employees a scenario's projects involve aren't changed by it."""
+        cached = self.finish.setdefault(employee_id, {})
+        entry = cached.get(capacity_pct)
+        if entry is None or entry[0] != weekly_hours:
+            entry = cached[capacity_pct] = (weekly_hours, _finish_days(Scenario(self), employee_id,
+                                                                       weekly_hours * capacity_pct / 100 / 7))
+        return entry[1]
+
+    def size(self):
+        return len(self.tasks)
+
+
+class Scenario:
+    """The snapshot with some tasks changed: `changed` maps task ids to their new PlannedTask (None when
+    split away). Read under the plan's lock."""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.changed = {}
+        self._new_id = 0
+
+    def task(self, task_id):
+        if task_id in self.changed:
+            return self.changed[task_id]
+        return self.plan.tasks.get(task_id)
+
+    def add(self, task):
+        """A task that only exists in the scenario (the parts of a split), under a negative id."""
+        self._new_id -= 1
+        self.changed[self._new_id] = task
+
+    def touched_employees(self):
+        """Employees whose queue differs from the plan's: old and new assignees of the changed tasks."""
+        touched = set()
+        for task_id, task in self.changed.items():
+            for state in (self.plan.tasks.get(task_id), task):
+                if state is not None and state.employee_id is not None:
+                    touched.add(state.employee_id)
+        return touched
+
+    def employee_tasks(self, employee_id):
+        if not self.changed:
+            return self.plan.by_employee.get(employee_id, set())
+        kept = {task_id for task_id in self.plan.by_employee.get(employee_id, ()) if task_id not in self.changed}
+        return kept | {task_id for task_id, task in self.changed.items() if task and task.employee_id == employee_id}
+
+    def project_tasks(self, project_id):
+        if not self.changed:
+            return self.plan.by_project.get(project_id, set())
+        kept = {task_id for task_id in self.plan.by_project.get(project_id, ()) if task_id not in self.changed}
+        return kept | {task_id for task_id, task in self.changed.items() if task and task.project_id == project_id}
+
+
+def apply_change(scenario, change, employees):
+    """Apply one SimulatedChange to the scenario. Returns an error message, or None. `employees` is the
+    set of the tenant's employee ids."""
+    # only the snapshot's ids: the parts of a split live under negative ids the client mustn't reach
+    task = scenario.task(change.task_id) if change.task_id in scenario.plan.tasks else None
+    if task is None:
+        return NOT_FOUND
+    if change.op == "unassign":
+        scenario.changed[change.task_id] = task._replace(employee_id=None)
+    elif change.op == "hours":
+        if change.estimated_hours is None:
+            return "estimated_hours is required"
+        scenario.changed[change.task_id] = task._replace(hours=change.estimated_hours)
+    elif change.op == "deadline":
+        if change.deadline is not None:
+            try:
+                deadline = _ordinal(change.deadline)
+            except ValueError:
+                return "Invalid deadline"
+        elif change.shift_days is not None and task.deadline is not None:
+            deadline = task.deadline + change.shift_days
+        else:
+            return "deadline or shift_days (on a task with a deadline) is required"
+        scenario.changed[change.task_id] = task._replace(deadline=deadline)
+    else:  # assign: one employee, or a split into one task per employee like /tasks/assign
+        if not change.employee_ids:
+            return "No employee IDs provided"
+        unknown = [employee_id for employee_id in change.employee_ids if employee_id not in employees]
+        if unknown:
+            return f"Employee not found: {unknown[0]}"
+        if len(change.employee_ids) == 1:
+            scenario.changed[change.task_id] = task._replace(employee_id=change.employee_ids[0])
+        else:
+            if not change.hours or len(change.hours) != len(change.employee_ids):
+                return "Invalid hours list"
+            scenario.changed[change.task_id] = None
+            for employee_id, hours in zip(change.employee_ids, change.hours):
+                scenario.add(task._replace(employee_id=employee_id, hours=hours))
+    return None
+
+
+def _finish_days(view, employee_id, daily):
+    """{task_id: days from today until done} for the employee's open tasks, earliest deadline first;
+    None when they have no hours."""
+    if daily <= 0:
+        return None
+    tasks = [(view.task(task_id), task_id) for task_id in view.employee_tasks(employee_id)]
+    tasks.sort(key=lambda item: (item[0].deadline is None, item[0].deadline or 0, item[1]))
+    done, finish = 0.0, {}
+    for task, task_id in tasks:
+        done += task.hours
+        finish[task_id] = math.ceil(done / daily)
+    return finish
+
+
+def forecast(view, project_ids, workloads, capacity_pct, today):
+    """{project_id: forecast dict} of these projects as the Scenario `view` has them."""
+    finish_by_employee, touched = {}, view.touched_employees()
+
+    def finish(employee_id):
+        if employee_id not in finish_by_employee:
+            weekly = workloads[employee_id][1] if employee_id in workloads else 0
+            if employee_id in touched:
+                finish_by_employee[employee_id] = _finish_days(view, employee_id, weekly * capacity_pct / 100 / 7)
+            else:
+                finish_by_employee[employee_id] = view.plan.baseline_finish(employee_id, weekly, capacity_pct)
+        return finish_by_employee[employee_id]
+
+    forecasts = {}
+    for project_id in project_ids:
+        last, unplanned, late_tasks, remaining = 0, 0, 0, 0.0
+        for task_id in view.project_tasks(project_id):
+            task = view.task(task_id)
+            remaining += task.hours
+            days = None if task.employee_id is None else (finish(task.employee_id) or {}).get(task_id)
+            if days is None:
+                unplanned += 1
+                continue
+            last = max(last, days)
+            if task.deadline is not None and today.toordinal() + days > task.deadline:
+                late_tasks += 1
+        name, deadline = view.plan.projects.get(project_id, (None, None))
+        completion = None if unplanned else today + timedelta(days=last)
+        forecasts[project_id] = {
+            "project_id": project_id,
+            "project_name": name,
+            "deadline": date.fromordinal(deadline).isoformat() if deadline else None,
+            "remaining_hours": round(remaining, 2),
+            "unplanned_tasks": unplanned,
+            "late_tasks": late_tasks,
+            "forecast_completion": completion.isoformat() if completion else None,
+            "late": None if completion is None or deadline is None else completion.toordinal() > deadline,
+        }
+    return forecasts
+
+
+def simulate(plan, index, changes, capacity_pct=100, today=None):
+    """Apply `changes` (SimulatedChange) to a scenario over the tenant's plan. `index` is the tenant's
+    skill index (names, weekly and open hours). Returns the response body of POST /simulate."""
+    today = today or date.today()
+    with plan._lock:
+        scenario, before, errors = Scenario(plan), Scenario(plan), []
+        asked = {employee_id for change in changes if change.op == "assign" for employee_id in change.employee_ids or ()}
+        known = set(index.workloads(asked))
+        for at, change in enumerate(changes):
+            error = apply_change(scenario, change, known)
+            if error:
+                errors.append({"index": at, "task_id": change.task_id, "detail": error})
+
+        # whose load moves: the old and new assignee of every changed task
+        deltas, projects = {}, set()
+        for task_id, task in scenario.changed.items():
+            for state, sign in ((plan.tasks.get(task_id), -1), (task, 1)):
+                if state is None:
+                    continue
+                projects.add(state.project_id)
+                if state.employee_id is not None:
+                    deltas[state.employee_id] = deltas.get(state.employee_id, 0) + sign * state.hours
+        # whose forecasts move: the projects with a task in those employees' queues
+        for employee_id in deltas:
+            for view in (before, scenario):
+                projects.update(view.task(task_id).project_id for task_id in view.employee_tasks(employee_id))
+        working = set(deltas)
+        for project_id in projects:
+            for view in (before, scenario):
+                working.update(view.task(task_id).employee_id for task_id in view.project_tasks(project_id))
+        working.discard(None)
+        workloads = index.workloads(working)
+
+        forecasts_before = forecast(before, projects, workloads, capacity_pct, today)
+        forecasts_after = forecast(scenario, projects, workloads, capacity_pct, today)
+
+    employees = []
+    for employee_id in sorted(deltas):
+        if employee_id not in workloads:
+            continue
+        name, weekly_hours, open_hours = workloads[employee_id]
+        capacity = weekly_hours * capacity_pct / 100
+        after = open_hours + deltas[employee_id]
+        employees.append({
+            "employee_id": employee_id,
+            "employee_name": name,
+            "weekly_hours": weekly_hours,
+            "load_before": round(open_hours, 2),
+            "load_after": round(after, 2),
+            "load_percent": round(after / weekly_hours * 100, 0) if weekly_hours > 0 else 0,
+            "was_over_capacity": open_hours > capacity,
+            "over_capacity": after > capacity,
+        })
+    return {
+        "employees": employees,
+        "projects": [
+            {**forecasts_after[project_id],
+             "forecast_before": forecasts_before[project_id]["forecast_completion"],
+             "late_before": forecasts_before[project_id]["late"]}
+            for project_id in sorted(projects) if project_id in plan.projects
+        ],
+        "over_capacity": [employee["employee_id"] for employee in employees if employee["over_capacity"]],
+        "errors": errors,
+    }
+
+
+class Simulation(ProjectTenantCache):
+    def __init__(self, max_tenants=SIMULATION_MAX_TENANTS):
+        super().__init__(TenantPlan, True, max_tenants, plan_refreshes)
+
+    def stats(self):
+        tenants = self.tenants()
+        return {"tenants": len(tenants), "tasks": sum(plan.size() for plan in tenants), "ttl": SIMULATION_TTL}
+
+
+simulation = Simulation()
@@ -0,0 +1,272 @@
+"""🧭 Skill index — each tenant's employees held in memory as columns for /tasks/{id}/candidates.
+
+    ids, weekly_hours, open_hours, avg_rating   one numpy array each, row i = one employee
+    skills                                      uint64 bitset per row, bit n = tech_stack_id n
+
+Finding who has a skill is a test of one bit column over the whole tenant, and ranking the matches
+is a sort of a few float arrays, so a lookup costs well under a millisecond even for tenants with
+tens of thousands of employees. The first lookup of a tenant loads it with two queries.
+
+The index follows writes through the change feed (src/tenantCache.py): once a write commits, the
+employees it touched (load deltas from task changes, employee_ids from employee and review writes)
+are marked dirty, and the next lookup re-reads just those rows. A write that doesn't say which
+employees (a spreadsheet upload) reloads the tenant. Like the response cache the index lives in this
+process, so writes on another worker or outside the API are picked up when SKILL_INDEX_TTL expires.
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from src.metrics import Counter, GaugeFunc
+from src.tenantCache import TenantCache, TenantState
+
+SKILL_INDEX_ENABLED = os.getenv("SKILL_INDEX_ENABLED", "1") != "0"
+SKILL_INDEX_TTL = float(os.getenv("SKILL_INDEX_TTL", "300"))  # seconds; 0 = until a write says otherwise
+SKILL_INDEX_MAX_TENANTS = int(os.getenv("SKILL_INDEX_MAX_TENANTS", "256"))
+
+index_refreshes = Counter("skillboard_skill_index_refreshes_total",
+                          "Skill index loads: whole tenant (full) or dirty employees only (rows)", ("kind",))
+
+EMPLOYEES_SQL = """
+    SELECT e.employee_id, e.employee_name, e.weekly_hours, COALESCE(l.open_hours, 0), r.avg_rating
+    FROM employees e
+    LEFT JOIN employee_load l ON e.employee_id = l.employee_id
+    LEFT JOIN (
+        SELECT rv.employee_id, AVG(CAST(rv.rating AS FLOAT)) AS avg_rating
+        FROM reviews rv
+        JOIN employees re ON rv.employee_id = re.employee_id
+        WHERE re.user_id = ?{only_reviews}
+        GROUP BY rv.employee_id
+    ) r ON e.employee_id = r.employee_id
+    WHERE e.user_id = ?{only}
+"""
+
+SKILLS_SQL = """
+    SELECT ets.employee_id, ets.tech_stack_id
+    FROM employee_tech_stack ets
+    JOIN employees e ON ets.employee_id = e.employee_id
+    WHERE e.user_id = ?{only}
+"""
+
+
+def _bits(skill_ids):
+    """{word: mask} for a set of tech_stack ids."""
+    words = {}
+    for skill_id in skill_ids:
+        words[skill_id >> 6] = words.get(skill_id >> 6, 0) | (1 << (skill_id & 63))
+    return words
+
+
+# copies of one tenant's columns (TenantIndex.columns()), for callers that work on them at length
+Columns = namedtuple("Columns", ["ids", "names", "weekly_hours", "open_hours", "avg_rating", "skills", "alive"])
+
+
+def match(skills, alive, skill_ids):
+    """Boolean mask of the live rows whose bitset has every one of `skill_ids`."""
+    mask = alive.copy()
+    words = skills.shape[1]
+    for word, bits in _bits(skill_ids).items():
+        if word >= words:
+            return np.zeros(len(alive), dtype=bool)
+        bits = np.uint64(bits)
+        mask &= (skills[:, word] & bits) == bits
+    return mask
+
+
+def _plain(value):
+    """Whole hours as int, the way the SQL driver returns them."""
+    return int(value) if value.is_integer() else value
+
+
+def load(cursor, user_id, employee_ids=None):
+    """(rows, skill pairs) of the tenant's employees, or only of `employee_ids`."""
+    only, params = "", []
+    if employee_ids is not None:
+        marks = ", ".join("?" for _ in employee_ids)
+        only, params = f" AND e.employee_id IN ({marks})", list(employee_ids)
+    only_reviews = only.replace("e.employee_id", "re.employee_id")
+    cursor.execute(EMPLOYEES_SQL.format(only=only, only_reviews=only_reviews),
+                   [user_id] + params + [user_id] + params)
+    rows = cursor.fetchall()
+    cursor.execute(SKILLS_SQL.format(only=only), [user_id] + params)
+    return rows, cursor.fetchall()
+
+
+class TenantIndex(TenantState):
+    """One tenant's employees as parallel arrays. Deleted employees leave a dead row until the next
+    full load."""
+
+    def __init__(self, user_id, ttl=SKILL_INDEX_TTL):
+        super().__init__(user_id, ttl)
+        self._reset(0, 1)
+
+    def _reset(self, size, words):
+        self.ids = np.zeros(size, dtype=np.int64)
+        self.names = [None] * size
+        self.weekly_hours = np.zeros(size)
+        self.open_hours = np.zeros(size)
+        self.avg_rating = np.full(size, np.nan)
+        self.alive = np.zeros(size, dtype=bool)
+        self.skills = np.zeros((size, words), dtype=np.uint64)
+        self.positions = {}
+
+    def _fill(self, start, rows, skill_pairs):
+        end = start + len(rows)
+        for offset, row in enumerate(rows):
+            self.positions[row[0]] = start + offset
+            self.names[start + offset] = row[1]
+        self.ids[start:end] = [row[0] for row in rows]
+        self.weekly_hours[start:end] = [row[2] or 0 for row in rows]
+        self.open_hours[start:end] = [row[3] or 0 for row in rows]
+        self.avg_rating[start:end] = [np.nan if row[4] is None else row[4] for row in rows]
+        self.alive[start:end] = True
+        self.skills[start:end] = 0
+
+        pairs = [(self.positions[employee_id], skill_id) for employee_id, skill_id in skill_pairs
+                 if skill_id is not None and employee_id in self.positions]
+        if pairs:
+            rows_at, skill_ids = np.array(pairs, dtype=np.int64).T
+            self._widen(int(skill_ids.max()))
+            np.bitwise_or.at(self.skills, (rows_at, skill_ids >> 6),
+                             np.left_shift(np.uint64(1), (skill_ids & 63).astype(np.uint64)))
+
+    def _widen(self, skill_id):
+        words = (skill_id >> 6) + 1
+        if words > self.skills.shape[1]:
+            self.skills = np.hstack([self.skills, np.zeros((len(self.ids), words - self.skills.shape[1]), dtype=np.uint64)])
+
+    def load(self, cursor, employee_ids):
+        return load(cursor, self.user_id, employee_ids)
+
+    def replace(self, data):
+        rows, skill_pairs = data
+        self._reset(len(rows), self.skills.shape[1])
+        self._fill(0, rows, skill_pairs)
+
+    def update(self, employee_ids, data):
+        """Re-read rows of `employee_ids`: existing ones overwritten, new ones appended, missing ones dead."""
+        rows, skill_pairs = data
+        found = {row[0] for row in rows}
+        for employee_id in employee_ids:
+            if employee_id not in found and employee_id in self.positions:
+                self.alive[self.positions.pop(employee_id)] = False
+        known = [row for row in rows if row[0] in self.positions]
+        new = [row for row in rows if row[0] not in self.positions]
+        for row in known:
+            self._fill(self.positions[row[0]], [row], [pair for pair in skill_pairs if pair[0] == row[0]])
+        if new:
+            start, extra = len(self.ids), len(new)
+            self.ids = np.concatenate([self.ids, np.zeros(extra, dtype=np.int64)])
+            self.names.extend([None] * extra)
+            self.weekly_hours = np.concatenate([self.weekly_hours, np.zeros(extra)])
+            self.open_hours = np.concatenate([self.open_hours, np.zeros(extra)])
+            self.avg_rating = np.concatenate([self.avg_rating, np.full(extra, np.nan)])
+            self.alive = np.concatenate([self.alive, np.zeros(extra, dtype=bool)])
+            self.skills = np.vstack([self.skills, np.zeros((extra, self.skills.shape[1]), dtype=np.uint64)])
+            new_ids = {row[0] for row in new}
+            self._fill(start, new, [pair for pair in skill_pairs if pair[0] in new_ids])
+
+    def match(self, skill_ids):
+        """Boolean mask of the live employees that have every one of `skill_ids`."""
+        return match(self.skills, self.alive, skill_ids)
+
+    def employee(self, employee_id):
+        """(tech_stack ids, weekly_hours, open_hours) of one employee; None if not in this tenant."""
+        with self._lock:
+            at = self.positions.get(employee_id)
+            if at is None:
+                return None
+            words = self.skills[at].tolist()
+            skill_ids = [word * 64 + bit for word, bits in enumerate(words) for bit in range(64) if bits >> bit & 1]
+            return skill_ids, float(self.weekly_hours[at]), float(self.open_hours[at])
+
+    def workloads(self, employee_ids):
+        """{employee_id: (name, weekly_hours, open_hours)} of those of `employee_ids` in this tenant."""
+        with self._lock:
+            found = {}
+            for employee_id in employee_ids:
+                at = self.positions.get(employee_id)
+                if at is not None:
+                    found[employee_id] = (self.names[at], float(self.weekly_hours[at]), float(self.open_hours[at]))
+            return found
+
+    def columns(self):
+        with self._lock:
+            return Columns(self.ids.copy(), list(self.names), self.weekly_hours.copy(), self.open_hours.copy(),
+                           self.avg_rating.copy(), self.skills.copy(), self.alive.copy())
+
+    def candidates(self, skill_ids, hours, limit=None):
+        """Employees with the skills, best fit first: those the task keeps within their weekly hours,
+        then by load after taking the task, then by rating (unrated last), then by id."""
+        hours = hours or 0
+        with self._lock:
+            rows = np.flatnonzero(self.match(skill_ids))
+            weekly = self.weekly_hours[rows]
+            current = self.open_hours[rows]
+            tentative = current + hours
+            over = tentative > weekly
+            with np.errstate(divide="ignore", invalid="ignore"):
+                fill = np.where(weekly > 0, tentative / weekly, np.inf)
+            if limit is not None and limit < len(rows):
+                # top-k: before sorting, drop the rows that can't make the first `limit` — all that
+                # fit come ahead of all that don't, and within each group nothing past the limit-th fill
+                keep = np.zeros(len(rows), dtype=bool)
+                left = limit
+                for group in (~over, over):
+                    at = np.flatnonzero(group)
+                    if left > 0 and len(at):
+                        if len(at) > left:
+                            at = at[fill[at] <= np.partition(fill[at], left - 1)[left - 1]]
+                        keep[at] = True
+                    left -= int(group.sum())
+                rows, weekly, current, tentative, over, fill = (a[keep] for a in (rows, weekly, current, tentative, over, fill))
+            rating = self.avg_rating[rows]
+            order = np.lexsort((self.ids[rows], -np.nan_to_num(rating, nan=-np.inf), fill, over))
+            if limit is not None:
+                order = order[:limit]
+            # plain Python values in one pass per column, rather than a numpy scalar per field
+            picked = rows[order]
+            names = [self.names[row] for row in picked]
+            columns = zip(self.ids[picked].tolist(), names, weekly[order].tolist(), current[order].tolist(),
+                          tentative[order].tolist(), over[order].tolist(), rating[order].tolist())
+        return [
+            {
+                "employee_id": employee_id,
+                "employee_name": name,
+                "weekly_hours": _plain(weekly_hours),
+                "current_workload": _plain(open_hours),
+                "tentative_workload": _plain(after),
+                "over_capacity": is_over,
+                "average_rating": None if avg_rating != avg_rating else round(avg_rating, 2),  # NaN: no reviews
+                "load_percent": round((open_hours / weekly_hours) * 100, 0) if weekly_hours > 0 else 0,
+            }
+            for employee_id, name, weekly_hours, open_hours, after, is_over, avg_rating in columns
+        ]
+
+    def size(self):
+        return int(self.alive.sum())
+
+
+class SkillIndex(TenantCache):
+    """TenantIndex per user_id (src/tenantCache.py)."""
+
+    def __init__(self, enabled=SKILL_INDEX_ENABLED, max_tenants=SKILL_INDEX_MAX_TENANTS):
+        super().__init__(TenantIndex, enabled, max_tenants, index_refreshes)
+
+    def stats(self):
+        tenants = self.tenants()
+        return {
+            "enabled": self.enabled,
+            "tenants": len(tenants),
+            "employees": sum(index.size() for index in tenants),
+            "ttl": SKILL_INDEX_TTL,
+            "by_tenant": {index.user_id: {"employees": index.size(), "dirty": len(index.dirty), "stale": index.stale}
+                          for index in tenants},
+        }
+
+
+skill_index = SkillIndex()
+
+GaugeFunc("skillboard_skill_index_employees", "Employees held in the in-memory skill index", (),
+          lambda: {(): sum(index.size() for index in skill_index.tenants())})
@@ -0,0 +1,137 @@
+# 🐢 Slow-query log — statements over SLOW_QUERY_MS are written to SLOW_QUERY_LOG (one JSON object per
+# line) with redacted parameters, the route that ran them and the database's plan for them.
+# The request only drops an item on a queue; the plan lookup and the file write happen on a
+# background thread, so logging never adds latency to the request that was slow.
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, date
+
+from src.metrics import Counter
+
+log = logging.getLogger("skillboard")  # auth_utils attaches the RedactTokens filter
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "250"))          # 0 turns the log off
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "slow_queries.log")
+SLOW_QUERY_CAPTURE_PLANS = os.getenv("SLOW_QUERY_CAPTURE_PLANS", "1") != "0"
+SLOW_QUERY_PLAN_TTL = float(os.getenv("SLOW_QUERY_PLAN_TTL", "600"))  # seconds before a statement's plan is re-captured
+SLOW_QUERY_QUEUE = int(os.getenv("SLOW_QUERY_QUEUE", "1000"))
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+
+slow_queries_total = Counter("skillboard_db_slow_queries_total", "Statements slower than SLOW_QUERY_MS", ("route",))
+slow_queries_dropped = Counter("skillboard_db_slow_queries_dropped_total", "Slow-query log entries dropped (queue full)")
+
+
+def redact(value):
+    """Keep ids, numbers, flags and dates (they explain the plan); hide anything free-form."""
+    if value is None or isinstance(value, (bool, int, float, datetime, date)):
+        return value if not isinstance(value, (datetime, date)) else value.isoformat()
+    if isinstance(value, str):
+        return f"<str:{len(value)}>"
+    if isinstance(value, (bytes, bytearray)):
+        return f"<bytes:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms=SLOW_QUERY_MS, path=SLOW_QUERY_LOG, capture_plans=SLOW_QUERY_CAPTURE_PLANS,
+                 plan_ttl=SLOW_QUERY_PLAN_TTL, queue_size=SLOW_QUERY_QUEUE):
+        self.threshold = threshold_ms / 1000
+        self.path = path
+        self.capture_plans = capture_plans
+        self.plan_ttl = plan_ttl
+        self.recent = deque(maxlen=100)  # last entries, for /debug/slow-queries
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._plans = {}  # sql -> (captured_at, plan)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.threshold > 0
+
+    def check(self, method, route, log):
+        """Called at the end of a request with its statement log; only queues, never blocks."""
+        for sql, seconds, rows, params in log:
+            if seconds < self.threshold:
+                continue
+            slow_queries_total.inc(route)
+            self._ensure_worker()
+            try:
+                self._queue.put_nowait((datetime.now(), method, route, sql, seconds, rows, params))
+            except queue.Full:
+                slow_queries_dropped.inc()
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._drain, name="skillboard-slow-queries", daemon=True)
+                    self._thread.start()
+
+    def _drain(self):
+        while True:
+            item = self._queue.get()
+            try:
+                self._write(self._entry(*item))
+            except Exception as e:
+                log.warning("⚠️ Slow-query log failed: %s", e)
+            finally:
+                self._queue.task_done()
+
+    def _entry(self, logged_at, method, route, sql, seconds, rows, params):
+        entry = {
+            "at": logged_at.isoformat(timespec="milliseconds"),
+            "route": f"{method} {route}",
+            "duration_ms": round(seconds * 1000, 2),
+            "rows": rows,
+            "sql": " ".join(_COMMENT_RE.sub(" ", sql).split()),
+            "params": [redact(p) for p in params] if params is not None else None,
+        }
+        if self.capture_plans:
+            entry["plan"] = self._plan(sql, params)
+        return entry
+
+    def _plan(self, sql, params):
+        cached = self._plans.get(sql)
+        if cached and time.monotonic() - cached[0] < self.plan_ttl:
+            return cached[1]
+        if params is None and "?" in sql:
+            return None  # executemany: no single parameter set to plan with
+        from src.dbConnect import pool, dialect
+
+        try:
+            conn = pool.acquire(timeout=1)
+        except Exception as e:
+            return f"<not captured: {e}>"
+        try:
+            plan = dialect.explain(conn.cursor(), sql, tuple(params or ()))
+        except Exception as e:
+            plan = f"<not captured: {e}>"
+        finally:
+            conn.close()
+        if len(self._plans) >= 1000:
+            self._plans.clear()
+        self._plans[sql] = (time.monotonic(), plan)
+        return plan
+
+    def _write(self, entry):
+        self.recent.append(entry)
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+    def flush(self, timeout=5.0):
+        """Wait until queued entries are written (tests, benchmarks, shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+
+slow_query_log = SlowQueryLog()
@@ -0,0 +1,85 @@
+"""🔁 Task write hooks — the tables derived from tasks (employee_load, trend_rollups) are updated from
+before/after snapshots of the task, in the same transaction as the write, and the change is recorded
+for the /events feed (src/changeFeed.py):
+
+    before = taskChanges.snapshot(cursor, task_id)       # locked read
+    cursor.execute("UPDATE tasks ...")
+    taskChanges.apply(cursor, before, taskChanges.snapshot(cursor, task_id))
+
+Inserts pass before=None, deletes after=None. Bulk deletes use collect() before the DELETE and
+apply_removed() after it. Bulk updates take snapshot_many() before and after and hand the pairs to
+apply_many().
+"""
+from collections import namedtuple
+
+from src import changeFeed, employeeLoad, trendRollups
+from src.dbConnect import dialect
+
+# the first three fields are what employeeLoad.apply_task_change() reads
+TaskState = namedtuple("TaskState", [
+    "employee_id", "hours", "completed", "user_id", "tech_stack_id", "created_at", "completed_at", "project_id",
+])
+
+
+_SNAPSHOT_SQL = """
+    SELECT tasks.employee_id, tasks.estimated_hours, tasks.completed, p.user_id,
+           tasks.tech_stack_id, tasks.created_at, tasks.completed_at, tasks.project_id, tasks.task_id
+    FROM {tasks}
+    LEFT JOIN projects p ON tasks.project_id = p.project_id
+    WHERE {where}
+"""
+
+
+def _state(row):
+    # same rules as the SQL aggregates: NULL hours add nothing, only completed = 0 counts as open
+    return TaskState(row[0], row[1] or 0, row[2] is None or bool(row[2]), row[3], row[4], row[5], row[6], row[7])
+
+
+def snapshot(cursor, task_id):
+    """The task as the derived tables see it, read under a write lock; None if it's gone."""
+    dialect.begin_write(cursor)
+    cursor.execute(_SNAPSHOT_SQL.format(tasks=dialect.locked("tasks"), where="tasks.task_id = ?"), (task_id,))
+    row = cursor.fetchone()
+    return _state(row) if row else None
+
+
+def snapshot_many(cursor, where, params):
+    """{task_id: TaskState} of the tasks matching `where` (columns qualified as tasks.), under a write lock."""
+    dialect.begin_write(cursor)
+    cursor.execute(_SNAPSHOT_SQL.format(tasks=dialect.locked("tasks"), where=where), params)
+    return {row[8]: _state(row) for row in cursor.fetchall()}
+
+
+def apply(cursor, before, after):
+    employeeLoad.apply_task_change(cursor, before, after)
+    trendRollups.apply_task_change(cursor, before, after)
+    changeFeed.task_changed(before, after)
+
+
+def apply_many(cursor, changes):
+    """[(before, after)] of many tasks written together: the counters and rollups they touch are
+    updated with a few batched statements, instead of a few statements per task."""
+    load, rollups = {}, {}
+    for before, after in changes:
+        employeeLoad.task_deltas(before, after, load)
+        trendRollups.task_deltas(after, 1, trendRollups.task_deltas(before, -1, rollups))
+        changeFeed.task_changed(before, after)
+    employeeLoad.apply_bulk(cursor, load)
+    trendRollups.apply_bulk(cursor, rollups)
+
+
+def inserted(cursor, task_id):
+    apply(cursor, None, snapshot(cursor, task_id))
+
+
+def collect(cursor, where, params):
+    """Contribution of the tasks matching `where` (columns qualified as tasks.), before deleting them."""
+    return (employeeLoad.collect(cursor, where, params), trendRollups.collect(cursor, where, params),
+            changeFeed.collect(cursor, where, params))
+
+
+def apply_removed(cursor, collected):
+    load, rollups, feed = collected
+    employeeLoad.apply(cursor, load, sign=-1)
+    trendRollups.apply(cursor, rollups, sign=-1)
+    changeFeed.removed(feed)
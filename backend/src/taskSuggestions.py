@@ -0,0 +1,264 @@
+"""💡 Task suggestions — the open, unassigned tasks an employee could pick up next.
+
+Per tenant, the unassigned open tasks of each tech stack are kept as a queue in deadline order
+(no deadline last). An employee's suggestions merge the queues of their skills (from the skill
+index) and take the first `limit`: tasks that fit the employee's spare hours this week (weekly_hours
+minus open hours) come first, the most urgent first, then the ones that don't fit, again by deadline.
+
+Each queue carries a min and a max segment tree over its task hours, so "the next task in deadline
+order with hours <= spare" is a walk down one tree rather than a scan. A suggestion costs
+O(limit x skills x log tasks): it doesn't grow with the tenant's backlog.
+
+Tasks are re-read by project: a committed task write marks its project (the change feed lists the
+projects whose counters it touched), and the next lookup reloads that project's unassigned tasks and
+updates the queues in place. A task that's gone leaves a tombstone leaf (+inf in the min tree, -inf in
+the max tree), a new one takes a free leaf at its place in deadline order (shifting a few neighbours
+towards the nearest free leaf if needed), a new estimate rewrites its leaf: each is a few O(log tasks)
+point updates. The trees are built with free leaves spread between the tasks, and only rebuilt on a
+full reload (see src/tenantCache.py for the TTL) or when a queue runs out of free leaves.
+"""
+import heapq
+from bisect import bisect_right
+import os
+from itertools import islice
+
+import numpy as np
+
+from src.metrics import Counter
+from src.tenantCache import ProjectTenantCache, TenantState
+from src.trendRollups import as_date
+
+TASK_SUGGESTIONS_ENABLED = os.getenv("TASK_SUGGESTIONS_ENABLED", "1") != "0"
+TASK_SUGGESTIONS_TTL = float(os.getenv("TASK_SUGGESTIONS_TTL", "300"))
+TASK_SUGGESTIONS_MAX_TENANTS = int(os.getenv("TASK_SUGGESTIONS_MAX_TENANTS", "256"))
+
+suggestion_refreshes = Counter("skillboard_task_suggestions_refreshes_total",
+                               "Task suggestion queue loads: whole tenant (full) or dirty projects only (rows)", ("kind",))
+
+TASKS_SQL = """
+    SELECT t.task_id, t.tech_stack_id, t.estimated_hours, t.start_date, t.deadline, t.project_id,
+           p.project_name, ts.tech_stack_name
+    FROM tasks t
+    JOIN projects p ON t.project_id = p.project_id
+    LEFT JOIN tech_stack ts ON t.tech_stack_id = ts.tech_stack_id
+    WHERE p.user_id = ? AND t.employee_id IS NULL AND t.completed = 0 AND t.tech_stack_id IS NOT NULL{only}
+"""
+
+NO_DEADLINE = float("inf")
+
+
+def _tree(values, size, pick, pad):
+    """Segment tree as a flat list: leaves at size.., node i = pick(node 2i, node 2i+1)."""
+    tree = np.full(2 * size, pad)
+    tree[size:size + len(values)] = values
+    width = size // 2
+    while width:
+        tree[width:2 * width] = pick(tree[2 * width:4 * width:2], tree[2 * width + 1:4 * width:2])
+        width //= 2
+    return tree.tolist()  # walked one node at a time: list indexing beats numpy scalars
+
+
+def _first(tree, size, start, test):
+    """Index of the first leaf at or after `start` passing `test`, or -1. `test` on an inner node
+    says whether any leaf below it can pass."""
+    if start >= size:
+        return -1
+    i = start + size
+    while True:
+        if test(tree[i]):
+            while i < size:
+                i = 2 * i if test(tree[2 * i]) else 2 * i + 1
+            return i - size
+        while i & 1:  # a right child: nothing further right below the parent either
+            i >>= 1
+            if i <= 1:
+                return -1
+        i += 1
+
+
+class SkillQueue:
+    """One tech stack's unassigned tasks in deadline order, with min/max trees over their hours.
+
+    Leaves are slots: `ids[slot]` is the task there or None for a free slot. `keys` stays sorted across
+    all slots, so a free slot keeps the key of the task that left it (or of its left neighbour), and a
+    new key goes in by bisect."""
+
+    def __init__(self, deadlines, task_ids, hours):
+        order = np.lexsort((task_ids, deadlines))
+        self._build(list(zip(deadlines[order].tolist(), task_ids[order].tolist())), hours[order].tolist())
+
+    def _build(self, keys, hours):
+        count = len(keys)
+        self.size = 1
+        while self.size < 2 * count:  # half the leaves free, spread out, for the tasks added later
+            self.size *= 2
+        slots = [index * self.size // count for index in range(count)]
+        self.ids = [None] * self.size
+        self.keys = [None] * self.size
+        leaves = np.full(self.size, np.nan)
+        for slot, key, value in zip(slots, keys, hours):
+            self.ids[slot], self.keys[slot], leaves[slot] = key[1], key, value
+        previous = (-NO_DEADLINE, -1)
+        for slot in range(self.size):
+            previous = self.keys[slot] = self.keys[slot] or previous
+        self.slots = {key[1]: slot for slot, key in zip(slots, keys)}
+        free = np.isnan(leaves)
+        self.low = _tree(np.where(free, np.inf, leaves), self.size, np.minimum, np.inf)
+        self.high = _tree(np.where(free, -np.inf, leaves), self.size, np.maximum, -np.inf)
+
+    def _set(self, slot, low, high):
+        i = slot + self.size
+        self.low[i], self.high[i] = low, high
+        i >>= 1
+        while i:
+            self.low[i] = min(self.low[2 * i], self.low[2 * i + 1])
+            self.high[i] = max(self.high[2 * i], self.high[2 * i + 1])
+            i >>= 1
+
+    def _place(self, slot, key, hours):
+        self.ids[slot], self.keys[slot] = key[1], key
+        self.slots[key[1]] = slot
+        self._set(slot, hours, hours)
+
+    def remove(self, task_id):
+        slot = self.slots.pop(task_id)
+        self.ids[slot] = None  # the key stays, so the slots stay in order
+        self._set(slot, np.inf, -np.inf)
+
+    def add(self, deadline, task_id, hours):
+        key = (deadline, task_id)
+        at = bisect_right(self.keys, key)  # key goes between slot at-1 and slot at
+        if at > 0 and self.ids[at - 1] is None:
+            return self._place(at - 1, key, hours)
+        if at < self.size and self.ids[at] is None:
+            return self._place(at, key, hours)
+        left = next((slot for slot in range(at - 2, -1, -1) if self.ids[slot] is None), None)
+        right = next((slot for slot in range(at + 1, self.size) if self.ids[slot] is None), None)
+        if left is None and right is None:  # full: rebuild twice as wide
+            live = sorted((self.keys[slot], self.high[slot + self.size]) for slot in self.slots.values())
+            live.append((key, hours))
+            live.sort()
+            return self._build([item[0] for item in live], [item[1] for item in live])
+        if right is None or (left is not None and at - left < right - at):
+            for slot in range(left, at - 1):  # neighbours one slot left, towards the free one
+                self._place(slot, self.keys[slot + 1], self.high[slot + 1 + self.size])
+            return self._place(at - 1, key, hours)
+        for slot in range(right, at, -1):  # neighbours one slot right
+            self._place(slot, self.keys[slot - 1], self.high[slot - 1 + self.size])
+        return self._place(at, key, hours)
+
+    def walk(self, spare, fits):
+        """(deadline key, task_id) in deadline order of the tasks that fit `spare` hours (or don't)."""
+        tree = self.low if fits else self.high
+        test = (lambda hours: hours <= spare) if fits else (lambda hours: hours > spare)
+        at = _first(tree, self.size, 0, test)
+        while at >= 0:
+            yield self.keys[at]
+            at = _first(tree, self.size, at + 1, test)
+
+    def __len__(self):
+        return len(self.slots)
+
+
+class TenantTasks(TenantState):
+    """One tenant's unassigned open tasks by tech stack. Dirty ids here are project ids."""
+
+    def __init__(self, user_id, ttl=TASK_SUGGESTIONS_TTL):
+        super().__init__(user_id, ttl)
+        self.tasks = {}        # task_id -> row of TASKS_SQL
+        self.deadlines = {}    # task_id -> deadline ordinal (NO_DEADLINE without one)
+        self.by_project = {}   # project_id -> {task_id}
+        self.by_skill = {}     # tech_stack_id -> {task_id}
+        self.queues = {}       # tech_stack_id -> SkillQueue, built on the skill's first suggestion
+
+    def load(self, cursor, project_ids):
+        only, params = "", []
+        if project_ids is not None:
+            only = f" AND t.project_id IN ({', '.join('?' for _ in project_ids)})"
+            params = list(project_ids)
+        cursor.execute(TASKS_SQL.format(only=only), [self.user_id] + params)
+        return cursor.fetchall()
+
+    def _add(self, row):
+        task_id, tech_stack_id, project_id = row[0], row[1], row[5]
+        self.tasks[task_id] = tuple(row)
+        deadline = as_date(row[4])
+        self.deadlines[task_id] = deadline.toordinal() if deadline else NO_DEADLINE
+        self.by_project.setdefault(project_id, set()).add(task_id)
+        self.by_skill.setdefault(tech_stack_id, set()).add(task_id)
+        queue = self.queues.get(tech_stack_id)
+        if queue is not None:
+            queue.add(self.deadlines[task_id], task_id, row[2] or 0)
+
+    def _remove(self, task_id):
+        row = self.tasks.pop(task_id)
+        del self.deadlines[task_id]
+        self.by_project[row[5]].discard(task_id)
+        self.by_skill[row[1]].discard(task_id)
+        queue = self.queues.get(row[1])
+        if queue is not None:
+            queue.remove(task_id)
+
+    def replace(self, rows):
+        self.tasks, self.deadlines, self.by_project, self.by_skill, self.queues = {}, {}, {}, {}, {}
+        for row in rows:
+            self._add(row)
+
+    def update(self, project_ids, rows):
+        rows = {row[0]: tuple(row) for row in rows}
+        for project_id in project_ids:
+            for task_id in list(self.by_project.get(project_id, ())):
+                if task_id not in rows:
+                    self._remove(task_id)
+        for task_id, row in rows.items():
+            old = self.tasks.get(task_id)
+            if old == row:
+                continue
+            if old is not None and old[1] == row[1] and old[2] == row[2] and old[4] == row[4] and old[5] == row[5]:
+                self.tasks[task_id] = row  # a renamed project or skill: the queue doesn't change
+                continue
+            if old is not None:
+                self._remove(task_id)
+            self._add(row)
+
+    def _queue(self, tech_stack_id):
+        queue = self.queues.get(tech_stack_id)
+        if queue is None:
+            task_ids = list(self.by_skill.get(tech_stack_id, ()))
+            queue = self.queues[tech_stack_id] = SkillQueue(
+                np.array([self.deadlines[task_id] for task_id in task_ids], dtype=float),
+                np.array(task_ids, dtype=np.int64),
+                np.array([self.tasks[task_id][2] or 0 for task_id in task_ids], dtype=float),
+            )
+        return queue
+
+    def suggest(self, skill_ids, spare, limit):
+        """Up to `limit` [(task row, fits spare hours)]: the fitting tasks of these skills by deadline,
+        then the rest by deadline."""
+        with self._lock:
+            queues = [self._queue(skill_id) for skill_id in skill_ids]
+            picked = []
+            for fits in (True, False):
+                merged = heapq.merge(*(queue.walk(spare, fits) for queue in queues if len(queue)))
+                picked += [(self.tasks[task_id], fits) for _, task_id in islice(merged, limit - len(picked))]
+            return picked
+
+    def size(self):
+        return len(self.tasks)
+
+
+class TaskSuggestions(ProjectTenantCache):
+    def __init__(self, enabled=TASK_SUGGESTIONS_ENABLED, max_tenants=TASK_SUGGESTIONS_MAX_TENANTS):
+        super().__init__(TenantTasks, enabled, max_tenants, suggestion_refreshes)
+
+    def stats(self):
+        tenants = self.tenants()
+        return {
+            "enabled": self.enabled,
+            "tenants": len(tenants),
+            "tasks": sum(tasks.size() for tasks in tenants),
+            "ttl": TASK_SUGGESTIONS_TTL,
+        }
+
+
+task_suggestions = TaskSuggestions()
@@ -0,0 +1,144 @@
+"""🧠 Per-tenant in-memory state that follows committed writes employee by employee.
+
+Shared by the skill index (src/skillIndex.py) and the capacity timeline (src/capacityTimeline.py).
+A TenantState loads the whole tenant on first use. After that, the change feed (src/changeFeed.py)
+marks the employees each committed write touched, and the next refresh() re-reads only those
+employees. A write that doesn't say which employees marks the tenant stale, which reloads all of it.
+State is per process, so writes on other workers or outside the API are picked up when `ttl` expires.
+"""
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from src import changeFeed
+
+
+class TenantState(ABC):
+    """Subclasses implement load(cursor, employee_ids or None) -> data, replace(data) for a full load,
+    and update(employee_ids, data) for the re-read employees. replace/update run under self._lock.
+    The dirty ids can be other rows (task suggestions re-read projects) if the cache's changed() marks those."""
+
+    kind = "tenant_state"
+
+    def __init__(self, user_id, ttl):
+        self.user_id = user_id
+        self.ttl = ttl
+        self.loaded = False
+        self.loaded_at = 0.0
+        self.stale = False       # reload everything on the next refresh
+        self.dirty = set()       # employee ids to re-read on the next refresh
+        self._lock = threading.Lock()          # guards the arrays and the flags above
+        self._refresh_lock = threading.Lock()  # one refresh at a time; the others wait for it
+
+    def mark(self, employee_ids=None):
+        with self._lock:
+            if employee_ids is None:
+                self.stale = True
+            else:
+                self.dirty.update(employee_ids)
+
+    def refresh(self, cursor):
+        """Bring the state up to date with the database: a full load, the dirty employees, or nothing.
+        Returns "full", "rows" or None."""
+        with self._refresh_lock:
+            with self._lock:
+                expired = self.ttl > 0 and time.monotonic() - self.loaded_at > self.ttl
+                full = not self.loaded or self.stale or expired
+                dirty, self.dirty, self.stale = self.dirty, set(), False
+            if not full and not dirty:
+                return None
+            try:
+                # marks that arrive while we read land in self.dirty and are re-read next time
+                started = time.monotonic()
+                data = self.load(cursor, None if full else sorted(dirty))
+            except Exception:
+                with self._lock:
+                    self.stale = self.stale or full
+                    self.dirty.update(dirty)
+                raise
+            with self._lock:
+                if full:
+                    self.replace(data)
+                    self.loaded, self.loaded_at = True, started
+                else:
+                    self.update(dirty, data)
+            return "full" if full else "rows"
+
+    @abstractmethod
+    def load(self, cursor, employee_ids):
+        """The rows of these employees, or of the whole tenant when `employee_ids` is None."""
+
+    @abstractmethod
+    def replace(self, data):
+        """Swap in a full load."""
+
+    @abstractmethod
+    def update(self, employee_ids, data):
+        """Apply a re-read of these employees; ones missing from `data` are gone."""
+
+
+class TenantCache:
+    """A TenantState per user_id, least recently used tenants dropped past max_tenants. Registers
+    itself with the change feed."""
+
+    def __init__(self, factory, enabled=True, max_tenants=256, refreshes=None):
+        self.factory = factory          # user_id -> TenantState
+        self.enabled = enabled
+        self.max_tenants = max_tenants
+        self.refreshes = refreshes      # Counter labelled by kind ("full" / "rows"), optional
+        self._tenants = OrderedDict()
+        self._lock = threading.Lock()
+        changeFeed.on_commit(self.changed)
+
+    def get(self, cursor, user_id):
+        """The tenant's state, up to date with every write this process has committed."""
+        if not self.enabled:
+            state = self.factory(user_id)  # throwaway: loaded from scratch on every use
+        else:
+            with self._lock:
+                state = self._tenants.get(user_id)
+                if state is None:
+                    state = self._tenants[user_id] = self.factory(user_id)
+                self._tenants.move_to_end(user_id)
+                while len(self._tenants) > self.max_tenants:
+                    self._tenants.popitem(last=False)
+        kind = state.refresh(cursor)
+        if kind and self.refreshes is not None:
+            self.refreshes.inc(kind)
+        return state
+
+    def mark(self, user_id, employee_ids=None):
+        with self._lock:
+            state = self._tenants.get(user_id)
+        if state is not None:
+            state.mark(employee_ids)
+
+    def changed(self, user_id, delta):
+        """changeFeed listener: a write of this tenant committed. Task changes list their employees
+        under "employees", even when the counters cancel out (a deadline edit)."""
+        employee_ids = set(delta.get("employees", {})) | set(delta.get("employee_ids", ()))
+        if "employees" in delta.get("changed", ()) and not delta.get("employee_ids"):
+            self.mark(user_id)  # employees written without saying which
+        elif employee_ids:
+            self.mark(user_id, employee_ids)
+
+    def clear(self):
+        with self._lock:
+            self._tenants.clear()
+
+    def tenants(self):
+        with self._lock:
+            return list(self._tenants.values())
+
+
+class ProjectTenantCache(TenantCache):
+    """A TenantCache whose states re-read by project: task writes list their projects under "projects"
+    (or "project_ids", a release), and a project written without saying which reloads the tenant."""
+
+    def changed(self, user_id, delta):
+        project_ids = set(delta.get("projects", {})) | set(delta.get("project_ids", ()))
+        if "projects" in delta.get("changed", ()):
+            self.mark(user_id)
+        elif project_ids:
+            self.mark(user_id, project_ids)
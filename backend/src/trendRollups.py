@@ -0,0 +1,256 @@
+"""📆 trend_rollups — per-tenant counts by day, week and month for the dashboard trend charts.
+
+Metrics (one row per user, granularity, bucket start, metric and technology):
+
+    projects_created   projects by start_date                      (tech_stack_id 0)
+    tasks_created      tasks by created_at                          per tech_stack_id
+    tasks_completed    completed tasks by completed_at              per tech_stack_id
+    hours              estimated hours of tasks by created_at       per tech_stack_id
+
+Tasks are bucketed by created_at (migration 0008), not start_date: assigning a task rewrites its
+start_date, and a split keeps the created_at of the task it divides.
+
+Weeks start on Monday, months on the 1st; `bucket` is the first day. Task writes update the rows in
+the same transaction through src/taskChanges.py, project writes through apply_project_change(), so a
+chart reads a few hundred rows however many years of tasks sit behind them.
+
+    cd backend
+    python -m src.trendRollups --check     # list rows that disagree with projects/tasks
+    python -m src.trendRollups --rebuild   # recompute every rollup
+"""
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+
+from src.dbBackends import chunked
+from src.dbConnect import dialect
+
+GRANULARITIES = {"day": "d", "week": "w", "month": "m"}
+METRICS = ("projects_created", "tasks_created", "tasks_completed", "hours")
+
+
+def as_date(value):
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    return date.fromisoformat(str(value)[:10])
+
+
+def bucket_start(day, granularity):
+    if granularity == "d":
+        return day
+    if granularity == "w":
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_bucket(day, granularity):
+    if granularity == "d":
+        return day + timedelta(days=1)
+    if granularity == "w":
+        return day + timedelta(days=7)
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _add(deltas, user_id, metric, tech_stack_id, day, amount):
+    """Accumulate `amount` into the day, week and month buckets containing `day`."""
+    day = as_date(day)
+    if user_id is None or day is None or not amount:
+        return
+    for granularity in GRANULARITIES.values():
+        key = (user_id, granularity, bucket_start(day, granularity), metric, tech_stack_id or 0)
+        deltas[key] = deltas.get(key, 0) + amount
+
+
+def task_deltas(state, sign, deltas=None):
+    """What one task (a taskChanges.TaskState) contributes to the rollups, times `sign`."""
+    deltas = {} if deltas is None else deltas
+    if state is not None and state.user_id is not None:
+        _add(deltas, state.user_id, "tasks_created", state.tech_stack_id, state.created_at, sign)
+        _add(deltas, state.user_id, "hours", state.tech_stack_id, state.created_at, sign * state.hours)
+        if state.completed and state.completed_at is not None:
+            _add(deltas, state.user_id, "tasks_completed", state.tech_stack_id, state.completed_at, sign)
+    return deltas
+
+
+def apply(cursor, deltas, sign=1):
+    for (user_id, granularity, bucket, metric, tech_stack_id), amount in deltas.items():
+        if not amount:
+            continue
+        key = (user_id, granularity, bucket.isoformat(), metric, tech_stack_id)
+        cursor.execute("""
+            UPDATE trend_rollups SET value = value + ?
+            WHERE user_id = ? AND granularity = ? AND bucket = ? AND metric = ? AND tech_stack_id = ?
+        """, (sign * amount,) + key)
+        if cursor.rowcount == 0:
+            cursor.execute("""
+                INSERT INTO trend_rollups (user_id, granularity, bucket, metric, tech_stack_id, value)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, key + (sign * amount,))
+
+
+def apply_bulk(cursor, deltas):
+    """Same result as apply() for many keys at once: one read of which rows exist, then one batched
+    INSERT and one batched UPDATE, instead of a statement or two per key."""
+    deltas = {key: amount for key, amount in deltas.items() if amount}
+    existing = set()
+    by_user = {}
+    for user_id, _, bucket, _, _ in deltas:
+        by_user.setdefault(user_id, set()).add(bucket.isoformat())
+    for user_id, buckets in by_user.items():
+        for chunk in chunked(sorted(buckets)):
+            cursor.execute(f"""
+                SELECT granularity, bucket, metric, tech_stack_id FROM trend_rollups
+                WHERE user_id = ? AND bucket IN ({', '.join('?' for _ in chunk)})
+            """, [user_id] + chunk)
+            existing.update((user_id, g, as_date(bucket), metric, tech) for g, bucket, metric, tech in cursor.fetchall())
+    dialect.executemany(cursor, """
+        INSERT INTO trend_rollups (user_id, granularity, bucket, metric, tech_stack_id, value)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(u, g, bucket.isoformat(), metric, tech, amount)
+          for (u, g, bucket, metric, tech), amount in deltas.items() if (u, g, bucket, metric, tech) not in existing])
+    dialect.executemany(cursor, """
+        UPDATE trend_rollups SET value = value + ?
+        WHERE user_id = ? AND granularity = ? AND bucket = ? AND metric = ? AND tech_stack_id = ?
+    """, [(amount, u, g, bucket.isoformat(), metric, tech)
+          for (u, g, bucket, metric, tech), amount in deltas.items() if (u, g, bucket, metric, tech) in existing])
+
+
+def apply_task_change(cursor, before, after):
+    apply(cursor, task_deltas(after, 1, task_deltas(before, -1)))
+
+
+def apply_project_change(cursor, user_id, before_start, after_start):
+    """A project was created (before_start None), deleted (after_start None) or moved."""
+    deltas = {}
+    _add(deltas, user_id, "projects_created", 0, before_start, -1)
+    _add(deltas, user_id, "projects_created", 0, after_start, 1)
+    apply(cursor, deltas)
+
+
+# day-level totals straight from the base tables; {where} filters tasks (qualified as tasks.)
+_TASKS_BY_DAY = """
+    SELECT p.user_id, COALESCE(tasks.tech_stack_id, 0), tasks.created_at,
+           COUNT(*), SUM(COALESCE(tasks.estimated_hours, 0))
+    FROM {tasks} JOIN projects p ON tasks.project_id = p.project_id
+    WHERE tasks.created_at IS NOT NULL AND ({where})
+    GROUP BY p.user_id, COALESCE(tasks.tech_stack_id, 0), tasks.created_at
+"""
+_COMPLETED_BY_DAY = """
+    SELECT p.user_id, COALESCE(tasks.tech_stack_id, 0), tasks.completed_at, COUNT(*)
+    FROM {tasks} JOIN projects p ON tasks.project_id = p.project_id
+    WHERE tasks.completed = 1 AND tasks.completed_at IS NOT NULL AND ({where})
+    GROUP BY p.user_id, COALESCE(tasks.tech_stack_id, 0), tasks.completed_at
+"""
+
+
+def collect(cursor, where, params, deltas=None):
+    """Rollup contribution of the tasks matching `where` (columns qualified as tasks.), read under a
+    write lock. Call it before deleting those tasks, then apply(cursor, deltas, sign=-1)."""
+    deltas = {} if deltas is None else deltas
+    dialect.begin_write(cursor)
+    cursor.execute(_TASKS_BY_DAY.format(tasks=dialect.locked("tasks"), where=where), params)
+    for user_id, tech_stack_id, day, count, hours in cursor.fetchall():
+        _add(deltas, user_id, "tasks_created", tech_stack_id, day, count)
+        _add(deltas, user_id, "hours", tech_stack_id, day, hours)
+    cursor.execute(_COMPLETED_BY_DAY.format(tasks=dialect.locked("tasks"), where=where), params)
+    for user_id, tech_stack_id, day, count in cursor.fetchall():
+        _add(deltas, user_id, "tasks_completed", tech_stack_id, day, count)
+    return deltas
+
+
+def expected(cursor, user_id=None):
+    """Every rollup value recomputed from projects and tasks: {(user, granularity, bucket, metric, tech): value}."""
+    where, params = ("p.user_id = ?", (user_id,)) if user_id is not None else ("1 = 1", ())
+    deltas = {}
+    cursor.execute(f"""
+        SELECT p.user_id, p.start_date, COUNT(*) FROM projects p
+        WHERE p.start_date IS NOT NULL AND {where}
+        GROUP BY p.user_id, p.start_date
+    """, params)
+    for owner, day, count in cursor.fetchall():
+        _add(deltas, owner, "projects_created", 0, day, count)
+    cursor.execute(_TASKS_BY_DAY.format(tasks="tasks", where=where), params)
+    for owner, tech_stack_id, day, count, hours in cursor.fetchall():
+        _add(deltas, owner, "tasks_created", tech_stack_id, day, count)
+        _add(deltas, owner, "hours", tech_stack_id, day, hours)
+    cursor.execute(_COMPLETED_BY_DAY.format(tasks="tasks", where=where), params)
+    for owner, tech_stack_id, day, count in cursor.fetchall():
+        _add(deltas, owner, "tasks_completed", tech_stack_id, day, count)
+    return {key: value for key, value in deltas.items() if value}
+
+
+def rebuild(cursor, user_id=None):
+    """Recompute rollups (all tenants, or one). The caller commits. Returns the number of rows written."""
+    rows = expected(cursor, user_id)
+    if user_id is None:
+        cursor.execute("DELETE FROM trend_rollups")
+    else:
+        cursor.execute("DELETE FROM trend_rollups WHERE user_id = ?", (user_id,))
+    dialect.executemany(
+        cursor,
+        "INSERT INTO trend_rollups (user_id, granularity, bucket, metric, tech_stack_id, value) VALUES (?, ?, ?, ?, ?, ?)",
+        [(u, g, bucket.isoformat(), metric, tech, value) for (u, g, bucket, metric, tech), value in rows.items()],
+    )
+    return len(rows)
+
+
+def check(cursor, user_id=None):
+    """Rollup rows whose value differs from the base tables (missing rows count as 0)."""
+    want = expected(cursor, user_id)
+    where, params = ("WHERE user_id = ?", (user_id,)) if user_id is not None else ("", ())
+    cursor.execute(f"SELECT user_id, granularity, bucket, metric, tech_stack_id, value FROM trend_rollups {where}", params)
+    have = {(u, g, as_date(bucket), metric, tech): value for u, g, bucket, metric, tech, value in cursor.fetchall()}
+    mismatches = []
+    for key in sorted(set(want) | set(have)):
+        if have.get(key, 0) != want.get(key, 0):
+            u, g, bucket, metric, tech = key
+            mismatches.append({"key": [u, g, bucket.isoformat(), metric, tech],
+                               "stored": have.get(key, 0), "expected": want.get(key, 0)})
+    return mismatches
+
+
+def read(cursor, user_id, granularity, start, end, tech_stack_id=None):
+    """Rollup rows for [start, end] (bucket starts, inclusive): [(metric, tech_stack_id, bucket, value)]."""
+    sql = """
+        SELECT metric, tech_stack_id, bucket, value FROM trend_rollups
+        WHERE user_id = ? AND granularity = ? AND bucket >= ? AND bucket <= ? AND value <> 0
+    """
+    params = [user_id, granularity, start.isoformat(), end.isoformat()]
+    if tech_stack_id is not None:
+        sql += " AND tech_stack_id IN (0, ?)"
+        params.append(tech_stack_id)
+    cursor.execute(sql, params)
+    return [(metric, tech, as_date(bucket), value) for metric, tech, bucket, value in cursor.fetchall()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--check", action="store_true", help="report rollups that disagree with projects/tasks")
+    action.add_argument("--rebuild", action="store_true", help="recompute rollups from projects/tasks")
+    parser.add_argument("--user-id", type=int, help="only this tenant")
+    args = parser.parse_args()
+
+    from src.dbConnect import pool
+
+    conn = pool.acquire()
+    try:
+        cursor = conn.cursor()
+        if args.check:
+            mismatches = check(cursor, args.user_id)
+            for m in mismatches[:50]:
+                print(f"❌ {m['key']}: stored {m['stored']}, tables say {m['expected']}")
+            print(f"{'✅' if not mismatches else '⚠️'} {len(mismatches)} rollup row(s) out of sync")
+            sys.exit(1 if mismatches else 0)
+        written = rebuild(cursor, args.user_id)
+        conn.commit()
+        print(f"✅ Rebuilt {written} rollup row(s)")
+    finally:
+        conn.close()
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Shared fixtures: the app running on a throwaway SQLite database, and generated tenants to run it against.
+
+The settings are read once at import (src/dbConnect.py and friends), so they're set here before anything
+from the app is imported. Each make_tenant() call adds a new tenant to the same database, so tests that
+write don't see each other's data.
+"""
+import itertools
+import os
+import tempfile
+
+DATA_DIR = tempfile.mkdtemp(prefix="skillboard-tests-")
+os.environ.update(
+    DB_BACKEND="sqlite",
+    SQLITE_PATH=os.path.join(DATA_DIR, "skillboard.db"),
+    SQLITE_SEED="0",
+    SLOW_QUERY_LOG="",
+)
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from auth_utils import create_access_token  # noqa: E402
+from bench.datagen import generate  # noqa: E402
+from src.dbConnect import backend  # noqa: E402
+
+_seeds = itertools.count(1)
+
+
+def auth(user_id):
+    return {"Authorization": f"Bearer {create_access_token({'sub': str(user_id)})}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+
+@pytest.fixture
+def db():
+    """A connection of its own, for reading back what the API wrote."""
+    conn = backend.connect()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="session")
+def make_tenant():
+    """make_tenant(employees=..., projects=..., tasks=..., reviews=...) -> user_id of a new generated tenant."""
+    def make(employees=40, projects=8, tasks=300, reviews=0):
+        conn = backend.connect()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(user_id), 0) + 1 FROM users")
+            user_id = cursor.fetchone()[0]
+            sizes = dict(tenants=1, employees=employees, projects=projects, tasks=tasks, reviews=reviews)
+            generate(conn, backend.dialect, sizes, next(_seeds), log=lambda *args: None)
+        finally:
+            conn.close()
+        return user_id
+    return make
@@ -0,0 +1,80 @@
+"""POST /batch (batch_routes.py): one authentication for all the items, and a late item answers 504 without
+its handler losing the shared connection."""
+import threading
+import time
+
+import pytest
+from fastapi import Depends
+
+import auth_utils
+import batch_routes
+import main
+from src.dbConnect import get_db, pool
+from src.executors import offload
+from tests.conftest import auth
+
+
+@pytest.fixture
+def slow_route(monkeypatch):
+    """GET /test/slow: one statement, a wait for `release`, another statement on the same connection."""
+    state = {"release": threading.Event(), "done": threading.Event(), "rows": [], "error": None}
+
+    @offload("analytics")
+    def slow(conn=Depends(get_db)):
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            state["rows"].append(cursor.fetchone()[0])
+            state["release"].wait(5)
+            cursor.execute("SELECT 2")
+            state["rows"].append(cursor.fetchone()[0])
+        except Exception as e:
+            state["error"] = e
+            raise
+        finally:
+            state["done"].set()
+        return {"rows": state["rows"]}
+
+    main.app.add_api_route("/test/slow", slow, methods=["GET"])
+    monkeypatch.setattr(batch_routes, "BATCH_ITEM_TIMEOUT", 0.3)
+    yield state
+    state["release"].set()
+    main.app.router.routes[:] = [route for route in main.app.router.routes
+                                 if getattr(route, "path", None) != "/test/slow"]
+
+
+def test_late_item_keeps_the_connection_until_it_finishes(client, slow_route):
+    in_use = pool.stats()["in_use"]
+    started = time.monotonic()
+    response = client.post("/batch", json={"requests": [{"path": "/test/slow"}]}, headers=auth(1))
+    assert response.status_code == 200
+    assert time.monotonic() - started < 3
+    assert response.json()["responses"][0]["status"] == 504
+
+    # the handler still has the connection: it isn't back in the pool for someone else
+    assert not slow_route["done"].is_set()
+    assert pool.stats()["in_use"] == in_use + 1
+
+    slow_route["release"].set()
+    assert slow_route["done"].wait(5)
+    deadline = time.monotonic() + 5
+    while pool.stats()["in_use"] != in_use and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert slow_route["error"] is None
+    assert slow_route["rows"] == [1, 2]
+    assert pool.stats()["in_use"] == in_use
+
+
+def test_batch_authenticates_once(client, monkeypatch):
+    verified = []
+    real = auth_utils._user_for_token
+    monkeypatch.setattr(auth_utils, "_user_for_token",
+                        lambda *args, **kwargs: verified.append(1) or real(*args, **kwargs))
+    monkeypatch.setattr(auth_utils.token_cache, "max_size", 0)  # every token check would be a full decode
+    paths = ["/projects", "/employees", "/stats/projects"]
+    response = client.post("/batch", json={"requests": [{"path": path} for path in paths]}, headers=auth(1))
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()["responses"]] == [200, 200, 200]
+    assert len(verified) == 1
+    # the batch's user doesn't outlive the batch
+    assert client.get("/projects").status_code == 403
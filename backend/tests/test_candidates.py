@@ -0,0 +1,134 @@
+"""/tasks/{id}/candidates from the in-memory skill index (src/skillIndex.py) against the SQL it replaced,
+ranked in Python, including after writes that mark rows of the index dirty."""
+import random
+
+from tests.conftest import auth
+
+# the query the endpoint ran before the index
+CANDIDATES_SQL = """
+    SELECT e.employee_id, e.employee_name, e.weekly_hours,
+           COALESCE(l.open_hours, 0) AS current_load, r.avg_rating
+    FROM employees e
+    JOIN employee_tech_stack ets ON e.employee_id = ets.employee_id
+    LEFT JOIN employee_load l ON e.employee_id = l.employee_id
+    LEFT JOIN (
+        SELECT employee_id, AVG(CAST(rating AS FLOAT)) AS avg_rating
+        FROM reviews
+        GROUP BY employee_id
+    ) r ON e.employee_id = r.employee_id
+    WHERE ets.tech_stack_id = ? AND e.user_id = ?
+"""
+
+
+def expected_candidates(db, user_id, task_id):
+    """The old items, in the documented order: fits within weekly hours first, then by load after the
+    task, then by rating (unrated last), then by id."""
+    db.rollback()
+    cursor = db.cursor()
+    cursor.execute("SELECT tech_stack_id, estimated_hours FROM tasks WHERE task_id = ?", (task_id,))
+    tech_stack_id, est_hours = cursor.fetchone()
+    est_hours = est_hours or 0
+    cursor.execute(CANDIDATES_SQL, (tech_stack_id, user_id))
+    items, order = [], {}
+    for employee_id, name, weekly, current, rating in cursor.fetchall():
+        tentative = current + est_hours
+        items.append({
+            "employee_id": employee_id,
+            "employee_name": name,
+            "weekly_hours": weekly,
+            "current_workload": current,
+            "tentative_workload": tentative,
+            "over_capacity": tentative > weekly,
+            "average_rating": round(rating, 2) if rating is not None else None,
+            "load_percent": round((current / weekly) * 100, 0) if weekly > 0 else 0,
+        })
+        fill = tentative / weekly if weekly > 0 else float("inf")
+        order[employee_id] = (tentative > weekly, fill, -rating if rating is not None else float("inf"), employee_id)
+    return sorted(items, key=lambda item: order[item["employee_id"]])
+
+
+def _task_ids(db, user_id):
+    db.rollback()
+    cursor = db.cursor()
+    cursor.execute("SELECT task_id FROM tasks WHERE user_id = ? AND tech_stack_id IS NOT NULL ORDER BY task_id", (user_id,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _employee_ids(db, user_id):
+    db.rollback()
+    cursor = db.cursor()
+    cursor.execute("SELECT employee_id FROM employees WHERE user_id = ? ORDER BY employee_id", (user_id,))
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _assert_matches(client, db, headers, user_id, task_ids, after):
+    for task_id in task_ids:
+        expected = expected_candidates(db, user_id, task_id)
+        got = client.get(f"/tasks/{task_id}/candidates", headers=headers)
+        assert got.status_code == 200, got.text
+        assert got.json() == expected, f"task {task_id} after {after}"
+        for limit in (1, 3, 10):
+            top = client.get(f"/tasks/{task_id}/candidates", headers=headers, params={"limit": limit}).json()
+            assert top == expected[:limit], f"task {task_id} top {limit} after {after}"
+
+
+def test_candidates_match_the_sql_ranking(client, db, make_tenant):
+    user_id = make_tenant(employees=60, projects=6, tasks=300)
+    headers = auth(user_id)
+    task_ids = _task_ids(db, user_id)
+    employee_ids = _employee_ids(db, user_id)
+    for employee_id, task_id in zip(employee_ids[::3], task_ids):
+        response = client.post("/reviews", headers=headers, json={
+            "employee_id": employee_id, "task_id": task_id, "rating": employee_id % 5 + 1})
+        assert response.status_code == 200, response.text
+    _assert_matches(client, db, headers, user_id, task_ids[::7], "the first load")
+
+
+def test_candidates_follow_writes_that_invalidate_the_index(client, db, make_tenant):
+    user_id = make_tenant(employees=40, projects=5, tasks=200)
+    headers = auth(user_id)
+    rng = random.Random(20)
+    next_employee_id = 50_000_000 + user_id * 1000
+    _assert_matches(client, db, headers, user_id, _task_ids(db, user_id)[:5], "the first load")  # index loaded
+
+    reviewed = set()
+    for step in range(60):
+        task_ids, employee_ids = _task_ids(db, user_id), _employee_ids(db, user_id)
+        op = rng.choice(["assign", "unassign", "toggle", "edit", "release", "add_employee", "rename_employee",
+                         "delete_employee", "review", "add_task"])
+        if op == "assign":
+            response = client.post("/tasks/assign", headers=headers, json={
+                "task_id": rng.choice(task_ids), "employee_ids": [rng.choice(employee_ids)], "start_date": "2025-01-01"})
+        elif op == "unassign":
+            response = client.patch(f"/tasks/{rng.choice(task_ids)}/unassign", headers=headers)
+        elif op == "toggle":
+            response = client.patch(f"/tasks/{rng.choice(task_ids)}/toggle-completion", headers=headers)
+        elif op == "edit":
+            response = client.put(f"/tasks/{rng.choice(task_ids)}", headers=headers, json={
+                "estimated_hours": rng.randint(1, 30), "deadline": "2025-03-01", "start_date": "2025-01-01"})
+        elif op == "release":
+            response = client.patch(f"/employees/{rng.choice(employee_ids)}/release", headers=headers)
+        elif op == "add_employee":
+            next_employee_id += 1
+            response = client.post("/employees", headers=headers, json={
+                "employee_id": next_employee_id, "employee_name": f"New {step}",
+                "role": rng.choice(["Backend Developer", "Designer", "QA Engineer"]), "weekly_hours": rng.choice([20, 40])})
+        elif op == "rename_employee":
+            response = client.put(f"/employees/{rng.choice(employee_ids)}", headers=headers, json={
+                "employee_id": 0, "employee_name": f"Renamed {step}", "role": "QA Engineer", "weekly_hours": 40})
+        elif op == "delete_employee":
+            unreviewed = [employee_id for employee_id in employee_ids if employee_id not in reviewed]
+            response = client.delete(f"/employees/{rng.choice(unreviewed)}", headers=headers)
+        elif op == "review":
+            employee_id = rng.choice(employee_ids)
+            reviewed.add(employee_id)
+            response = client.post("/reviews", headers=headers, json={
+                "employee_id": employee_id, "task_id": rng.choice(task_ids), "rating": rng.randint(1, 5)})
+        else:
+            cursor = db.cursor()
+            cursor.execute("SELECT project_id FROM projects WHERE user_id = ?", (user_id,))
+            project_id = rng.choice([row[0] for row in cursor.fetchall()])
+            response = client.post(f"/projects/{project_id}/tasks", headers=headers, json={
+                "tech_stack_id": rng.randint(1, 11), "estimated_hours": rng.randint(1, 9), "deadline": "2025-08-01"})
+        assert response.status_code == 200, (op, response.text)
+        _assert_matches(client, db, headers, user_id, rng.sample(_task_ids(db, user_id), 3), f"step {step} ({op})")
@@ -0,0 +1,132 @@
+"""/employees/{id}/capacity and /capacity/heatmap (src/capacityTimeline.py) against hours spread day by day in
+Python, for ranges inside the in-memory window, across either edge of it and wholly outside it."""
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+import pytest
+
+from src.capacityTimeline import (CAPACITY_MAX_WEEKS, CAPACITY_WEEKS_AHEAD, CAPACITY_WEEKS_BACK,
+                                  capacity_timeline, week_of, week_start)
+from src.dbConnect import backend
+from tests.conftest import auth
+
+THIS_WEEK = week_of(date.today())
+FIRST, LAST = THIS_WEEK - CAPACITY_WEEKS_BACK, THIS_WEEK + CAPACITY_WEEKS_AHEAD
+
+
+@pytest.fixture(scope="module")
+def spread_tenant(make_tenant):
+    """A generated tenant whose tasks start and end around both edges of the window (some of them with
+    a date missing), so their hours fall partly inside and partly outside it."""
+    user_id = make_tenant(employees=8, projects=3, tasks=80)
+    rng = random.Random(23)
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute("SELECT task_id FROM tasks WHERE user_id = ?", (user_id,))
+    dates = []
+    for (task_id,) in cursor.fetchall():
+        edge = week_start(rng.choice((FIRST, LAST + 1)))
+        start = edge + timedelta(days=rng.randint(-40, 40))
+        end = start + timedelta(days=rng.randint(-3, 60))
+        start, end = rng.choice([(start, end)] * 6 + [(None, end), (start, None)])
+        dates.append((start and start.isoformat(), end and end.isoformat(), task_id))
+    cursor.executemany("UPDATE tasks SET start_date = ?, deadline = ? WHERE task_id = ?", dates)
+    conn.commit()
+    conn.close()
+    return user_id
+
+
+def _planned(user_id):
+    """{employee_id: {week: hours}} with each open task's hours spread over its days one day at a time."""
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute("SELECT employee_id FROM employees WHERE user_id = ?", (user_id,))
+    planned = {employee_id: defaultdict(float) for (employee_id,) in cursor.fetchall()}
+    cursor.execute("""
+        SELECT t.employee_id, t.estimated_hours, t.start_date, t.deadline
+        FROM tasks t JOIN employees e ON t.employee_id = e.employee_id
+        WHERE e.user_id = ? AND t.completed = 0
+    """, (user_id,))
+    for employee_id, hours, start, end in cursor.fetchall():
+        start, end = (date.fromisoformat(str(day)[:10]) if day else None for day in (start, end))
+        if not hours or (start is None and end is None):
+            continue
+        start, end = start or end, end or start
+        days = [start + timedelta(days=n) for n in range((end - start).days + 1)] if end >= start else [start]
+        for day in days:
+            planned[employee_id][week_of(day)] += hours / len(days)
+    conn.close()
+    return planned
+
+
+RANGES = {
+    "inside": (FIRST + 10, FIRST + 30),
+    "back edge": (FIRST - 6, FIRST + 6),
+    "ahead edge": (LAST - 6, LAST + 6),
+    "before": (FIRST - 20, FIRST - 1),
+    "after": (LAST + 1, LAST + 20),
+}
+
+
+@pytest.mark.parametrize("name", RANGES)
+def test_employee_capacity(client, spread_tenant, name):
+    first, last = RANGES[name]
+    planned = _planned(spread_tenant)
+    params = {"from": week_start(first).isoformat(), "to": (week_start(last) + timedelta(days=6)).isoformat()}
+    for employee_id, weeks in planned.items():
+        response = client.get(f"/employees/{employee_id}/capacity", params=params, headers=auth(spread_tenant))
+        assert response.status_code == 200, response.text
+        body = response.json()
+        assert [week["week_start"] for week in body["weeks"]] == [week_start(week).isoformat()
+                                                                   for week in range(first, last + 1)]
+        assert [week["hours"] for week in body["weeks"]] == pytest.approx(
+            [weeks[week] for week in range(first, last + 1)], abs=0.02)
+
+
+@pytest.mark.parametrize("name", RANGES)
+def test_heatmap(client, spread_tenant, name):
+    first, last = RANGES[name]
+    planned = _planned(spread_tenant)
+    params = {"from": week_start(first).isoformat(), "to": week_start(last).isoformat()}
+    response = client.get("/capacity/heatmap", params=params, headers=auth(spread_tenant))
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["weeks"] == [week_start(week).isoformat() for week in range(first, last + 1)]
+    assert sorted(row["employee_id"] for row in body["employees"]) == sorted(planned)
+    for row in body["employees"]:
+        assert row["cells"] == pytest.approx([planned[row["employee_id"]][week] for week in range(first, last + 1)],
+                                             abs=0.06)
+    assert body["total_hours"] == pytest.approx(
+        [sum(weeks[week] for weeks in planned.values()) for week in range(first, last + 1)], abs=0.1)
+
+
+def test_outside_range_is_read_per_request(db, spread_tenant):
+    window = capacity_timeline.get(db.cursor(), spread_tenant)
+    inside = capacity_timeline.covering(db.cursor(), spread_tenant, week_start(FIRST), week_start(LAST))
+    outside = capacity_timeline.covering(db.cursor(), spread_tenant, week_start(FIRST - 1), week_start(FIRST + 1))
+    assert inside is window
+    assert outside is not window and outside not in capacity_timeline.tenants()
+    assert (outside.first_week, outside.weeks) == (FIRST - 1, 3)
+
+
+def test_span_longer_than_window_is_422(client, spread_tenant):
+    start = week_start(FIRST - 30)
+    params = {"from": start.isoformat(), "to": (start + timedelta(weeks=CAPACITY_MAX_WEEKS)).isoformat()}
+    response = client.get("/capacity/heatmap", params=params, headers=auth(spread_tenant))
+    assert response.status_code == 422
+    params["to"] = (start + timedelta(weeks=CAPACITY_MAX_WEEKS - 1)).isoformat()
+    assert client.get("/capacity/heatmap", params=params, headers=auth(spread_tenant)).status_code == 200
+
+
+def test_window_moves_with_the_calendar(db, spread_tenant):
+    timeline = capacity_timeline.get(db.cursor(), spread_tenant)
+    timeline.anchor_week -= 1  # loaded last week, as far as it knows
+    timeline.first_week -= 1
+    timeline.hours[:] = 0
+    assert capacity_timeline.get(db.cursor(), spread_tenant) is timeline
+    assert (timeline.anchor_week, timeline.first_week) == (THIS_WEEK, FIRST)
+    planned = _planned(spread_tenant)
+    for employee_id, weeks in planned.items():
+        found = timeline.employee(employee_id, week_start(FIRST), week_start(FIRST + 20))
+        assert found[3] == pytest.approx([weeks[week] for week in range(FIRST, FIRST + 21)], abs=0.02)
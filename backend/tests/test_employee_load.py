@@ -0,0 +1,130 @@
+"""employee_load counters (src/employeeLoad.py) stay equal to what the tasks add up to across every write path."""
+import random
+
+import pytest
+
+from src import employeeLoad, trendRollups
+from src.dbConnect import backend
+from tests.conftest import auth
+
+
+def _tenant_rows(db, user_id):
+    cursor = db.cursor()
+    cursor.execute("""
+        SELECT t.task_id, t.employee_id, t.project_id
+        FROM tasks t JOIN projects p ON t.project_id = p.project_id
+        WHERE p.user_id = ?
+        ORDER BY t.task_id
+    """, (user_id,))
+    tasks = cursor.fetchall()
+    cursor.execute("SELECT employee_id FROM employees WHERE user_id = ? ORDER BY employee_id", (user_id,))
+    employees = [row[0] for row in cursor.fetchall()]
+    return tasks, employees
+
+
+def _assert_exact(db, user_id, after):
+    db.rollback()  # a fresh read snapshot
+    assert employeeLoad.check(db, user_id) == [], f"counters drifted after {after}"
+
+
+def test_counters_follow_every_task_write(client, db, make_tenant):
+    user_id = make_tenant(employees=25, projects=6, tasks=200)
+    headers = auth(user_id)
+    _assert_exact(db, user_id, "the bulk load")
+    tasks, employees = _tenant_rows(db, user_id)
+    assigned = next(task for task in tasks if task[1] is not None)
+    unassigned = next(task for task in tasks if task[1] is None)
+    other = next(employee for employee in employees if employee != assigned[1])
+
+    steps = [
+        ("assign", lambda: client.post("/tasks/assign", headers=headers, json={
+            "task_id": unassigned[0], "employee_ids": [employees[0]], "start_date": "2025-01-01"})),
+        ("reassign", lambda: client.post("/tasks/assign", headers=headers, json={
+            "task_id": assigned[0], "employee_ids": [other], "start_date": "2025-01-01"})),
+        ("split assign", lambda: client.post("/tasks/assign", headers=headers, json={
+            "task_id": tasks[5][0], "employee_ids": employees[1:3], "hours": [3, 4], "start_date": "2025-01-01"})),
+        ("toggle complete", lambda: client.patch(f"/tasks/{assigned[0]}/toggle-completion", headers=headers)),
+        ("toggle back", lambda: client.patch(f"/tasks/{assigned[0]}/toggle-completion", headers=headers)),
+        ("edit hours", lambda: client.put(f"/tasks/{assigned[0]}", headers=headers, json={
+            "estimated_hours": 17, "deadline": "2025-03-01", "start_date": "2025-01-01"})),
+        ("unassign", lambda: client.patch(f"/tasks/{assigned[0]}/unassign", headers=headers)),
+        ("delete task", lambda: client.delete(f"/tasks/{tasks[7][0]}", headers=headers)),
+        ("delete project", lambda: client.delete(f"/projects/{tasks[-1][2]}", headers=headers)),
+        ("bulk release", lambda: client.patch(f"/employees/{employees[3]}/release", headers=headers)),
+        ("assign batch", lambda: client.post("/tasks/assign-batch", headers=headers, json={"assignments": [
+            {"task_id": tasks[10][0], "employee_ids": [employees[4]], "start_date": "2025-01-01"},
+            {"task_id": tasks[11][0], "employee_ids": employees[5:7], "hours": [2, 6], "start_date": "2025-01-01"},
+        ]})),
+    ]
+    for name, step in steps:
+        response = step()
+        assert response.status_code == 200, (name, response.text)
+        _assert_exact(db, user_id, name)
+
+
+def test_counters_survive_a_random_mix_of_writes(client, db, make_tenant):
+    user_id = make_tenant(employees=15, projects=5, tasks=150)
+    headers = auth(user_id)
+    rng = random.Random(12)
+    for step in range(150):
+        tasks, employees = _tenant_rows(db, user_id)
+        db.rollback()
+        if not tasks:
+            break
+        task_id = rng.choice(tasks)[0]
+        op = rng.choice(["assign", "split", "unassign", "toggle", "edit", "delete", "release", "delete_project"])
+        if op == "assign":
+            response = client.post("/tasks/assign", headers=headers, json={
+                "task_id": task_id, "employee_ids": [rng.choice(employees)], "start_date": "2025-01-01"})
+        elif op == "split":
+            response = client.post("/tasks/assign", headers=headers, json={
+                "task_id": task_id, "employee_ids": rng.sample(employees, 2), "hours": [rng.randint(1, 8), rng.randint(1, 8)],
+                "start_date": "2025-01-01"})
+        elif op == "unassign":
+            response = client.patch(f"/tasks/{task_id}/unassign", headers=headers)
+        elif op == "toggle":
+            response = client.patch(f"/tasks/{task_id}/toggle-completion", headers=headers)
+        elif op == "edit":
+            response = client.put(f"/tasks/{task_id}", headers=headers, json={
+                "estimated_hours": rng.randint(1, 20), "deadline": "2025-03-01", "start_date": "2025-01-01"})
+        elif op == "delete":
+            response = client.delete(f"/tasks/{task_id}", headers=headers)
+        elif op == "release":
+            response = client.patch(f"/employees/{rng.choice(employees)}/release", headers=headers)
+        elif rng.random() < 0.1:
+            response = client.delete(f"/projects/{rng.choice(tasks)[2]}", headers=headers)
+        else:
+            continue
+        assert response.status_code == 200, (op, response.text)
+        _assert_exact(db, user_id, f"step {step} ({op})")
+
+
+@pytest.fixture
+def int_hours():
+    """tasks.estimated_hours truncated to a whole number on insert, as SQL Server's INT column does (SQLite
+    would keep 2.5)."""
+    conn = backend.connect()
+    conn.execute("""
+        CREATE TRIGGER test_int_hours AFTER INSERT ON tasks BEGIN
+            UPDATE tasks SET estimated_hours = CAST(NEW.estimated_hours AS INTEGER) WHERE task_id = NEW.task_id;
+        END
+    """)
+    conn.commit()
+    yield
+    conn.execute("DROP TRIGGER test_int_hours")
+    conn.commit()
+    conn.close()
+
+
+def test_fractional_split_hours_count_as_stored(client, db, make_tenant, int_hours):
+    user_id = make_tenant(employees=10, projects=3, tasks=60)
+    tasks, employees = _tenant_rows(db, user_id)
+    response = client.post("/tasks/assign-batch", headers=auth(user_id), json={"assignments": [
+        {"task_id": tasks[0][0], "employee_ids": employees[0:2], "hours": [2.5, 3.75], "start_date": "2025-01-01"},
+        {"task_id": tasks[1][0], "employee_ids": employees[2:5], "hours": [0.5, 1.2, 7], "start_date": "2025-01-02"},
+        {"task_id": tasks[2][0], "employee_ids": [employees[5]], "start_date": "2025-01-03"},
+    ]})
+    assert response.status_code == 200, response.text
+    assert response.json()["failed"] == 0
+    _assert_exact(db, user_id, "fractional split hours")
+    assert trendRollups.check(db.cursor(), user_id) == []
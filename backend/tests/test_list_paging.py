@@ -0,0 +1,143 @@
+"""Keyset paging (src/listQuery.py): walking every page gives each row exactly once, in the same order as
+OFFSET paging, for every sort key in both directions, with NULL sort values and ties."""
+import random
+
+import pytest
+
+import main
+from src.listQuery import ListParams, ListSpec, SortKey
+from tests.conftest import auth
+
+SCRATCH_LIST = ListSpec(
+    "scratch", "row_id",
+    {
+        "row_id": SortKey("row_id", False),
+        "score": SortKey("score", True),
+        "label": SortKey("label", True),
+        "due": SortKey("due", True),
+        "bucket": SortKey("COALESCE(score, 0) % 3", False),
+    },
+    "row_id",
+    ("row_id", "score", "label", "due"),
+)
+
+
+@pytest.fixture
+def scratch(db):
+    """A table made to be awkward: a third of each sort column NULL, the rest drawn from a few values."""
+    rng = random.Random(18)
+    cursor = db.cursor()
+    cursor.execute("CREATE TEMP TABLE scratch (row_id INTEGER PRIMARY KEY, score INTEGER, label TEXT, due DATE)")
+    cursor.executemany("INSERT INTO scratch (row_id, score, label, due) VALUES (?, ?, ?, ?)", [
+        (row_id,
+         rng.choice([None, 1, 2, 2, 3]),
+         rng.choice([None, "a", "b", "b b"]),
+         rng.choice([None, "2025-01-01", "2025-01-02"]))
+        for row_id in rng.sample(range(1, 1000), 97)  # ids out of insertion order
+    ])
+    return cursor
+
+
+def _sorts(spec):
+    return [sort for key in spec.sort_keys for sort in (key, f"-{key}")]
+
+
+@pytest.mark.parametrize("limit", [1, 4, 10])
+@pytest.mark.parametrize("sort", _sorts(SCRATCH_LIST))
+def test_keyset_pages_match_offset_pages(scratch, sort, limit):
+    order_by = SCRATCH_LIST.page(ListParams(sort, None, None, None)).order_by()
+    cursor_value, offset, seen = None, 0, []
+    while True:
+        page = SCRATCH_LIST.page(ListParams(sort, cursor_value, limit, None))
+        where, params = page.where()
+        limit_sql, limit_params = page.limit_clause()
+        scratch.execute(f"SELECT row_id{page.columns} FROM scratch WHERE {where} {page.order_by()} {limit_sql}",
+                        params + limit_params)
+        rows, cursor_value = page.rows(scratch.fetchall())
+
+        scratch.execute(f"SELECT row_id FROM scratch {order_by} LIMIT ? OFFSET ?", (limit, offset))
+        assert [row[0] for row in rows] == [row[0] for row in scratch.fetchall()], f"page at offset {offset}"
+        seen += [row[0] for row in rows]
+        offset += limit
+        if cursor_value is None:
+            break
+
+    scratch.execute("SELECT row_id FROM scratch")
+    everything = {row[0] for row in scratch.fetchall()}
+    assert len(seen) == len(set(seen)), "a row came back twice"
+    assert set(seen) == everything, "a row was skipped"
+
+
+@pytest.fixture(scope="module")
+def paged_tenant(make_tenant):
+    """A generated tenant with NULLs written into every nullable sort column."""
+    from src.dbConnect import backend
+
+    user_id = make_tenant(employees=30, projects=6, tasks=240, reviews=400)
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE projects SET deadline = NULL WHERE user_id = ? AND project_id % 3 = 0", (user_id,))
+    cursor.execute("UPDATE projects SET start_date = NULL WHERE user_id = ? AND project_id % 2 = 0", (user_id,))
+    cursor.execute("UPDATE employees SET role = NULL WHERE user_id = ? AND employee_id % 4 = 0", (user_id,))
+    cursor.execute("UPDATE employees SET weekly_hours = NULL WHERE user_id = ? AND employee_id % 5 = 0", (user_id,))
+    for column, every in (("deadline", 3), ("start_date", 4), ("estimated_hours", 5)):
+        cursor.execute(f"UPDATE tasks SET {column} = NULL WHERE user_id = ? AND task_id % ? = 0", (user_id, every))
+    cursor.execute("""
+        UPDATE reviews SET rating = NULL
+        WHERE review_id % 4 = 0 AND employee_id IN (SELECT employee_id FROM employees WHERE user_id = ?)
+    """, (user_id,))
+    cursor.execute("""
+        UPDATE reviews SET reviewed_at = NULL
+        WHERE review_id % 5 = 0 AND employee_id IN (SELECT employee_id FROM employees WHERE user_id = ?)
+    """, (user_id,))
+    cursor.execute("""
+        SELECT r.employee_id FROM reviews r JOIN employees e ON r.employee_id = e.employee_id
+        WHERE e.user_id = ? GROUP BY r.employee_id ORDER BY COUNT(*) DESC, r.employee_id
+    """, (user_id,))
+    reviewed = cursor.fetchone()[0]
+    cursor.execute("SELECT project_id FROM tasks WHERE user_id = ? GROUP BY project_id ORDER BY COUNT(*) DESC, project_id",
+                   (user_id,))
+    busiest = cursor.fetchone()[0]
+    conn.commit()
+    conn.close()
+    return user_id, busiest, reviewed
+
+
+def _endpoints(busiest, reviewed):
+    """(path, spec, id key); /tasks is always paged, so its baseline is one page holding every row."""
+    return [
+        ("/projects", main.PROJECT_LIST, "project_id"),
+        ("/employees", main.EMPLOYEE_LIST, "employee_id"),
+        (f"/projects/{busiest}/tasks", main.TASK_LIST, "task_id"),
+        ("/tasks", main.TENANT_TASK_LIST, "task_id"),
+        (f"/employees/{reviewed}/reviews", main.REVIEW_LIST, "review_id"),
+    ]
+
+
+def test_every_list_endpoint_pages_without_gaps_or_duplicates(client, paged_tenant):
+    user_id, busiest, reviewed = paged_tenant
+    headers = auth(user_id)
+    for path, spec, id_key in _endpoints(busiest, reviewed):
+        for sort in _sorts(spec):
+            if path == "/tasks":
+                whole = client.get(path, headers=headers, params={"sort": sort, "limit": 500}).json()
+                assert whole["next_cursor"] is None
+                expected = [item[id_key] for item in whole["items"]]
+            else:
+                expected = [item[id_key] for item in client.get(path, headers=headers, params={"sort": sort}).json()]
+            assert expected, f"{path} has nothing to page"
+
+            walked, cursor_value = [], None
+            while True:
+                params = {"sort": sort, "limit": 7}
+                if cursor_value:
+                    params["cursor"] = cursor_value
+                response = client.get(path, headers=headers, params=params)
+                assert response.status_code == 200, (path, sort, response.text)
+                body = response.json()
+                assert body["total_estimate"] == len(expected), (path, sort)
+                walked += [item[id_key] for item in body["items"]]
+                cursor_value = body["next_cursor"]
+                if cursor_value is None:
+                    break
+            assert walked == expected, f"{path}?sort={sort}"
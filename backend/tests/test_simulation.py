@@ -0,0 +1,144 @@
+"""POST /simulate (src/simulation.py): what a scenario predicts is what applying the same changes for real
+produces, and simulating never changes the shared snapshot (or the database)."""
+import copy
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from main import SimulatedChange
+from src.dbConnect import backend
+from src.simulation import Scenario, forecast, simulate, simulation
+from src.skillIndex import skill_index
+from tests.conftest import auth
+
+FORECAST_KEYS = ("remaining_hours", "unplanned_tasks", "late_tasks", "forecast_completion", "late")
+
+
+@pytest.fixture
+def planned_tenant(make_tenant):
+    """A generated tenant with its deadlines moved to the weeks after today, so forecasts can go either way."""
+    user_id = make_tenant(employees=20, projects=5, tasks=160)
+    today = date.today()
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute("SELECT task_id FROM tasks WHERE user_id = ?", (user_id,))
+    cursor.executemany("UPDATE tasks SET deadline = ? WHERE task_id = ?",
+                       [((today + timedelta(days=task_id % 30)).isoformat(), task_id) for (task_id,) in cursor.fetchall()])
+    cursor.execute("SELECT project_id FROM projects WHERE user_id = ?", (user_id,))
+    cursor.executemany("UPDATE projects SET deadline = ? WHERE project_id = ?",
+                       [((today + timedelta(days=project_id % 20 + 5)).isoformat(), project_id)
+                        for (project_id,) in cursor.fetchall()])
+    conn.commit()
+    conn.close()
+    return user_id
+
+
+def _state(db, user_id):
+    db.rollback()
+    cursor = db.cursor()
+    return skill_index.get(cursor, user_id), simulation.get(cursor, user_id)
+
+
+def _open_tasks(plan, assigned):
+    return sorted(task_id for task_id, task in plan.tasks.items() if (task.employee_id is not None) == assigned)
+
+
+def _truth(plan, index, project_ids, today):
+    """Forecasts of the snapshot as it stands, no scenario on top."""
+    view = Scenario(plan)
+    employees = {task.employee_id for task in plan.tasks.values() if task.employee_id is not None}
+    with plan._lock:
+        return forecast(view, project_ids, index.workloads(employees), 100, today)
+
+
+def _changes(rng, plan, employee_ids):
+    unassigned, assigned = _open_tasks(plan, False), _open_tasks(plan, True)
+    picked = rng.sample(assigned, 4)
+    return [
+        {"op": "assign", "task_id": unassigned[0], "employee_ids": [rng.choice(employee_ids)]},
+        {"op": "assign", "task_id": picked[0], "employee_ids": [rng.choice(employee_ids)]},  # reassign
+        {"op": "unassign", "task_id": picked[1]},
+        {"op": "assign", "task_id": picked[2], "employee_ids": rng.sample(employee_ids, 2), "hours": [2, 5]},
+        {"op": "assign", "task_id": unassigned[1], "employee_ids": rng.sample(employee_ids, 3), "hours": [1, 3, 4]},
+    ]
+
+
+def _apply_for_real(client, headers, changes):
+    for change in changes:
+        if change["op"] == "unassign":
+            response = client.patch(f"/tasks/{change['task_id']}/unassign", headers=headers)
+        else:
+            response = client.post("/tasks/assign", headers=headers, json={
+                "task_id": change["task_id"], "employee_ids": change["employee_ids"], "hours": change.get("hours")})
+        assert response.status_code == 200, response.text
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_simulated_deltas_match_the_real_writes(client, db, planned_tenant, seed):
+    user_id, headers, today = planned_tenant, auth(planned_tenant), date.today()
+    rng = random.Random(seed)
+    index, plan = _state(db, user_id)
+    employee_ids = sorted(task.employee_id for task in plan.tasks.values() if task.employee_id is not None)
+    employee_ids = sorted(set(employee_ids))
+    changes = _changes(rng, plan, employee_ids)
+
+    response = client.post("/simulate", headers=headers, json={"changes": changes})
+    assert response.status_code == 200, response.text
+    simulated = response.json()
+    assert simulated["errors"] == []
+    project_ids = [project["project_id"] for project in simulated["projects"]]
+    before = _truth(plan, index, list(plan.projects), today)
+
+    _apply_for_real(client, headers, changes)
+    index, plan = _state(db, user_id)
+    after = _truth(plan, index, list(plan.projects), today)
+    workloads = index.workloads([employee["employee_id"] for employee in simulated["employees"]])
+
+    assert simulated["employees"], "the changes move somebody's load"
+    for employee in simulated["employees"]:
+        assert employee["load_after"] == round(workloads[employee["employee_id"]][2], 2), employee
+    for project in simulated["projects"]:
+        project_id = project["project_id"]
+        assert {key: project[key] for key in FORECAST_KEYS} == {key: after[project_id][key] for key in FORECAST_KEYS}
+        assert project["forecast_before"] == before[project_id]["forecast_completion"]
+        assert project["late_before"] == before[project_id]["late"]
+
+    # and the scenario listed every project whose forecast the writes moved
+    for project_id in set(plan.projects) - set(project_ids):
+        assert before[project_id] == after[project_id], f"project {project_id} moved but wasn't simulated"
+
+
+def test_simulating_leaves_the_snapshot_and_database_alone(client, db, planned_tenant):
+    user_id, headers = planned_tenant, auth(planned_tenant)
+    rng = random.Random(25)
+    index, plan = _state(db, user_id)
+    employee_ids = sorted({task.employee_id for task in plan.tasks.values() if task.employee_id is not None})
+    snapshot = copy.deepcopy((plan.tasks, plan.projects, plan.by_project, plan.by_employee))
+    workloads = index.workloads(employee_ids)
+    cursor = db.cursor()
+    cursor.execute("SELECT * FROM tasks WHERE user_id = ? ORDER BY task_id", (user_id,))
+    rows = [tuple(row) for row in cursor.fetchall()]
+
+    for _ in range(30):
+        changes = _changes(rng, plan, employee_ids)
+        untouched = sorted(set(plan.tasks) - {change["task_id"] for change in changes})
+        changes += [
+            {"op": "hours", "task_id": rng.choice(untouched), "estimated_hours": rng.randint(0, 20)},
+            {"op": "deadline", "task_id": rng.choice(untouched), "shift_days": rng.randint(-10, 10)},
+            {"op": "assign", "task_id": -1, "employee_ids": [employee_ids[0]]},  # an error, not a write
+        ]
+        rng.shuffle(changes)
+        response = client.post("/simulate", headers=headers, json={"changes": changes,
+                                                                     "capacity_pct": rng.choice([50, 100, 150])})
+        assert response.status_code == 200, response.text
+        assert len(response.json()["errors"]) == 1
+        # the module entry point too, with the same changes applied twice over one scenario
+        simulate(plan, index, [SimulatedChange(**change) for change in changes * 2], 100)
+
+    assert (plan.tasks, plan.projects, plan.by_project, plan.by_employee) == snapshot
+    assert index.workloads(employee_ids) == workloads
+    db.rollback()
+    cursor.execute("SELECT * FROM tasks WHERE user_id = ? ORDER BY task_id", (user_id,))
+    assert [tuple(row) for row in cursor.fetchall()] == rows
+    assert _state(db, user_id)[1] is plan  # no write came through, so no reload either
@@ -0,0 +1,64 @@
+"""/events authentication (auth_utils.get_stream_user): the URL takes only a short-lived stream token, a stream
+token opens nothing else, and token query parameters don't reach the access log."""
+import asyncio
+import logging
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from auth_utils import RedactTokens, create_access_token, get_stream_user
+from tests.conftest import auth
+
+
+def _stream_user(stream_token):
+    return asyncio.run(get_stream_user(Request({"type": "http", "headers": []}), stream_token, None))
+
+
+def test_stream_token_opens_events_only(client):
+    response = client.post("/events/token", headers=auth(7))
+    assert response.status_code == 200
+    stream_token = response.json()["stream_token"]
+    assert _stream_user(stream_token) == {"user_id": 7}
+    assert client.get("/projects", headers={"Authorization": f"Bearer {stream_token}"}).status_code == 401
+
+
+# the dependency is called directly: a token it wrongly accepted would open a stream that never ends
+def test_login_token_is_refused_in_the_url(client):
+    token = auth(7)["Authorization"].split()[1]
+    with pytest.raises(HTTPException) as refused:
+        _stream_user(None)
+    assert refused.value.status_code == 403
+    with pytest.raises(HTTPException) as refused:
+        _stream_user(token)
+    assert refused.value.status_code == 401
+    # a main token used first, and so cached, still isn't a stream token
+    assert client.get("/projects", headers=auth(7)).status_code == 200
+    with pytest.raises(HTTPException):
+        _stream_user(token)
+
+
+def test_expired_stream_token_is_refused():
+    expired = create_access_token({"sub": "7", "purpose": "stream"}, timedelta(seconds=-1))
+    with pytest.raises(HTTPException) as refused:
+        _stream_user(expired)
+    assert refused.value.status_code == 401
+
+
+def test_access_log_redacts_tokens():
+    record = logging.LogRecord("uvicorn.access", logging.INFO, __file__, 0, '%s - "%s %s HTTP/%s" %d',
+                               ("127.0.0.1:5000", "GET", "/events?stream_token=abc.def.ghi&x=1", "1.1", 200), None)
+    assert RedactTokens().filter(record)
+    assert record.getMessage() == '127.0.0.1:5000 - "GET /events?stream_token=REDACTED&x=1 HTTP/1.1" 200'
+    record = logging.LogRecord("uvicorn.access", logging.INFO, __file__, 0, '%s - "%s %s HTTP/%s" %d',
+                               ("127.0.0.1:5000", "GET", "/events?x=1&access_token=abc", "1.1", 200), None)
+    RedactTokens().filter(record)
+    assert "abc" not in record.getMessage()
+    assert any(isinstance(f, RedactTokens) for f in logging.getLogger("uvicorn.access").filters)
+
+
+def test_app_log_redacts_tokens(caplog):
+    with caplog.at_level(logging.WARNING, logger="skillboard"):
+        logging.getLogger("skillboard").warning("⛔ %s", ValueError("bad url /events?stream_token=abc.def"))
+    assert caplog.messages == ["⛔ bad url /events?stream_token=REDACTED"]
@@ -0,0 +1,150 @@
+"""The segment-tree walk behind task suggestions (src/taskSuggestions.py) against brute-force scans."""
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from src.taskSuggestions import NO_DEADLINE, SkillQueue, TenantTasks, _first, _tree
+
+
+@pytest.mark.parametrize("size", [0, 1, 2, 3, 7, 8, 9, 64, 100])
+def test_first_matches_a_scan(size):
+    rng = random.Random(size)
+    hours = [rng.choice([0, 1, 2, 5, 8, 13]) for _ in range(size)]
+    width = 1
+    while width < size:
+        width *= 2
+    low = _tree(np.array(hours, dtype=float), width, np.minimum, np.inf)
+    high = _tree(np.array(hours, dtype=float), width, np.maximum, -np.inf)
+    for spare in (-1, 0, 1, 4.5, 8, 20):
+        for start in range(size + 2):
+            fits = next((i for i in range(start, size) if hours[i] <= spare), -1)
+            misses = next((i for i in range(start, size) if hours[i] > spare), -1)
+            assert _first(low, width, start, lambda value: value <= spare) == fits, (spare, start)
+            assert _first(high, width, start, lambda value: value > spare) == misses, (spare, start)
+
+
+def test_queue_walk_matches_a_sorted_scan():
+    rng = random.Random(4)
+    for _ in range(50):
+        size = rng.randint(0, 40)
+        deadlines = np.array([rng.choice([1.0, 2.0, 3.0, NO_DEADLINE]) for _ in range(size)])
+        task_ids = np.array(rng.sample(range(1, 1000), size), dtype=np.int64)
+        hours = np.array([rng.choice([0, 2, 4, 8]) for _ in range(size)], dtype=float)
+        queue = SkillQueue(deadlines, task_ids, hours)
+        ordered = sorted(zip(deadlines.tolist(), task_ids.tolist(), hours.tolist()))
+        for spare in (0, 3, 8):
+            assert list(queue.walk(spare, True)) == [(d, t) for d, t, h in ordered if h <= spare]
+            assert list(queue.walk(spare, False)) == [(d, t) for d, t, h in ordered if h > spare]
+
+
+def _row(task_id, tech_stack_id, hours, deadline, project_id):
+    """A row shaped like TASKS_SQL's."""
+    return (task_id, tech_stack_id, hours, None, deadline, project_id, f"Project {project_id}", f"Tech {tech_stack_id}")
+
+
+def _expected(rows, skill_ids, spare, limit):
+    def key(row):
+        return (date.fromisoformat(row[4]).toordinal() if row[4] else NO_DEADLINE, row[0])
+
+    mine = [row for row in rows.values() if row[1] in skill_ids]
+    fitting = sorted((row for row in mine if (row[2] or 0) <= spare), key=key)
+    rest = sorted((row for row in mine if (row[2] or 0) > spare), key=key)
+    return ([(row, True) for row in fitting] + [(row, False) for row in rest])[:limit]
+
+
+def test_suggestions_match_a_scan_after_inserts_and_removals():
+    rng = random.Random(24)
+    start = date(2025, 1, 1)
+    next_task_id = iter(range(1, 100000))
+
+    def new_rows(project_id, count):
+        return [_row(next(next_task_id), rng.randint(1, 6), rng.choice([None, 1, 3, 6, 10]),
+                     rng.choice([None, (start + timedelta(days=rng.randint(0, 20))).isoformat()]), project_id)
+                for _ in range(count)]
+
+    rows = {row[0]: row for project_id in range(1, 9) for row in new_rows(project_id, rng.randint(0, 30))}
+    tasks = TenantTasks(user_id=1)
+    tasks.replace(list(rows.values()))
+
+    for _ in range(200):
+        # what a refresh does after a write: re-read a few projects, some tasks gone, some added
+        changed = rng.sample(range(1, 12), rng.randint(1, 3))
+        kept = [row for row in rows.values() if row[5] in changed and rng.random() < 0.6]
+        fresh = [row for project_id in changed for row in new_rows(project_id, rng.randint(0, 6))]
+        rows = {task_id: row for task_id, row in rows.items() if row[5] not in changed}
+        rows.update((row[0], row) for row in kept + fresh)
+        tasks.update(changed, kept + fresh)
+        assert tasks.size() == len(rows)
+
+        for _ in range(5):
+            skill_ids = rng.sample(range(1, 8), rng.randint(1, 3))
+            spare, limit = rng.choice([-1, 0, 2, 5.5, 12]), rng.choice([1, 5, 20, 500])
+            assert tasks.suggest(skill_ids, spare, limit) == _expected(rows, skill_ids, spare, limit)
+
+
+def test_queue_point_updates_match_a_sorted_scan():
+    rng = random.Random(240)
+    for _ in range(30):
+        live = {}
+        size = rng.randint(0, 30)
+        for task_id in rng.sample(range(1, 10000), size):
+            live[task_id] = (rng.choice([1.0, 5.0, 9.0, NO_DEADLINE]), rng.choice([0, 2, 4, 8]))
+        queue = SkillQueue(np.array([d for d, _ in live.values()]), np.array(list(live), dtype=np.int64),
+                           np.array([h for _, h in live.values()], dtype=float))
+        for _ in range(150):
+            if live and rng.random() < 0.4:
+                task_id = rng.choice(list(live))
+                del live[task_id]
+                queue.remove(task_id)
+            else:
+                task_id = rng.randint(10000, 10 ** 6)
+                if task_id in live:
+                    continue
+                # early deadlines too, so tasks go in at the front and neighbours shift
+                live[task_id] = (float(rng.randint(0, 10)), rng.choice([0, 2, 4, 8]))
+                queue.add(live[task_id][0], task_id, live[task_id][1])
+            assert len(queue) == len(live)
+            ordered = sorted((d, t, h) for t, (d, h) in live.items())
+            spare = rng.choice([0, 3, 8])
+            assert list(queue.walk(spare, True)) == [(d, t) for d, t, h in ordered if h <= spare]
+            assert list(queue.walk(spare, False)) == [(d, t) for d, t, h in ordered if h > spare]
+
+
+def test_task_writes_update_the_queues_in_place(monkeypatch):
+    rng = random.Random(2400)
+    start = date(2025, 1, 1)
+    rows = {task_id: _row(task_id, 1 + task_id % 3, rng.choice([1, 3, 6, 10]),
+                          (start + timedelta(days=rng.randint(0, 60))).isoformat(), 1 + task_id % 20)
+            for task_id in range(1, 3001)}
+    tasks = TenantTasks(user_id=1)
+    tasks.replace(list(rows.values()))
+    tasks.suggest([1, 2, 3], 5, 10)  # builds the three queues
+    queues = dict(tasks.queues)
+    builds = []
+    real_build = SkillQueue._build
+    monkeypatch.setattr(SkillQueue, "_build", lambda self, *args: builds.append(len(args[0])) or real_build(self, *args))
+
+    next_task_id = iter(range(5000, 100000))
+    for _ in range(300):
+        # one task write: its project re-read with a task gone, one added, one re-estimated or moved
+        project_id = rng.randint(1, 20)
+        mine = [row for row in rows.values() if row[5] == project_id]
+        for row in rng.sample(mine, min(len(mine), 1)):
+            del rows[row[0]]
+        new_id = next(next_task_id)
+        rows[new_id] = _row(new_id, rng.randint(1, 3), rng.choice([1, 3, 6, 10]),
+                            (start + timedelta(days=rng.randint(0, 60))).isoformat(), project_id)
+        changed = next((row for row in rows.values() if row[5] == project_id and row[0] != new_id), None)
+        if changed is not None:
+            rows[changed[0]] = _row(changed[0], rng.randint(1, 3), rng.choice([1, 3, 6, 10]),
+                                    rng.choice([changed[4], (start + timedelta(days=rng.randint(0, 60))).isoformat()]),
+                                    project_id)
+        tasks.update([project_id], [row for row in rows.values() if row[5] == project_id])
+
+        skill_ids = rng.sample([1, 2, 3], rng.randint(1, 3))
+        spare, limit = rng.choice([0, 2, 5.5, 12]), rng.choice([1, 20])
+        assert tasks.suggest(skill_ids, spare, limit) == _expected(rows, skill_ids, spare, limit)
+    assert all(tasks.queues[skill] is queue for skill, queue in queues.items())
+    assert builds == []  # no queue was rebuilt: every write was a few point updates
@@ -0,0 +1,25 @@
+"""TenantState (src/tenantCache.py) is abstract: a subclass without load/replace/update can't be made."""
+import pytest
+
+from src.capacityTimeline import TenantTimeline
+from src.simulation import TenantPlan
+from src.skillIndex import TenantIndex
+from src.taskSuggestions import TenantTasks
+from src.tenantCache import TenantState
+
+
+def test_incomplete_state_fails_when_made():
+    class NoUpdate(TenantState):
+        def load(self, cursor, employee_ids):
+            return []
+
+        def replace(self, data):
+            pass
+
+    with pytest.raises(TypeError, match="update"):
+        NoUpdate(1, 0)
+
+
+@pytest.mark.parametrize("state", [TenantTimeline, TenantPlan, TenantIndex, TenantTasks])
+def test_every_state_is_complete(state):
+    assert isinstance(state(1), TenantState)
@@ -0,0 +1,79 @@
+"""Task creation trends (src/trendRollups.py) count a task on the day it was created, whatever assigning it
+later does to its start_date."""
+from datetime import date, timedelta
+
+from src import trendRollups
+from tests.conftest import auth
+
+
+def _trends(client, headers):
+    params = {"from": (date.today() - timedelta(days=400)).isoformat(), "to": date.today().isoformat(),
+              "granularity": "week"}
+    response = client.get("/stats/trends", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return body["tasks_created"], body["hours_by_tech_stack"]
+
+
+def _created(db, task_ids):
+    db.rollback()
+    cursor = db.cursor()
+    cursor.execute(f"SELECT task_id, created_at FROM tasks WHERE task_id IN ({', '.join('?' for _ in task_ids)})",
+                   list(task_ids))
+    return {task_id: trendRollups.as_date(day) for task_id, day in cursor.fetchall()}
+
+
+def test_assigning_doesnt_move_a_task_in_the_creation_trend(client, db, make_tenant):
+    user_id = make_tenant(employees=6, projects=2, tasks=30)
+    headers = auth(user_id)
+    cursor = db.cursor()
+    cursor.execute("SELECT project_id FROM projects WHERE user_id = ?", (user_id,))
+    project_id = cursor.fetchone()[0]
+    cursor.execute("SELECT employee_id FROM employees WHERE user_id = ?", (user_id,))
+    employees = [row[0] for row in cursor.fetchall()]
+
+    for start_date in ("2024-02-05", None):
+        response = client.post("/tasks", headers=headers, json={
+            "tech_stack_id": 1, "project_id": project_id, "estimated_hours": 6,
+            "deadline": "2026-12-01", "start_date": start_date})
+        assert response.status_code == 200, response.text
+    db.rollback()
+    cursor = db.cursor()
+    cursor.execute("SELECT task_id FROM tasks WHERE project_id = ? ORDER BY task_id DESC", (project_id,))
+    second, first = cursor.fetchone()[0], cursor.fetchone()[0]
+    assert set(_created(db, [first, second]).values()) == {date.today()}
+    created, hours = _trends(client, headers)
+    assert created[-1] >= 2
+
+    # assigning rewrites start_date (to another day, or to NULL): the series stay as they were
+    for task_id, start_date in ((first, "2021-03-01"), (second, None)):
+        response = client.post("/tasks/assign", headers=headers,
+                               json={"task_id": task_id, "employee_ids": [employees[0]], "start_date": start_date})
+        assert response.status_code == 200, response.text
+        assert _trends(client, headers) == (created, hours)
+    assert trendRollups.check(db.cursor(), user_id) == []
+
+    # a split replaces the task with parts created the same day; the hours stay on that day too
+    response = client.post("/tasks/assign-batch", headers=headers, json={"assignments": [
+        {"task_id": first, "employee_ids": employees[1:3], "hours": [2, 4], "start_date": "2021-04-01"}]})
+    assert response.status_code == 200, response.text
+    assert _trends(client, headers)[1] == hours
+    db.rollback()
+    cursor = db.cursor()
+    cursor.execute("SELECT task_id FROM tasks WHERE project_id = ? AND task_id > ?", (project_id, second))
+    parts = [row[0] for row in cursor.fetchall()]
+    assert len(parts) == 2 and set(_created(db, parts).values()) == {date.today()}
+    assert trendRollups.check(db.cursor(), user_id) == []
+
+
+def test_rebuild_writes_through_the_dialect(db, make_tenant, monkeypatch):
+    # dialect.executemany is what turns on fast_executemany on SQL Server: one round trip, not one per row
+    user_id = make_tenant(employees=3, projects=1, tasks=12)
+    calls = []
+    real = trendRollups.dialect.executemany
+    monkeypatch.setattr(trendRollups.dialect, "executemany",
+                        lambda cursor, sql, rows: calls.append(len(rows)) or real(cursor, sql, rows))
+    written = trendRollups.rebuild(db.cursor(), user_id)
+    assert written and calls == [written]
+    assert trendRollups.check(db.cursor(), user_id) == []
+    db.rollback()
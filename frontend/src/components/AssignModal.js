@@ -3,6 +3,7 @@ import React, { useState } from "react";
 
 function AssignModal({
   candidates,
+  taskId,
   onConfirm,
   onCancel,
   taskTitle,
@@ -10,14 +11,17 @@ function AssignModal({
 }) {
   const [selectedIds, setSelectedIds] = useState([]);
   const [hours, setHours] = useState({});
+  const [preview, setPreview] = useState(null);
 
   const toggleSelect = (id) => {
+    setPreview(null);
     setSelectedIds((prev) =>
       prev.includes(id) ? prev.filter((eid) => eid !== id) : [...prev, id]
     );
   };
 
   const handleHoursChange = (id, value) => {
+    setPreview(null);
     setHours((prev) => ({ ...prev, [id]: value }));
   };
 
@@ -26,6 +30,26 @@ function AssignModal({
     onConfirm(selectedIds, hoursArray);
   };
 
+  // 🧪 What-if: loads and project forecast after this assignment, nothing written
+  const handlePreview = () => {
+    const token = localStorage.getItem("token");
+    const change = { op: "assign", task_id: taskId, employee_ids: selectedIds };
+    if (selectedIds.length > 1) {
+      change.hours = selectedIds.map((id) => parseFloat(hours[id]) || 0);
+    }
+    fetch("http://localhost:8000/simulate", {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        Authorization: `Bearer ${token}`,
+      },
+      body: JSON.stringify({ changes: [change] }),
+    })
+      .then((res) => res.json())
+      .then((data) => setPreview(data))
+      .catch((err) => console.error("Simulation failed:", err));
+  };
+
   return (
     <div>
       <h4 className="font-semibold mb-2">Estimated hours: {taskHours} hrs</h4>
@@ -56,6 +80,30 @@ function AssignModal({
           </li>
         ))}
       </ul>
+      {preview && (
+        <div className="mt-4 text-sm space-y-1">
+          {preview.errors.map((e) => (
+            <p key={e.index} className="text-red-600">
+              {e.detail}
+            </p>
+          ))}
+          {preview.employees.map((emp) => (
+            <p
+              key={emp.employee_id}
+              className={emp.over_capacity ? "text-red-600" : "text-green-700"}
+            >
+              {emp.over_capacity ? "⚠️" : "✅"} {emp.employee_name}:{" "}
+              {emp.load_before} → {emp.load_after} / {emp.weekly_hours} hrs
+            </p>
+          ))}
+          {preview.projects.map((p) => (
+            <p key={p.project_id} className={p.late ? "text-red-600" : ""}>
+              📅 {p.project_name}: done {p.forecast_completion || "—"}{" "}
+              (was {p.forecast_before || "—"})
+            </p>
+          ))}
+        </div>
+      )}
       <div className="mt-4 flex justify-end gap-4">
         <button
           onClick={onCancel}
@@ -63,6 +111,13 @@ function AssignModal({
         >
           Cancel
         </button>
+        <button
+          onClick={handlePreview}
+          disabled={selectedIds.length === 0}
+          className="bg-purple-600 text-white px-4 py-2 rounded disabled:opacity-50"
+        >
+          Preview
+        </button>
         <button
           onClick={handleSubmit}
           className="bg-blue-600 text-white px-4 py-2 rounded"
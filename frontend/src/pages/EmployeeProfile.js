@@ -234,6 +234,11 @@ function EmployeeProfile() {
                     Estimated: {task.estimated_hours} hrs | Start:{" "}
                     {task.start_date || "-"} | Deadline: {task.deadline}
                   </p>
+                  {task.fits_capacity === false && (
+                    <p className="text-xs text-yellow-300 mt-1">
+                      ⚠️ More hours than this employee has free
+                    </p>
+                  )}
                   <button
                     onClick={() => handleSelfAssign(task.task_id)}
                     className="mt-3 bg-blue-500 hover:bg-blue-600 text-white font-semibold px-4 py-2 rounded shadow border border-blue-400"
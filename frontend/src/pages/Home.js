@@ -48,81 +48,116 @@ function Home() {
   const [monthlyTrends, setMonthlyTrends] = useState([]);
 
   const token = localStorage.getItem("token");
+  const [refreshKey, setRefreshKey] = useState(0);
 
+  // 📡 live updates: refetch the stats when the server says something changed, instead of polling
+  // the URL carries a short-lived stream token, not the login token; once it has expired a reconnect is
+  // refused, so a closed stream is reopened with a fresh one
   useEffect(() => {
-    const token = localStorage.getItem("token");
-    fetch("http://localhost:8000/stats/dashboard", {
-      headers: {
-        Authorization: `Bearer ${token}`,
-      },
-    })
-      .then((res) => res.json())
-      .then((data) => {
-        setProjectProgress(data.project_progress);
-        setMonthlyTrends(data.monthly_project_trends);
-      })
-      .catch((err) => console.error("Dashboard stats fetch failed:", err));
+    if (!token) return;
+    let events = null;
+    let retry = null;
+    let stopped = false;
+    const refresh = () => setRefreshKey((key) => key + 1);
+
+    const open = async () => {
+      try {
+        const res = await fetch("http://localhost:8000/events/token", {
+          method: "POST",
+          headers: { Authorization: `Bearer ${token}` },
+        });
+        if (!res.ok || stopped) return;
+        const { stream_token } = await res.json();
+        events = new EventSource(
+          `http://localhost:8000/events?stream_token=${encodeURIComponent(stream_token)}`
+        );
+        events.addEventListener("changes", refresh);
+        events.addEventListener("resync", refresh);
+        events.onerror = () => {
+          if (events.readyState !== EventSource.CLOSED || stopped) return;
+          refresh(); // whatever happened while closed was missed
+          retry = setTimeout(open, 5000);
+        };
+      } catch (err) {
+        if (!stopped) retry = setTimeout(open, 5000);
+      }
+    };
+
+    open();
+    return () => {
+      stopped = true;
+      clearTimeout(retry);
+      if (events) events.close();
+    };
   }, [token]);
 
   useEffect(() => {
     const token = localStorage.getItem("token");
 
-    fetch("http://localhost:8000/stats/dept-workload", {
+    // one round trip (and one DB connection) for all the dashboard stats
+    fetch("http://localhost:8000/batch", {
+      method: "POST",
       headers: {
         Authorization: `Bearer ${token}`,
+        "Content-Type": "application/json",
       },
+      body: JSON.stringify({
+        requests: [
+          { path: "/stats/dashboard" },
+          { path: "/stats/dept-workload" },
+          { path: "/analytics" },
+        ],
+      }),
     })
-      .then((res) => res.json())
-      .then((data) => {
-        if (Array.isArray(data)) {
-          const fixed = data.map((item) => ({
+      .then((res) => {
+        if (!res.ok) {
+          throw new Error(`Fetch failed with status ${res.status}`);
+        }
+        return res.json();
+      })
+      .then(({ responses }) => {
+        const [dashboard, workload, analytics] = responses;
+
+        if (dashboard.status === 200) {
+          setProjectProgress(dashboard.body.project_progress);
+          setMonthlyTrends(dashboard.body.monthly_project_trends);
+        } else {
+          console.error("Dashboard stats fetch failed:", dashboard);
+        }
+
+        if (workload.status === 200 && Array.isArray(workload.body)) {
+          const fixed = workload.body.map((item) => ({
             role: item.role,
             total: Number(item.total),
             working: Number(item.working),
           }));
           setDeptStats(fixed);
         } else {
-          console.error("Expected array, got:", data);
+          console.error("Dept workload fetch failed:", workload);
         }
-      })
-      .catch((err) => console.error("Dept workload fetch failed:", err));
-  }, [token]);
-useEffect(() => {
-  const token = localStorage.getItem("token");
 
-  fetch("http://localhost:8000/analytics", {
-    headers: {
-      Authorization: `Bearer ${token}`,
-    },
-  })
-    .then((res) => {
-      if (!res.ok) {
-        throw new Error(`Fetch failed with status ${res.status}`);
-      }
-      return res.json();
-    })
-    .then((data) => {
-      console.log("✅ Analytics response:", data);
-
-      setProjectCount(data.total_projects);
-      setEmployeePie([
-        { name: "Available", value: data.employees_available },
-        { name: "Fully Loaded", value: data.employees_overloaded },
-      ]);
-      setTaskPie([
-        { name: "Completed", value: data.tasks_completed },
-        { name: "Pending", value: data.tasks_pending },
-      ]);
-      setBenchPie([
-        { name: "Benched", value: data.employees_benched },
-        { name: "Active", value: data.employees_active },
-      ]);
-      setWorkloadPie(data.workload_distribution);
-    })
-    .catch((err) => {
-      console.error("❌ Analytics fetch failed:", err);
-    });
-}, []);
+        if (analytics.status === 200) {
+          const data = analytics.body;
+          setProjectCount(data.total_projects);
+          setEmployeePie([
+            { name: "Available", value: data.employees_available },
+            { name: "Fully Loaded", value: data.employees_overloaded },
+          ]);
+          setTaskPie([
+            { name: "Completed", value: data.tasks_completed },
+            { name: "Pending", value: data.tasks_pending },
+          ]);
+          setBenchPie([
+            { name: "Benched", value: data.employees_benched },
+            { name: "Active", value: data.employees_active },
+          ]);
+          setWorkloadPie(data.workload_distribution);
+        } else {
+          console.error("❌ Analytics fetch failed:", analytics);
+        }
+      })
+      .catch((err) => console.error("❌ Dashboard batch fetch failed:", err));
+  }, [token, refreshKey]);
 
 
   const particlesInit = async (engine) => {
@@ -251,6 +251,55 @@ function ProjectDetails() {
 };
 
 
+  // 🤖 Preview the automatic assignment of every unassigned task, then apply it if confirmed
+  const handleAutoAssign = () => {
+    const token = localStorage.getItem("token");
+    if (!token) {
+      alert("No token found - please log in again.");
+      return;
+    }
+
+    const autoAssign = (dryRun) =>
+      fetch(`http://localhost:8000/projects/${id}/auto-assign`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          Authorization: `Bearer ${token}`,
+        },
+        body: JSON.stringify({
+          dry_run: dryRun,
+          start_date: new Date().toISOString().split("T")[0],
+        }),
+      }).then((res) => {
+        if (!res.ok) throw new Error("Auto-assign failed");
+        return res.json();
+      });
+
+    autoAssign(true)
+      .then((preview) => {
+        if (preview.assigned.length === 0) {
+          alert("No unassigned task could be matched to an employee with free hours.");
+          return null;
+        }
+        const skipped = preview.unassigned.length
+          ? `\n${preview.unassigned.length} task(s) would stay unassigned.`
+          : "";
+        if (!window.confirm(`Assign ${preview.assigned.length} task(s) to ${preview.employees.length} employee(s)?${skipped}`)) {
+          return null;
+        }
+        return autoAssign(false);
+      })
+      .then((result) => {
+        if (!result) return;
+        setCandidateLists({});
+        setRefresh((prev) => !prev);
+      })
+      .catch((err) => {
+        console.error("❌ Auto-assign error:", err);
+        alert("❌ Auto-assign failed.");
+      });
+  };
+
   const handleTaskChange = (e) => {
     setNewTask({ ...newTask, [e.target.name]: e.target.value });
   };
@@ -348,12 +397,20 @@ function ProjectDetails() {
               <strong>Deadline:</strong> {project.deadline}
             </p>
           </div>
-          <button
-            onClick={() => setShowTaskModal(true)}
-            className="bg-[#39a0ca] hover:bg-[#2c89b0] text-white font-semibold px-4 py-2 rounded-lg shadow"
-          >
-            + Add Task
-          </button>
+          <div className="flex gap-3">
+            <button
+              onClick={handleAutoAssign}
+              className="bg-[#565656] hover:bg-[#444] text-white font-semibold px-4 py-2 rounded-lg shadow"
+            >
+              🤖 Auto-assign
+            </button>
+            <button
+              onClick={() => setShowTaskModal(true)}
+              className="bg-[#39a0ca] hover:bg-[#2c89b0] text-white font-semibold px-4 py-2 rounded-lg shadow"
+            >
+              + Add Task
+            </button>
+          </div>
         </div>
       )}
 
@@ -594,6 +651,7 @@ function ProjectDetails() {
             {candidateLists[assigningTask.task_id] ? (
               <AssignModal
                 candidates={candidateLists[assigningTask.task_id]}
+                taskId={assigningTask.task_id}
                 taskTitle={assigningTask.tech_stack_name}
                 taskHours={assigningTask.estimated_hours}
                 onConfirm={(ids, hours) => {